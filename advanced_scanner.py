@@ -4,21 +4,42 @@ import json
 import subprocess
 import os
 import re
+import io
+import csv
+import glob
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urljoin
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+from rich.text import Text
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from rich.markdown import Markdown
 
-def search_username(username):
-    console = Console()
+from negative_cache import negative_cache
+from platform_registry import load_registry, check_all, page_contains
+from records import ScanRecord
+from image_index import index_images
+from latency import latency, timed, host_of
+from circuit_breaker import CircuitOpen, breakers
+
+DEFAULT_ROW_LIMIT = 10
+MAX_PANEL_CHARS = 4000
+
+
+def search_username(username, console=None, display=True, session=None, keep_raw=False, display_options=None,
+                    show_progress=True):
+    console = console or Console()
+    http = session or requests
     results = {
         'usernames': [],
         'images': [],
         'links': [],
         'emails': [],
-        'profiles': []
+        'profiles': [],
+        'deferred': []
     }
 
     with Progress(
@@ -27,92 +48,48 @@ def search_username(username):
         BarColumn(),
         TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
         TimeElapsedColumn(),
+        console=console,
+        disable=not show_progress,
     ) as progress:
         task = progress.add_task("Initializing advanced OSINT scan...", total=100)
 
-        # Enhanced platform configurations
-        platforms = {
-            'GitHub': {
-                'url': f'https://api.github.com/users/{username}',
-                'type': 'json',
-                'parser': lambda data: {
-                    'username': f"GitHub: {data.get('name', username)} ({data.get('login', username)})",
-                    'image': data.get('avatar_url', ''),
-                    'links': [data.get('blog')] if data.get('blog') else [],
-                    'profile': f"https://github.com/{username}"
-                }
-            },
-            'Reddit': {
-                'url': f'https://www.reddit.com/user/{username}/about.json',
-                'type': 'json',
-                'headers': {'User-Agent': 'OSINT-Tool/1.0'},
-                'parser': lambda data: {
-                    'username': f"Reddit: {data.get('data', {}).get('subreddit', {}).get('title', username)}",
-                    'image': data.get('data', {}).get('icon_img', ''),
-                    'links': [],
-                    'profile': f"https://reddit.com/user/{username}"
-                }
-            },
-            'Keybase': {
-                'url': f'https://keybase.io/_/api/1.0/user/lookup.json?usernames={username}',
-                'type': 'json',
-                'parser': lambda data: {
-                    'username': f"Keybase: {username}",
-                    'image': data.get('them', [{}])[0].get('pictures', {}).get('primary', {}).get('url', ''),
-                    'links': [],
-                    'profile': f"https://keybase.io/{username}"
-                }
-            },
-            'GitLab': {
-                'url': f'https://gitlab.com/api/v4/users?username={username}',
-                'type': 'json',
-                'parser': lambda data: {
-                    'username': f"GitLab: {data[0].get('name', username)}" if data else '',
-                    'image': data[0].get('avatar_url', '') if data else '',
-                    'links': [],
-                    'profile': f"https://gitlab.com/{username}"
-                }
-            }
-        }
-
-        # Check platforms
+        # Platforms come from the shared registry (platforms.json); recent misses are skipped
+        platforms = [p for p in load_registry() if not negative_cache.is_miss(p.key, username)]
         platform_count = len(platforms)
         progress_per_platform = 20 / platform_count if platform_count > 0 else 0
 
-        for name, info in platforms.items():
-            progress.update(task, description=f"Checking {name}...")
-            try:
-                headers = info.get('headers', {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'})
-                r = requests.get(info['url'], headers=headers, timeout=10)
-                
-                if r.status_code == 200:
-                    if info['type'] == 'json':
-                        data = r.json()
-                        parsed = info['parser'](data)
-                        if parsed['username']:
-                            results['usernames'].append(parsed['username'])
-                            results['profiles'].append({
-                                'platform': name,
-                                'url': parsed.get('profile', ''),
-                                'username': parsed['username']
-                            })
-                        if parsed['image']:
-                            results['images'].append(parsed['image'])
-                        results['links'].extend(parsed['links'])
-                    
-            except Exception as e:
-                console.print(f"[red]Error checking {name}: {str(e)}[/red]")
-            
+        progress.update(task, description=f"Checking {platform_count} platforms...")
+        for platform, status, found, data, _ in check_all(username, http=http, platforms=platforms):
+            if isinstance(data, CircuitOpen):
+                results['deferred'].append(f"{platform.name} ({data})")
+            elif status is None:
+                console.print(f"[red]Error checking {platform.name}[/red]")
+            elif found:
+                parsed = platform.parse(data or {}, username)
+                if parsed['username']:
+                    results['usernames'].append(parsed['username'])
+                    results['profiles'].append({
+                        'platform': platform.name,
+                        'url': parsed['profile'],
+                        'username': parsed['username']
+                    })
+                if parsed['image']:
+                    results['images'].append(parsed['image'])
+                results['links'].extend(parsed['links'])
+            elif status == 404 or status in platform.expect_status:
+                negative_cache.record_miss(platform.key, username)
             progress.update(task, advance=progress_per_platform)
 
-        # Run external tools with better error handling
+        # Run external tools, asking each for a machine-readable report
         tools = [
-            ('Maigret', 'maigret', [username, '--timeout', '10', '--no-recursion']),
-            ('Sherlock', 'sherlock', [username, '--timeout', '10', '--print-found']),
+            ('Maigret', 'maigret', [username, '--timeout', '10', '--no-recursion', '--no-progressbar',
+                                    '-J', 'simple', '--folderoutput', '{outdir}']),
+            ('Sherlock', 'sherlock', [username, '--timeout', '10', '--print-found', '--csv',
+                                      '--folderoutput', '{outdir}']),
         ]
 
         if '@' in username:
-            tools.append(('Holehe', 'holehe', [username, '--only-used']))
+            tools.append(('Holehe', 'holehe', [username, '--only-used', '--csv']))
 
         progress_per_tool = 30 / len(tools) if len(tools) > 0 else 0
 
@@ -120,7 +97,6 @@ def search_username(username):
             progress.update(task, description=f"Running {tool_name}...")
             try:
                 # Try different ways to find the tool
-                cmd = None
                 possible_paths = [
                     tool_cmd,
                     f'~/.local/bin/{tool_cmd}',
@@ -128,29 +104,30 @@ def search_username(username):
                     f'python -m {tool_cmd}',
                 ]
                 
-                for path in possible_paths:
-                    expanded_path = os.path.expanduser(path)
-                    try:
-                        if path.startswith('python'):
-                            # For python -m commands
-                            output = subprocess.check_output(
-                                path.split() + tool_args, 
-                                text=True, 
-                                timeout=120,
-                                stderr=subprocess.DEVNULL
-                            )
-                        else:
-                            output = subprocess.check_output(
-                                [expanded_path] + tool_args, 
-                                text=True, 
-                                timeout=120,
-                                stderr=subprocess.DEVNULL
-                            )
-                        results[f'{tool_name.lower()}_output'] = output
-                        parse_tool_output(tool_name, output, results)
+                with tempfile.TemporaryDirectory(prefix=f'{tool_cmd}_') as outdir:
+                    args = [arg.replace('{outdir}', outdir) for arg in tool_args]
+                    for path in possible_paths:
+                        expanded_path = os.path.expanduser(path)
+                        command = path.split() if path.startswith('python') else [expanded_path]
+                        try:
+                            # Reports land in outdir; Holehe writes its CSV to the cwd
+                            with timed(f'tool:{tool_cmd}', subprocess.TimeoutExpired):
+                                output = subprocess.check_output(
+                                    command + args,
+                                    text=True,
+                                    timeout=120,
+                                    stderr=subprocess.DEVNULL,
+                                    cwd=outdir
+                                )
+                        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+                            continue
+
+                        if keep_raw:
+                            results[f'{tool_name.lower()}_output'] = output
+                        if not load_tool_report(tool_name, outdir, username, results):
+                            # Older tool versions without report support
+                            parse_tool_output(tool_name, output, results)
                         break
-                    except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-                        continue
                         
             except Exception as e:
                 console.print(f"[yellow]Warning: {tool_name} not available or failed: {str(e)}[/yellow]")
@@ -162,15 +139,24 @@ def search_username(username):
         try:
             # Search Pastebin-like sites
             paste_sites = [
-                f'https://pastebin.com/u/{username}',
-                f'https://www.codepad.co/{username}',
+                ('pastebin', f'https://pastebin.com/u/{username}'),
+                ('codepad', f'https://www.codepad.co/{username}'),
             ]
             
-            for site in paste_sites:
+            for platform, site in paste_sites:
+                if negative_cache.is_miss(platform, username):
+                    continue
                 try:
-                    r = requests.get(site, timeout=5)
-                    if r.status_code == 200 and username.lower() in r.text.lower():
+                    host = host_of(site)
+                    with breakers.guarded(host, requests.Timeout, requests.RequestException), \
+                            timed(host, requests.Timeout):
+                        found = page_contains(http, site, username, timeout=latency.timeout(host, 5))
+                    if found:
                         results['links'].append(site)
+                    else:
+                        negative_cache.record_miss(platform, username)
+                except CircuitOpen as e:
+                    results['deferred'].append(f"{platform} ({e})")
                 except:
                     pass
                     
@@ -178,6 +164,7 @@ def search_username(username):
             console.print(f"[yellow]Web scraping failed: {str(e)}[/yellow]")
         
         progress.update(task, advance=10)
+        latency.save()
 
         # Final processing
         progress.update(task, description="Processing results...")
@@ -187,14 +174,64 @@ def search_username(username):
         results['images'] = list(dict.fromkeys([i for i in results['images'] if i and i.startswith('http')]))
         results['links'] = list(dict.fromkeys([l for l in results['links'] if l and l.startswith('http')]))
         results['emails'] = list(dict.fromkeys(results['emails']))
+        results['profiles'] = list({p['url'] or p['platform']: p for p in reversed(results['profiles'])}.values())[::-1]
+
+        # Avatars reused elsewhere link this username to earlier scans
+        if results['images']:
+            progress.update(task, description="Matching profile images...")
+            try:
+                results['image_matches'] = index_images(results['images'], username, http=session)
+            except Exception as e:
+                console.print(f"[yellow]Image matching failed: {str(e)}[/yellow]")
         
         progress.update(task, completed=100)
 
     # Display results in a formatted way
-    display_results(console, username, results)
+    if display:
+        display_results(console, username, results, **(display_options or {}))
+
+    return results
+
+def load_tool_report(tool_name, outdir, username, results):
+    """Load found-site records from a tool's report file; False if none was written"""
+    if tool_name == 'Maigret':
+        reports = glob.glob(os.path.join(outdir, '*.json'))
+        if not reports:
+            return False
+        # The "simple" report only contains claimed sites
+        with open(reports[0], encoding='utf-8') as f:
+            report = json.load(f)
+        for site, entry in report.items():
+            url = entry.get('url_user') or entry.get('status', {}).get('url', '')
+            if url:
+                results['profiles'].append({'platform': site, 'url': url, 'username': username, 'source': 'maigret'})
+        return True
+
+    elif tool_name == 'Sherlock':
+        reports = glob.glob(os.path.join(outdir, '*.csv'))
+        if not reports:
+            return False
+        with open(reports[0], newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('exists') == 'Claimed' and row.get('url_user'):
+                    results['profiles'].append({'platform': row.get('name', ''), 'url': row['url_user'],
+                                                'username': username, 'source': 'sherlock'})
+        return True
+
+    elif tool_name == 'Holehe':
+        reports = glob.glob(os.path.join(outdir, 'holehe_*.csv'))
+        if not reports:
+            return False
+        with open(reports[0], newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('exists') == 'True':
+                    results['emails'].append(f"[+] {row.get('domain') or row.get('name', '')}")
+        return True
+
+    return False
 
 def parse_tool_output(tool_name, output, results):
-    """Parse output from external tools"""
+    """Parse stdout from external tools that did not write a report"""
     if tool_name == 'Maigret':
         for line in output.split('\n'):
             if '[+]' in line and 'http' in line:
@@ -213,52 +250,84 @@ def parse_tool_output(tool_name, output, results):
             if '[+]' in line and '@' in line:
                 results['emails'].append(line.strip())
 
-def display_results(console, username, results):
-    """Display results in a formatted Rich output"""
-    
+def _print_section(console, title, rows, row_limit, full):
+    """Print a bulleted section, truncated to row_limit unless full"""
+    if not rows:
+        return
+    console.print(f"\n{title}")
+    shown = rows if full else rows[:row_limit]
+    for row in shown:
+        console.print(f"  • {row}")
+    if len(rows) > len(shown):
+        console.print(f"  [dim]... and {len(rows) - len(shown)} more (use --full to show all)[/dim]")
+
+def display_summary(console, username, results):
+    """Print one line of counts per section so large scans show something immediately"""
     console.print(f"\n🎯 [bold cyan]Advanced OSINT Results for: {username}[/bold cyan]")
     
+    summary = Table(show_header=True, header_style="bold magenta", title="📋 Summary")
+    summary.add_column("Section", style="cyan")
+    summary.add_column("Found", style="green", justify="right")
+    for label, key in [("Profiles", 'profiles'), ("Usernames", 'usernames'), ("Images", 'images'),
+                       ("Links", 'links'), ("Emails", 'emails')]:
+        summary.add_row(label, str(len(results[key])))
+    if results.get('image_matches'):
+        summary.add_row("Matching images", str(len(results['image_matches'])))
+    if results.get('deferred'):
+        summary.add_row("Deferred (host down)", f"[yellow]{len(results['deferred'])}[/yellow]")
+    for tool in ['maigret', 'sherlock', 'holehe']:
+        if results.get(f'{tool}_output'):
+            summary.add_row(f"{tool.title()} raw output", f"{len(results[f'{tool}_output'])} chars")
+    console.print(summary)
+
+def display_results(console, username, results, row_limit=DEFAULT_ROW_LIMIT, full=False, page=False):
+    """Display results in a formatted Rich output.
+
+    The summary always prints first. Sections are capped at row_limit rows
+    and raw tool panels at MAX_PANEL_CHARS unless full is set; with page on
+    a terminal, the detailed sections open in the pager.
+    """
+    display_summary(console, username, results)
+    
+    if page and console.is_terminal:
+        with console.pager(styles=True):
+            display_details(console, username, results, row_limit, full)
+    else:
+        display_details(console, username, results, row_limit, full)
+
+def display_details(console, username, results, row_limit, full):
+    """Render the per-section detail views"""
     # Profiles Table
     if results['profiles']:
+        profiles = results['profiles'] if full else results['profiles'][:row_limit]
         table = Table(title="📊 Found Profiles", show_header=True, header_style="bold magenta")
         table.add_column("Platform", style="cyan")
         table.add_column("URL", style="green")
         
-        for profile in results['profiles']:
+        for profile in profiles:
             table.add_row(profile['platform'], profile['url'])
+        if len(results['profiles']) > len(profiles):
+            table.caption = f"... and {len(results['profiles']) - len(profiles)} more (use --full to show all)"
         console.print(table)
     
-    # Usernames
-    if results['usernames']:
-        console.print("\n👤 [bold]Usernames Found:[/bold]")
-        for username in results['usernames']:
-            console.print(f"  • {username}")
-    
-    # Images
-    if results['images']:
-        console.print("\n🖼️ [bold]Profile Images:[/bold]")
-        for img in results['images']:
-            console.print(f"  • {img}")
+    _print_section(console, "👤 [bold]Usernames Found:[/bold]", results['usernames'], row_limit, full)
+    _print_section(console, "🖼️ [bold]Profile Images:[/bold]", results['images'], row_limit, full)
+    _print_section(console, "🧬 [bold]Images Seen Before:[/bold]",
+                   [f"{m['image']} ≈ {m['match']} ({m['username']}, distance {m['distance']})"
+                    for m in results.get('image_matches', [])], row_limit, full)
+    _print_section(console, "🔗 [bold]Related Links:[/bold]", results['links'], row_limit, full)
+    _print_section(console, "📧 [bold]Email Checks:[/bold]", results['emails'], row_limit, full)
+    _print_section(console, "⏸️ [bold]Deferred Checks:[/bold]", results.get('deferred', []), row_limit, full)
     
-    # Links
-    if results['links']:
-        console.print("\n🔗 [bold]Related Links:[/bold]")
-        for link in results['links'][:10]:  # Show first 10 links
-            console.print(f"  • {link}")
-        if len(results['links']) > 10:
-            console.print(f"  ... and {len(results['links']) - 10} more")
-    
-    # Emails
-    if results['emails']:
-        console.print("\n📧 [bold]Email Checks:[/bold]")
-        for email in results['emails']:
-            console.print(f"  • {email}")
-    
-    # Tool Reports
+    # Tool Reports (only present when --raw was requested)
     for tool in ['maigret', 'sherlock', 'holehe']:
-        if f'{tool}_output' in results and results[f'{tool}_output']:
-            console.print(f"\n🔍 [bold]{tool.title()} Report:[/bold]")
-            console.print(Panel(results[f'{tool}_output'], title=f"{tool.title()} Output", title_align="left"))
+        output = results.get(f'{tool}_output')
+        if not output:
+            continue
+        if not full and len(output) > MAX_PANEL_CHARS:
+            output = output[:MAX_PANEL_CHARS] + f"\n... truncated {len(output) - MAX_PANEL_CHARS} chars (use --full)"
+        console.print(f"\n🔍 [bold]{tool.title()} Report:[/bold]")
+        console.print(Panel(Text(output), title=f"{tool.title()} Output", title_align="left"))
     
     # Generate search queries
     generate_search_queries(console, username)
@@ -299,11 +368,86 @@ def check_dependencies():
         console.print("[cyan]pip install maigret sherlock holehe[/cyan]")
         console.print("[yellow]Some features will be limited without these tools.[/yellow]\n")
 
+# Per-process state for batch workers
+_worker_session = None
+
+def results_json(username, results):
+    """One JSON line per scan: the normalized record plus image matches, deferred checks and any raw tool output"""
+    record = ScanRecord.from_advanced(username, results).to_dict()
+    record.update((key, value) for key, value in results.items()
+                  if key.endswith('_output') or key in ('image_matches', 'deferred'))
+    return json.dumps(record)
+
+def _init_worker():
+    """Give each pool process its own HTTP session"""
+    global _worker_session
+    _worker_session = requests.Session()
+
+def _scan_worker(task):
+    """Scan one username in a pool process, rendering output there too.
+
+    The progress bar is disabled because its redraw frames would be
+    captured in the buffer, and a failure becomes an error block so the
+    rest of the batch still prints.
+    """
+    username, json_output, color, keep_raw, display_options = task
+    buffer = io.StringIO()
+    console = Console(file=buffer, force_terminal=color, width=120)
+    try:
+        results = search_username(username, console=console, display=not json_output, session=_worker_session,
+                                  keep_raw=keep_raw, display_options=display_options, show_progress=False)
+    except Exception as e:
+        if json_output:
+            return json.dumps({'username': username, 'error': f"{type(e).__name__}: {e}"})
+        console.print(f"[bold red]Scan failed for {username}: {type(e).__name__}: {e}[/bold red]")
+        return buffer.getvalue()
+    if json_output:
+        return results_json(username, results)
+    return buffer.getvalue()
+
+def search_usernames_batch(usernames, workers=None, json_output=False, keep_raw=False, display_options=None):
+    """Scan many usernames across a process pool, printing results in input order"""
+    workers = workers or os.cpu_count() or 1
+    color = sys.stdout.isatty()
+    # Paging makes no sense for output rendered into a buffer
+    display_options = dict(display_options or {}, page=False)
+    tasks = [(u, json_output, color, keep_raw, display_options) for u in usernames]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        # map() yields in submission order while the pool works ahead
+        for rendered in executor.map(_scan_worker, tasks):
+            sys.stdout.write(rendered + ("\n" if json_output else ""))
+            sys.stdout.flush()
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        username = sys.argv[1]
-        check_dependencies()
-        search_username(username)
+    parser = argparse.ArgumentParser(description="Advanced username OSINT scan")
+    parser.add_argument("username", nargs="?", help="username to scan")
+    parser.add_argument("--json", action="store_true", help="print results as JSON instead of Rich output")
+    parser.add_argument("--batch", metavar="FILE", help="scan every username in FILE (one per line)")
+    parser.add_argument("--workers", type=int, default=None, help="batch worker processes (default: CPU count)")
+    parser.add_argument("--raw", action="store_true", help="keep raw Maigret/Sherlock/Holehe output in the results")
+    parser.add_argument("--full", action="store_true", help="show every row and the untruncated raw output")
+    parser.add_argument("--limit", type=int, default=DEFAULT_ROW_LIMIT, help="rows shown per section")
+    parser.add_argument("--page", action="store_true", help="open detailed sections in a pager")
+    args = parser.parse_args()
+    display_options = {'row_limit': args.limit, 'full': args.full, 'page': args.page}
+
+    if args.batch:
+        with open(args.batch, encoding='utf-8') as f:
+            usernames = list(dict.fromkeys(line.strip() for line in f if line.strip() and not line.startswith('#')))
+        if not args.json:
+            check_dependencies()
+        search_usernames_batch(usernames, workers=args.workers, json_output=args.json, keep_raw=args.raw,
+                               display_options=display_options)
+    elif args.username:
+        if args.json:
+            # Machine-readable mode: progress goes to stderr, results to stdout
+            results = search_username(args.username, console=Console(stderr=True), display=False, keep_raw=args.raw)
+            print(results_json(args.username, results))
+        else:
+            check_dependencies()
+            search_username(args.username, keep_raw=args.raw, display_options=display_options)
     else:
-        print("Usage: python advanced_scanner.py <username>")
+        print("Usage: python advanced_scanner.py <username> [--json]")
+        print("       python advanced_scanner.py --batch <file> [--workers N] [--json]")
         print("Example: python advanced_scanner.py john_doe")
\ No newline at end of file
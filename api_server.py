@@ -0,0 +1,248 @@
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import itertools
+from collections import deque
+
+from aiohttp import web
+
+from coordinator import execute_command, FINISHED_TTL, MAX_FINISHED
+from scan_planner import MAX_CONCURRENT_SCANS
+from batch_jobs import CPP_COMMANDS, PYTHON_COMMANDS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8780
+JOB_TIMEOUT = 180
+
+# The terminal module whose coordinator client, scan slots and result saving
+# jobs use; serve() sets it so `terminal.py --api` can hand over itself
+# (__main__) instead of this module importing a second copy of terminal
+shell = None
+
+
+def execute_job(command, target):
+    """Run one scan under the terminal's shared concurrency limit and save it"""
+    if shell.coordinator_client is not None:
+        with shell.scan_slots:
+            result = shell.run_remote(command, target, JOB_TIMEOUT)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr or f"remote {command} failed")
+        output = result.stdout.strip()
+    else:
+        # Takes its slot from the same semaphore around the scanner process
+        output = execute_command(command, target, timeout=JOB_TIMEOUT)
+    filename = shell.save_and_link("api", command, target, output)
+    return output, str(filename) if filename else None
+
+
+class JobManager:
+    """Priority queue of API jobs drained by a fixed number of runner tasks.
+
+    Finished jobs are kept for FINISHED_TTL seconds, at most MAX_FINISHED
+    of them; after that the job endpoints answer 404 as for an unknown job.
+    """
+
+    def __init__(self, concurrency, finished_ttl=FINISHED_TTL, max_finished=MAX_FINISHED):
+        self.concurrency = concurrency
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self.jobs = {}
+        self.finished = deque()
+        self.queue = asyncio.PriorityQueue()
+        self.order = itertools.count()
+        self.watchers = {}
+        self.subscribers = set()
+        self.runners = []
+
+    def start(self):
+        self.runners = [asyncio.ensure_future(self._runner()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for runner in self.runners:
+            runner.cancel()
+        await asyncio.gather(*self.runners, return_exceptions=True)
+
+    def evict(self):
+        """Drop finished jobs past their TTL or beyond the cap, oldest first"""
+        now = time.time()
+        while self.finished and (len(self.finished) > self.max_finished or
+                                 self.jobs[self.finished[0]]['finished'] < now - self.finished_ttl):
+            job_id = self.finished.popleft()
+            del self.jobs[job_id]
+            self.watchers.pop(job_id, None)
+
+    def submit(self, command, target, priority=0):
+        self.evict()
+        job_id = uuid.uuid4().hex[:12]
+        self.jobs[job_id] = {
+            'job_id': job_id,
+            'command': command,
+            'target': target,
+            'priority': priority,
+            'status': 'queued',
+            'submitted': time.time(),
+            'output': None,
+            'error': None,
+            'saved_to': None,
+        }
+        # Higher priority first, then submission order
+        self.queue.put_nowait((-priority, next(self.order), job_id))
+        self._publish(job_id)
+        return self.jobs[job_id]
+
+    def _publish(self, job_id):
+        snapshot = dict(self.jobs[job_id])
+        for queue in list(self.watchers.get(job_id, ())) + list(self.subscribers):
+            queue.put_nowait(snapshot)
+
+    def watch(self, job_id):
+        queue = asyncio.Queue()
+        self.watchers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unwatch(self, job_id, queue):
+        watchers = self.watchers.get(job_id)
+        if watchers is not None:
+            watchers.discard(queue)
+            if not watchers:
+                del self.watchers[job_id]
+
+    async def _runner(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            _, _, job_id = await self.queue.get()
+            job = self.jobs[job_id]
+            job['status'] = 'running'
+            job['started'] = time.time()
+            self._publish(job_id)
+            try:
+                job['output'], job['saved_to'] = await loop.run_in_executor(
+                    None, execute_job, job['command'], job['target'])
+                job['status'] = 'done'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            job['finished'] = time.time()
+            self.finished.append(job_id)
+            self._publish(job_id)
+            self.evict()
+
+
+def _summary(job):
+    return {k: v for k, v in job.items() if k != 'output'}
+
+
+async def create_job(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({'error': 'invalid JSON'}, status=400)
+
+    command = str(body.get('command', '')).lower()
+    target = str(body.get('target', '')).strip()
+    try:
+        priority = int(body.get('priority', 0))
+    except (TypeError, ValueError):
+        return web.json_response({'error': 'priority must be an integer'}, status=400)
+    if command not in CPP_COMMANDS + PYTHON_COMMANDS or not target:
+        return web.json_response({'error': 'valid command and target required',
+                                  'commands': CPP_COMMANDS + PYTHON_COMMANDS}, status=400)
+
+    job = request.app['manager'].submit(command, target, priority)
+    return web.json_response(_summary(job), status=202)
+
+
+async def list_jobs(request):
+    manager = request.app['manager']
+    manager.evict()
+    return web.json_response([_summary(job) for job in manager.jobs.values()])
+
+
+async def get_job(request):
+    manager = request.app['manager']
+    manager.evict()
+    job = manager.jobs.get(request.match_info['job_id'])
+    if job is None:
+        return web.json_response({'error': 'unknown or expired job'}, status=404)
+    return web.json_response(job)
+
+
+async def _stream(request, queue, first=None, until_done=False):
+    """Write NDJSON job snapshots to the client as they are published"""
+    response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+    await response.prepare(request)
+    if first is not None:
+        await response.write((json.dumps(first) + "\n").encode('utf-8'))
+        if until_done and first['status'] in ('done', 'failed'):
+            return response
+    while True:
+        job = await queue.get()
+        await response.write((json.dumps(job) + "\n").encode('utf-8'))
+        if until_done and job['status'] in ('done', 'failed'):
+            return response
+
+
+async def stream_job(request):
+    manager = request.app['manager']
+    job_id = request.match_info['job_id']
+    manager.evict()
+    if job_id not in manager.jobs:
+        return web.json_response({'error': 'unknown or expired job'}, status=404)
+    queue = manager.watch(job_id)
+    try:
+        return await _stream(request, queue, dict(manager.jobs[job_id]), until_done=True)
+    finally:
+        manager.unwatch(job_id, queue)
+
+
+async def stream_events(request):
+    manager = request.app['manager']
+    queue = asyncio.Queue()
+    manager.subscribers.add(queue)
+    try:
+        return await _stream(request, queue)
+    finally:
+        manager.subscribers.discard(queue)
+
+
+def create_app(concurrency=None):
+    """Build the aiohttp application; the job runners start with the app"""
+    app = web.Application()
+
+    async def on_startup(app):
+        app['manager'] = JobManager(concurrency or MAX_CONCURRENT_SCANS)
+        app['manager'].start()
+
+    async def on_cleanup(app):
+        await app['manager'].stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post('/jobs', create_job)
+    app.router.add_get('/jobs', list_jobs)
+    app.router.add_get('/jobs/{job_id}', get_job)
+    app.router.add_get('/jobs/{job_id}/stream', stream_job)
+    app.router.add_get('/events', stream_events)
+    return app
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, terminal=None):
+    """Run the job API until interrupted, sharing state with an already configured terminal module"""
+    global shell
+    if terminal is None:
+        import terminal
+        terminal.configure_coordinator()
+    shell = terminal
+    shell.console.print(f"[bold green]weThink OSINT API listening on http://{host}:{port}[/] "
+                        f"(max {MAX_CONCURRENT_SCANS} concurrent scans)")
+    web.run_app(create_app(), host=host, port=port, print=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="weThink OSINT HTTP job API")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,190 @@
+import os
+import json
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from scan_planner import run_cpp, run_advanced
+
+JOBS_DIR = Path("osint_results") / "jobs"
+DEFAULT_WORKERS = 4
+
+CPP_COMMANDS = ["dlkp", "wbck", "ghub", "rddt", "iplc", "whis", "ssll", "embp", "btcn", "hnws", "sovf", "fscn", "wprb"]
+PYTHON_COMMANDS = ["adv", "wtnk"]
+
+
+def run_job_command(command, target):
+    """Execute a single batch item and return its text output"""
+    if command in PYTHON_COMMANDS:
+        return json.dumps(run_advanced(target), indent=2)
+    if command in CPP_COMMANDS:
+        return run_cpp(command, target)
+    raise ValueError(f"Unsupported batch command: {command}")
+
+
+class BatchJob:
+    """A batch of targets backed by an append-only progress journal.
+
+    Every state change (started, done, failed) is appended and fsynced
+    before the next one, so after a crash the journal replays to exactly
+    which targets finished. Targets left 'started' are redone on resume.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.path = JOBS_DIR / job_id
+        self.journal_path = self.path / "journal.jsonl"
+        self._lock = threading.Lock()
+        with open(self.path / "job.json", encoding='utf-8') as f:
+            self.meta = json.load(f)
+        with open(self.path / "targets.txt", encoding='utf-8') as f:
+            self.targets = [line.strip() for line in f if line.strip()]
+        self._repair_journal()
+
+    def _repair_journal(self):
+        # A crash mid-write can leave a partial last line; terminate it so
+        # the next appended entry starts on a line of its own
+        if not self.journal_path.exists() or self.journal_path.stat().st_size == 0:
+            return
+        with open(self.journal_path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    @classmethod
+    def create(cls, command, targets):
+        """Create a new job directory from a command and target list"""
+        job_id = f"{command}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        path = JOBS_DIR / job_id
+        path.mkdir(parents=True, exist_ok=True)
+        targets = list(dict.fromkeys(t.strip() for t in targets if t.strip()))
+        with open(path / "targets.txt", 'w', encoding='utf-8') as f:
+            f.write("\n".join(targets) + "\n")
+        with open(path / "job.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'job_id': job_id,
+                'command': command,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'total': len(targets),
+            }, f, indent=2)
+        return cls(job_id)
+
+    @classmethod
+    def list_jobs(cls):
+        """All readable jobs on disk, oldest first"""
+        if not JOBS_DIR.exists():
+            return []
+        jobs = []
+        for p in sorted(JOBS_DIR.iterdir()):
+            if not (p / "job.json").exists():
+                continue
+            try:
+                jobs.append(cls(p.name))
+            except (OSError, ValueError):
+                continue
+        return jobs
+
+    @property
+    def command(self):
+        return self.meta['command']
+
+    def states(self):
+        """Replay the journal into the latest state per target"""
+        states = {}
+        if not self.journal_path.exists():
+            return states
+        with open(self.journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn final write from a crash
+                states[entry['target']] = entry
+        return states
+
+    def counts(self):
+        """Number of targets per state, including never-started ones as pending"""
+        states = self.states()
+        counts = {'done': 0, 'failed': 0, 'in-flight': 0, 'pending': 0}
+        for target in self.targets:
+            state = states.get(target, {}).get('state')
+            if state == 'done':
+                counts['done'] += 1
+            elif state == 'failed':
+                counts['failed'] += 1
+            elif state == 'started':
+                counts['in-flight'] += 1
+            else:
+                counts['pending'] += 1
+        return counts
+
+    def _record(self, target, state, **extra):
+        entry = dict(target=target, state=state, ts=datetime.now().isoformat(timespec='seconds'), **extra)
+        with self._lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remaining(self, retry_failed=False):
+        """Targets still to run; failed ones only when retrying"""
+        states = self.states()
+        todo = []
+        for target in self.targets:
+            state = states.get(target, {}).get('state')
+            if state == 'done':
+                continue
+            if state == 'failed' and not retry_failed:
+                continue
+            todo.append(target)
+        return todo
+
+    def failed(self):
+        states = self.states()
+        return [t for t in self.targets if states.get(t, {}).get('state') == 'failed']
+
+    def run(self, workers=DEFAULT_WORKERS, retry_failed=False, only=None, save=None, on_event=None,
+            stop_event=None):
+        """Run remaining targets, journaling each transition.
+
+        `save(command, target, output)` may persist the output and return a
+        path, which is journaled with the 'done' entry. Setting `stop_event`
+        stops new submissions; in-flight items finish and are recorded.
+        """
+        on_event = on_event or (lambda event, **data: None)
+        todo = only if only is not None else self.remaining(retry_failed)
+        todo = iter(todo)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+
+            def submit_next():
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                target = next(todo, None)
+                if target is None:
+                    return False
+                self._record(target, 'started')
+                on_event('start', job=self.job_id, target=target)
+                pending[executor.submit(run_job_command, self.command, target)] = target
+                return True
+
+            while len(pending) < workers and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    target = pending.pop(future)
+                    try:
+                        output = future.result()
+                        saved_to = save(self.command, target, output) if save else None
+                        self._record(target, 'done', saved_to=str(saved_to) if saved_to else None)
+                        on_event('done', job=self.job_id, target=target, output=output)
+                    except Exception as e:
+                        self._record(target, 'failed', error=str(e))
+                        on_event('failed', job=self.job_id, target=target, error=str(e))
+                    submit_next()
+
+        return self.counts()
@@ -0,0 +1,232 @@
+import os
+import re
+import time
+import threading
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+
+from latency import run_timed
+
+# Outcomes older than this, or beyond the last WINDOW_CALLS, no longer count
+WINDOW_SECONDS = 120
+WINDOW_CALLS = 20
+# A host trips once at least MIN_CALLS recent calls failed at FAILURE_RATE or worse
+MIN_CALLS = 5
+FAILURE_RATE = 0.5
+COOLDOWN = float(os.environ.get("OSINT_BREAKER_COOLDOWN", 30))
+MAX_COOLDOWN = 300
+# Hosts open in the parent process, so scanner subprocesses skip them too
+OPEN_HOSTS_ENV = "OSINT_OPEN_HOSTS"
+# scanner.cpp reports curl failures as "Request failed (host): reason"
+FAILURE_PATTERN = re.compile(r'^Request failed \(([^)]+)\): (.*)$', re.MULTILINE)
+
+# The single upstream host each C++ command depends on. iplc answers from
+# the local geo table first and wtnk/wprb/fscn fan out to many hosts, so
+# those are never deferred as a whole; scanner.cpp skips open hosts itself.
+SCAN_HOSTS = {
+    'dlkp': 'dns.google',
+    'wbck': 'web.archive.org',
+    'ghub': 'api.github.com',
+    'rddt': 'www.reddit.com',
+    'ssll': 'crt.sh',
+    'embp': 'haveibeenpwned.com',
+    'btcn': 'blockstream.info',
+    'hnws': 'hacker-news.firebaseio.com',
+    'sovf': 'api.stackexchange.com',
+}
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a host whose breaker is open"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"{host} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state for one host.
+
+    Closed passes every call and trips open when recent calls fail too
+    often. Open refuses calls until the cooldown passes, then lets a
+    single trial through (half-open): success closes it again, failure
+    reopens it with the cooldown doubled.
+    """
+
+    def __init__(self, cooldown=COOLDOWN):
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=WINDOW_CALLS)
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.trial_at = None
+        self.totals = {'ok': 0, 'error': 0, 'timeout': 0}
+
+    def _prune(self, now):
+        while self.outcomes and self.outcomes[0][0] < now - WINDOW_SECONDS:
+            self.outcomes.popleft()
+
+    def _open(self, now, cooldown):
+        self.state = OPEN
+        self.opened_at = now
+        self.cooldown = min(cooldown, MAX_COOLDOWN)
+        self.trial_at = None
+
+    def retry_in(self, now):
+        return max(self.opened_at + self.cooldown - now, 0.0)
+
+    def allow(self, now):
+        if self.state == OPEN and self.retry_in(now) == 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            # One trial at a time; a trial that never reported back expires
+            if self.trial_at is not None and now - self.trial_at < self.cooldown:
+                return False
+            self.trial_at = now
+            return True
+        return self.state == CLOSED
+
+    def record(self, kind, now):
+        self.totals[kind] += 1
+        if self.state != CLOSED:
+            if kind == 'ok':
+                self.state = CLOSED
+                self.cooldown = self.base_cooldown
+                self.outcomes.clear()
+            elif self.state == HALF_OPEN:
+                self._open(now, self.cooldown * 2)
+            return
+        self.outcomes.append((now, kind))
+        self._prune(now)
+        failures = sum(1 for _, outcome in self.outcomes if outcome != 'ok')
+        if len(self.outcomes) >= MIN_CALLS and failures >= FAILURE_RATE * len(self.outcomes):
+            self._open(now, self.base_cooldown)
+
+    def recent(self, now):
+        """(calls, errors, timeouts) inside the window"""
+        self._prune(now)
+        kinds = [outcome for _, outcome in self.outcomes]
+        return len(kinds), kinds.count('error'), kinds.count('timeout')
+
+
+class BreakerBoard:
+    """Circuit breakers per host, shared by every scan in the process"""
+
+    def __init__(self, open_hosts=None):
+        self.breakers = {}
+        self._lock = threading.Lock()
+        if open_hosts is None:
+            open_hosts = os.environ.get(OPEN_HOSTS_ENV, '')
+        for host in filter(None, open_hosts.split(',')):
+            self._get(host)._open(time.monotonic(), COOLDOWN)
+
+    def _get(self, host):
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker()
+        return breaker
+
+    def check(self, host):
+        """Raise CircuitOpen unless a call to host may go ahead now"""
+        now = time.monotonic()
+        with self._lock:
+            breaker = self._get(host)
+            if not breaker.allow(now):
+                raise CircuitOpen(host, breaker.retry_in(now) or breaker.cooldown)
+
+    def is_open(self, host):
+        """True while host's cooldown is running; does not start a half-open trial"""
+        with self._lock:
+            breaker = self.breakers.get(host)
+            return breaker is not None and breaker.state == OPEN and breaker.retry_in(time.monotonic()) > 0
+
+    def record(self, host, kind):
+        """Report a call to host as 'ok', 'error' or 'timeout'"""
+        with self._lock:
+            self._get(host).record(kind, time.monotonic())
+
+    @contextmanager
+    def guarded(self, host, timeouts=(), errors=()):
+        """Check the breaker, run the block and record how it went.
+
+        The block may set outcome['kind'] = 'error' for an answer that
+        counts as a failure, such as a 5xx. Exceptions other than the
+        given timeout and error types mean the host did answer.
+        """
+        self.check(host)
+        outcome = {'kind': 'ok'}
+        try:
+            yield outcome
+        except timeouts:
+            self.record(host, 'timeout')
+            raise
+        except errors:
+            self.record(host, 'error')
+            raise
+        except Exception:
+            self.record(host, 'ok')
+            raise
+        self.record(host, outcome['kind'])
+
+    def record_output(self, stderr, host=None):
+        """Record failures a scanner subprocess reported, and success for host if it had none"""
+        failed = set()
+        for failed_host, reason in FAILURE_PATTERN.findall(stderr or ''):
+            failed.add(failed_host)
+            self.record(failed_host, 'timeout' if 'timeout' in reason.lower() or 'timed out' in reason.lower()
+                        else 'error')
+        if host and host not in failed:
+            self.record(host, 'ok')
+
+    def open_hosts(self):
+        with self._lock:
+            now = time.monotonic()
+            return sorted(host for host, breaker in self.breakers.items()
+                          if breaker.state == OPEN and breaker.retry_in(now) > 0)
+
+    def subprocess_env(self):
+        """Environment for a scanner subprocess carrying the open hosts"""
+        env = dict(os.environ)
+        env[OPEN_HOSTS_ENV] = ",".join(self.open_hosts())
+        return env
+
+    def snapshot(self):
+        """(host, state, calls, errors, timeouts, retry_in, totals) per host, worst first"""
+        now = time.monotonic()
+        with self._lock:
+            rows = []
+            for host, breaker in self.breakers.items():
+                if breaker.state == OPEN and breaker.retry_in(now) == 0:
+                    state = HALF_OPEN
+                else:
+                    state = breaker.state
+                rows.append((host, state, *breaker.recent(now), breaker.retry_in(now), dict(breaker.totals)))
+        order = {OPEN: 0, HALF_OPEN: 1, CLOSED: 2}
+        return sorted(rows, key=lambda row: (order[row[1]], -(row[3] + row[4]), row[0]))
+
+
+breakers = BreakerBoard()
+
+
+def run_scanner(command, args, timeout, **kwargs):
+    """Run a scanner subprocess behind the breaker of the host it depends on.
+
+    Raises CircuitOpen without starting the process when that host is
+    open. The child gets the open hosts in OSINT_OPEN_HOSTS, and the
+    failures it reports on stderr are fed back into the breakers.
+    """
+    host = SCAN_HOSTS.get(command.lower())
+    if host:
+        breakers.check(host)
+    try:
+        result = run_timed(f"scanner:{command}", args, timeout, env=breakers.subprocess_env(), **kwargs)
+    except subprocess.TimeoutExpired:
+        if host:
+            breakers.record(host, 'timeout')
+        raise
+    breakers.record_output(result.stderr if isinstance(result.stderr, str) else None, host)
+    return result
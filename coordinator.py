@@ -0,0 +1,346 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import argparse
+import threading
+import subprocess
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+from scan_planner import run_cpp, scan_slots
+from circuit_breaker import run_scanner
+from batch_jobs import CPP_COMMANDS, PYTHON_COMMANDS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8750
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 1.0
+# Finished jobs (and their outputs) are dropped after this long, or oldest
+# first once there are more than MAX_FINISHED; a client then sees 404
+FINISHED_TTL = int(os.environ.get("OSINT_JOB_TTL", 3600))
+MAX_FINISHED = 1000
+
+
+class JobExpired(LookupError):
+    """The coordinator no longer has the job: evicted after finishing, or restarted"""
+
+
+def execute_command(command, target, timeout=180):
+    """Run a scan exactly as the interactive terminal would and return its output"""
+    if command in PYTHON_COMMANDS:
+        with scan_slots:
+            result = run_scanner("advanced", [sys.executable, "advanced_scanner.py", target], timeout,
+                                 capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"advanced scanner exited with code {result.returncode}")
+        return result.stdout.strip()
+    if command in CPP_COMMANDS:
+        return run_cpp(command, target, timeout=timeout)
+    raise ValueError(f"Unsupported command: {command}")
+
+
+class JobQueue:
+    """In-memory job table with leases.
+
+    A worker leases the oldest queued job for LEASE_SECONDS and must
+    heartbeat before the lease runs out. Expired leases go back on the
+    queue, up to MAX_ATTEMPTS, so a dead worker never loses a job.
+    Finished jobs are kept for FINISHED_TTL seconds, at most MAX_FINISHED
+    of them, so a long-running coordinator does not grow without bound.
+    """
+
+    def __init__(self, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, finished_ttl=FINISHED_TTL,
+                 max_finished=MAX_FINISHED):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self.jobs = {}
+        self.queue = deque()
+        self.finished = deque()
+        self.workers = {}
+        self._lock = threading.Lock()
+
+    def _finish(self, job, now):
+        job['finished'] = now
+        self.finished.append(job['job_id'])
+
+    def _evict(self, now):
+        while self.finished and (len(self.finished) > self.max_finished or
+                                 self.jobs[self.finished[0]]['finished'] < now - self.finished_ttl):
+            del self.jobs[self.finished.popleft()]
+
+    def submit(self, command, target):
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._evict(time.time())
+            self.jobs[job_id] = {
+                'job_id': job_id,
+                'command': command,
+                'target': target,
+                'status': 'queued',
+                'attempts': 0,
+                'worker': None,
+                'lease_expires': None,
+                'submitted': time.time(),
+                'output': None,
+                'error': None,
+            }
+            self.queue.append(job_id)
+        return job_id
+
+    def _expire_leases(self, now):
+        for job in self.jobs.values():
+            if job['status'] != 'leased' or job['lease_expires'] > now:
+                continue
+            if job['attempts'] >= self.max_attempts:
+                job['status'] = 'failed'
+                job['error'] = f"lease expired {job['attempts']} times"
+                self._finish(job, now)
+            else:
+                job['status'] = 'queued'
+                job['worker'] = None
+                self.queue.appendleft(job['job_id'])
+
+    def lease(self, worker_id):
+        now = time.time()
+        with self._lock:
+            self.workers[worker_id] = now
+            self._expire_leases(now)
+            while self.queue:
+                job = self.jobs.get(self.queue.popleft())
+                if job is None or job['status'] != 'queued':
+                    continue
+                job['status'] = 'leased'
+                job['worker'] = worker_id
+                job['attempts'] += 1
+                job['lease_expires'] = now + self.lease_seconds
+                # Workers pace their heartbeats by this, whatever --lease the coordinator runs with
+                return dict(job, lease_seconds=self.lease_seconds)
+        return None
+
+    def heartbeat(self, worker_id, job_id):
+        now = time.time()
+        with self._lock:
+            self.workers[worker_id] = now
+            job = self.jobs.get(job_id)
+            if not job or job['status'] != 'leased' or job['worker'] != worker_id:
+                return False
+            job['lease_expires'] = now + self.lease_seconds
+            return True
+
+    def complete(self, worker_id, job_id, output=None, error=None):
+        with self._lock:
+            self.workers[worker_id] = time.time()
+            job = self.jobs.get(job_id)
+            if not job or job['worker'] != worker_id or job['status'] != 'leased':
+                return False  # Lease was lost and the job handed to someone else
+            job['status'] = 'failed' if error else 'done'
+            job['output'] = output
+            job['error'] = error
+            self._finish(job, time.time())
+            return True
+
+    def get(self, job_id):
+        now = time.time()
+        with self._lock:
+            self._expire_leases(now)
+            self._evict(now)
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return {'jobs': counts, 'workers': {w: round(time.time() - t, 1) for w, t in self.workers.items()}}
+
+
+class CoordinatorHandler(BaseHTTPRequestHandler):
+    """JSON-over-HTTP endpoints for clients and workers"""
+
+    job_queue = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/status":
+            return self._send(200, self.job_queue.stats())
+        if self.path.startswith("/jobs/"):
+            job = self.job_queue.get(self.path[len("/jobs/"):])
+            return self._send(200, job) if job else self._send(404, {'error': 'unknown or expired job'})
+        self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        try:
+            body = self._body()
+        except ValueError:
+            return self._send(400, {'error': 'invalid JSON'})
+
+        if self.path == "/jobs":
+            command = str(body.get('command', '')).lower()
+            target = str(body.get('target', ''))
+            if command not in CPP_COMMANDS + PYTHON_COMMANDS or not target:
+                return self._send(400, {'error': 'command and target required'})
+            return self._send(201, {'job_id': self.job_queue.submit(command, target)})
+
+        if self.path == "/lease":
+            job = self.job_queue.lease(body.get('worker_id', 'anonymous'))
+            return self._send(200, job) if job else self._send(204)
+
+        if self.path == "/heartbeat":
+            ok = self.job_queue.heartbeat(body.get('worker_id'), body.get('job_id'))
+            return self._send(200 if ok else 410, {'ok': ok})
+
+        if self.path == "/result":
+            ok = self.job_queue.complete(body.get('worker_id'), body.get('job_id'),
+                                         body.get('output'), body.get('error'))
+            return self._send(200 if ok else 410, {'ok': ok})
+
+        self._send(404, {'error': 'not found'})
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, lease_seconds=LEASE_SECONDS):
+    """Run the coordinator until interrupted"""
+    CoordinatorHandler.job_queue = JobQueue(lease_seconds=lease_seconds)
+    server = ThreadingHTTPServer((host, port), CoordinatorHandler)
+    print(f"Coordinator listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class CoordinatorClient:
+    """Submit jobs to a coordinator and wait for their results"""
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.session = requests.Session()
+
+    def submit(self, command, target):
+        r = self.session.post(f"{self.url}/jobs", json={'command': command, 'target': target}, timeout=10)
+        r.raise_for_status()
+        return r.json()['job_id']
+
+    def get(self, job_id):
+        """The job record; raises JobExpired once the coordinator has dropped it"""
+        r = self.session.get(f"{self.url}/jobs/{job_id}", timeout=10)
+        if r.status_code == 404:
+            raise JobExpired(f"remote job {job_id} expired or unknown to the coordinator")
+        r.raise_for_status()
+        return r.json()
+
+    def wait(self, job_id, timeout=None, poll_interval=POLL_INTERVAL):
+        """Poll until the job is done or failed; returns the job record"""
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            job = self.get(job_id)
+            if job['status'] in ('done', 'failed'):
+                return job
+            if deadline and time.time() > deadline:
+                raise TimeoutError(f"remote job {job_id} still {job['status']}")
+            time.sleep(poll_interval)
+
+
+def run_worker(url, worker_id=None, poll_interval=POLL_INTERVAL):
+    """Lease jobs from the coordinator, run them and upload results, forever"""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    session = requests.Session()
+    url = url.rstrip('/')
+    print(f"Worker {worker_id} polling {url}")
+
+    while True:
+        try:
+            r = session.post(f"{url}/lease", json={'worker_id': worker_id}, timeout=10)
+        except requests.RequestException as e:
+            print(f"Coordinator unreachable: {e}")
+            time.sleep(poll_interval * 5)
+            continue
+        if r.status_code == 204:
+            time.sleep(poll_interval)
+            continue
+        job = r.json()
+
+        # Keep the lease alive while the scan runs
+        stop = threading.Event()
+        interval = job.get('lease_seconds', LEASE_SECONDS) / 3
+
+        def heartbeat():
+            while not stop.wait(interval):
+                try:
+                    session.post(f"{url}/heartbeat", json={'worker_id': worker_id, 'job_id': job['job_id']},
+                                 timeout=min(10, interval))
+                except requests.RequestException:
+                    pass
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        output = error = None
+        try:
+            output = execute_command(job['command'], job['target'])
+        except Exception as e:
+            error = str(e)
+        finally:
+            stop.set()
+
+        try:
+            session.post(f"{url}/result", timeout=30, json={
+                'worker_id': worker_id, 'job_id': job['job_id'], 'output': output, 'error': error})
+        except requests.RequestException as e:
+            print(f"Could not upload result for {job['job_id']}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed scan coordinator and worker")
+    sub = parser.add_subparsers(dest="mode")
+    serve_parser = sub.add_parser("serve", help="run the coordinator")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--lease", type=int, default=LEASE_SECONDS, help="lease length in seconds")
+    worker_parser = sub.add_parser("worker", help="run scan workers")
+    worker_parser.add_argument("--coordinator", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    worker_parser.add_argument("--processes", type=int, default=1, help="worker processes to start on this host")
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        serve(args.host, args.port, args.lease)
+    elif args.mode == "worker":
+        if args.processes > 1:
+            children = [subprocess.Popen([sys.executable, __file__, "worker", "--coordinator", args.coordinator])
+                        for _ in range(args.processes)]
+            try:
+                for child in children:
+                    child.wait()
+            except KeyboardInterrupt:
+                for child in children:
+                    child.terminate()
+        else:
+            try:
+                run_worker(args.coordinator)
+            except KeyboardInterrupt:
+                pass
+    else:
+        parser.print_help()
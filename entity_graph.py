@@ -0,0 +1,422 @@
+import re
+import sys
+import sqlite3
+import argparse
+import threading
+import ipaddress
+from pathlib import Path
+from datetime import datetime
+
+from records import ScanRecord
+from scan_planner import extract_linked_domains
+from batch_jobs import PYTHON_COMMANDS
+from search_index import RESULTS_DIR, parse_result_file
+
+GRAPH_PATH = Path("osint_results") / "entity_graph.db"
+DEFAULT_DEPTH = 2
+# Traversals stop adding entities past this many, so hubs stay interactive
+DEFAULT_LIMIT = 500
+# SQLite's default limit on bound parameters is 999
+CHUNK = 900
+
+# Entity type of the target each command is run against
+TARGET_TYPES = {
+    'dlkp': 'domain', 'whis': 'domain', 'ssll': 'domain', 'wbck': 'domain', 'fscn': 'domain', 'sres': 'domain',
+    'iplc': 'ip',
+    'embp': 'email',
+    'btcn': 'btc',
+    'wtnk': 'username', 'wprb': 'username', 'ghub': 'username', 'rddt': 'username', 'hnws': 'username',
+    'sovf': 'username', 'ascn': 'username', 'adv': 'username', 'advanced': 'username',
+}
+
+# Per-section headers in multi-target C++ output ("🌐 DNS Lookup for: example.com")
+SUBJECT_PATTERN = re.compile(r'(Lookup for|Location for|Certificates for|Check for): (\S+)')
+SUBJECT_TYPES = {'Location for': 'ip', 'Check for': 'email'}
+# Labelled C++ output lines -> (entity type, relation from the section's subject)
+LABELLED_LINES = [
+    ("🏢 Registrar: ", 'org', 'registered_with'),
+    ("🖥️ Name Server: ", 'domain', 'name_server'),
+    ("🏢 ISP: ", 'org', 'hosted_by'),
+    ("📛 Common Name: ", 'certificate', 'certificate'),
+    ("💥 ", 'breach', 'breached_in'),
+    ("  🔗 ", 'domain', 'subdomain'),
+]
+# dlkp answers: record type -> (entity type, relation)
+DNS_ANSWERS = {
+    'A': ('ip', 'resolves_to'),
+    'AAAA': ('ip', 'resolves_to'),
+    'CNAME': ('domain', 'alias_of'),
+    'NS': ('domain', 'name_server'),
+    'MX': ('domain', 'mail_server'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    value TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    UNIQUE (type, value)
+);
+-- The primary key and edges_by_dst are the adjacency indexes: neighbours of
+-- one entity, optionally of one type, are a single index range either way
+CREATE TABLE IF NOT EXISTS edges (
+    src INTEGER NOT NULL,
+    dst_type TEXT NOT NULL,
+    dst INTEGER NOT NULL,
+    src_type TEXT NOT NULL,
+    relation TEXT NOT NULL,
+    via TEXT NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 1,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (src, dst_type, dst, relation)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_by_dst ON edges (dst, src_type, src);
+-- Saved result files already merged, so sync() never counts one twice
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY
+);
+"""
+
+
+def normalize(kind, value):
+    """Canonical form of an entity value, or '' if it is not usable"""
+    value = value.strip().rstrip('.')
+    if not value or value == 'N/A':
+        return ''
+    if kind in ('domain', 'email'):
+        value = value.lower()
+    if kind == 'domain' and value.startswith('www.'):
+        value = value[4:]
+    if kind == 'ip':
+        try:
+            value = str(ipaddress.ip_address(value))
+        except ValueError:
+            return ''
+    return value
+
+
+def guess_type(text):
+    """Entity type for a bare value typed at the prompt; 'type:value' picks it explicitly"""
+    kind, sep, value = text.partition(':')
+    if sep and kind in set(TARGET_TYPES.values()) | {'org', 'certificate', 'breach', 'profile'} \
+            and not value.startswith('//'):
+        return kind, value
+    if text.startswith(('http://', 'https://')):
+        return 'profile', text
+    if '@' in text:
+        return 'email', text
+    try:
+        ipaddress.ip_address(text)
+        return 'ip', text
+    except ValueError:
+        pass
+    return ('domain', text) if '.' in text else ('username', text)
+
+
+def record_links(record):
+    """(subject, (type, value), relation) links found in one normalized scan record"""
+    target_type = TARGET_TYPES.get(record.command, 'username' if record.kind == 'python' else 'domain')
+    seed = (target_type, record.target)
+    links = []
+
+    for profile in record.profiles:
+        links.append((seed, ('profile', profile.url), 'has_profile'))
+        if profile.username and profile.username != record.target:
+            links.append((('profile', profile.url), ('username', profile.username), 'belongs_to'))
+    for email in record.emails:
+        links.append((seed, ('email', email), 'mentions'))
+    if target_type == 'username':
+        for domain in extract_linked_domains({'links': record.links}, record.target):
+            links.append((seed, domain, 'links_to'))
+
+    if record.command == 'sres':
+        # "✅ www.example.com | 93.184.216.34, 2606:2800::1 (via cdn.example.net)"
+        for line in record.output.splitlines():
+            if not line.startswith("✅ ") or ' | ' not in line:
+                continue
+            name, addresses = line[2:].split(' | ', 1)
+            links.append((seed, ('domain', name), 'subdomain'))
+            for address in addresses.split(' (via ')[0].split(', '):
+                links.append((('domain', name), ('ip', address), 'resolves_to'))
+
+    if record.kind == 'cpp':
+        subject = seed
+        for line in record.output.splitlines():
+            header = SUBJECT_PATTERN.search(line)
+            if header:
+                subject = (SUBJECT_TYPES.get(header.group(1), 'domain'), header.group(2))
+                continue
+            parts = line.strip().split(' | ', 1)
+            if len(parts) == 2 and parts[0].startswith("📍 ") and parts[0][2:].strip() in DNS_ANSWERS:
+                kind, relation = DNS_ANSWERS[parts[0][2:].strip()]
+                value = parts[1].split()[-1] if parts[1].split() else ''
+                links.append((subject, (kind, value), relation))
+                continue
+            for prefix, kind, relation in LABELLED_LINES:
+                if line.startswith(prefix):
+                    links.append((subject, (kind, line[len(prefix):]), relation))
+                    break
+    return links
+
+
+def saved_records(text, path=None):
+    """ScanRecords for a result file written by save_scan_results.
+
+    The header's command says which scan wrote it (cpp_dlkp, batch_adv,
+    api_wtnk, advanced_python, resolve, plan_domain); plans hold one
+    record per successful scan. Files from anything else yield none.
+    """
+    saved_as, target, _, body = parse_result_file(text)
+    body = body.strip()
+    if saved_as == 'advanced_python':
+        return [ScanRecord.from_output('python', 'advanced', target, body, path)]
+    if saved_as == 'resolve':
+        return [ScanRecord.from_output('python', 'sres', target, body, path)]
+    prefix, _, command = saved_as.partition('_')
+    if prefix == 'plan':
+        return plan_records(body, path)
+    if prefix not in ('cpp', 'batch', 'api') or not command or not target:
+        return []
+    command = command.lower()
+    kind = 'python' if command in PYTHON_COMMANDS else 'cpp'
+    return [ScanRecord.from_output(kind, command, target, body, path)]
+
+
+def plan_records(text, path=None):
+    """ScanRecords for the successful scans in format_plan_results output"""
+    records = []
+    node = scan = None
+    lines = []
+
+    def flush():
+        if scan is not None:
+            output = "\n".join(lines)
+            kind = 'python' if output.startswith('{') else 'cpp'
+            records.append(ScanRecord.from_output(kind, scan, node[1], output, path))
+
+    for line in text.splitlines():
+        indent = len(line) - len(line.lstrip(' '))
+        # Scan output sits four spaces deeper than its node's "■ kind:value" line
+        if scan is not None and indent >= node[0] + 4:
+            lines.append(line[node[0] + 4:])
+            continue
+        flush()
+        scan = None
+        stripped = line.strip()
+        if stripped.startswith('■ '):
+            node = (indent, stripped[2:].split(' (from ')[0].partition(':')[2])
+        elif stripped.startswith('✓ ') and node is not None:
+            scan, lines = stripped[2:].split(' (')[0], []
+    flush()
+    return records
+
+
+class EntityGraph:
+    """Usernames, emails, domains, IPs and the rest, linked across every scan.
+
+    Each scan record is broken into (entity, relation, entity) links and
+    merged into SQLite, so the same email found by two scans of different
+    usernames becomes one node with two edges. Edges are stored once and
+    indexed from both ends by neighbour type, which keeps pivots and
+    bounded traversals to index range scans however large the graph gets.
+    sync() merges saved result files that never went through add_record,
+    such as those written before the graph existed.
+    """
+
+    def __init__(self, path=GRAPH_PATH):
+        self.path = path
+        self._conn = None
+        self._synced = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _entity_id(self, conn, kind, value, now):
+        conn.execute("INSERT INTO entities (type, value, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                     "ON CONFLICT (type, value) DO UPDATE SET last_seen = excluded.last_seen",
+                     (kind, value, now, now))
+        return conn.execute("SELECT id FROM entities WHERE type = ? AND value = ?", (kind, value)).fetchone()[0]
+
+    def add_links(self, links, via):
+        """Merge (subject, object, relation) links; returns how many were usable"""
+        now = datetime.now().isoformat(timespec='seconds')
+        added = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                ids = {}
+                for subject, obj, relation in links:
+                    ends = []
+                    for kind, value in (subject, obj):
+                        value = normalize(kind, value)
+                        if value and (kind, value) not in ids:
+                            ids[(kind, value)] = self._entity_id(conn, kind, value, now)
+                        ends.append((kind, value))
+                    (src_type, src), (dst_type, dst) = ends
+                    if not src or not dst or ends[0] == ends[1]:
+                        continue
+                    conn.execute(
+                        "INSERT INTO edges (src, dst_type, dst, src_type, relation, via, first_seen, last_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (src, dst_type, dst, relation) DO UPDATE SET "
+                        "seen = seen + 1, via = excluded.via, last_seen = excluded.last_seen",
+                        (ids[ends[0]], dst_type, ids[ends[1]], src_type, relation, via, now, now))
+                    added += 1
+        return added
+
+    def _mark_source(self, saved_to):
+        if saved_to:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute("INSERT OR IGNORE INTO sources (path) VALUES (?)", (str(saved_to),))
+
+    def add_record(self, record):
+        """Merge the entities of one ScanRecord, noting its result file as merged"""
+        added = self.add_links(record_links(record), f"{record.command} {record.target}")
+        self._mark_source(record.saved_to)
+        return added
+
+    def add_plan(self, plan, saved_to=None):
+        """Merge every scan of a ScanPlanner record"""
+        added = 0
+        for node in plan['nodes'].values():
+            for name, scan in node['scans'].items():
+                if scan['status'] != 'success':
+                    continue
+                if isinstance(scan['output'], dict):
+                    record = ScanRecord.from_advanced(node['value'], scan['output'], command=name)
+                else:
+                    record = ScanRecord.from_output('cpp', name, node['value'], scan['output'])
+                added += self.add_record(record)
+        self._mark_source(saved_to)
+        return added
+
+    def sync(self, results_dir=RESULTS_DIR):
+        """Merge saved result files the graph has not seen; returns (files, links)"""
+        with self._lock:
+            known = {path for (path,) in self._connect().execute("SELECT path FROM sources")}
+        files = links = 0
+        for filename in sorted(results_dir.glob("*.txt")):
+            if str(filename) in known:
+                continue
+            with open(filename, encoding='utf-8', errors='replace') as f:
+                for record in saved_records(f.read(), filename):
+                    links += self.add_links(record_links(record), f"{record.command} {record.target}")
+            self._mark_source(filename)
+            files += 1
+        self._synced = True
+        return files, links
+
+    def rebuild(self, results_dir=RESULTS_DIR):
+        """Drop everything and merge the results directory from scratch"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM edges")
+                conn.execute("DELETE FROM entities")
+                conn.execute("DELETE FROM sources")
+        return self.sync(results_dir)
+
+    def find(self, kind, value):
+        """(id, type, value) of an entity, or None"""
+        if not self._synced:
+            self.sync()
+        with self._lock:
+            return self._connect().execute("SELECT id, type, value FROM entities WHERE type = ? AND value = ?",
+                                           (kind, normalize(kind, value))).fetchone()
+
+    def _neighbours(self, conn, ids, types=None):
+        """(from id, relation, direction, neighbour id) for every edge touching ids"""
+        rows = []
+        for start in range(0, len(ids), CHUNK):
+            chunk = ids[start:start + CHUNK]
+            marks = ",".join("?" * len(chunk))
+            type_filter = f" AND dst_type IN ({','.join('?' * len(types))})" if types else ""
+            rows += conn.execute(f"SELECT src, relation, '->', dst FROM edges WHERE src IN ({marks}){type_filter}",
+                                 chunk + list(types or ())).fetchall()
+            type_filter = type_filter.replace("dst_type", "src_type")
+            rows += conn.execute(f"SELECT dst, relation, '<-', src FROM edges WHERE dst IN ({marks}){type_filter}",
+                                 chunk + list(types or ())).fetchall()
+        return rows
+
+    def neighbourhood(self, kind, value, depth=DEFAULT_DEPTH, limit=DEFAULT_LIMIT, types=None):
+        """Breadth-first walk from one entity.
+
+        Returns [(type, value, hops, relation, direction, parent value)] in
+        discovery order, starting with the entity itself at 0 hops, or None
+        if the entity is unknown. `types` limits which entity types are
+        followed; at most `limit` entities are returned.
+        """
+        start = self.find(kind, value)
+        if start is None:
+            return None
+        with self._lock:
+            conn = self._connect()
+            found = {start[0]: (start[1], start[2], 0, '', '', '')}
+            frontier = [start[0]]
+            for hops in range(1, depth + 1):
+                if not frontier or len(found) >= limit:
+                    break
+                discovered = []
+                for origin, relation, direction, other in self._neighbours(conn, frontier, types):
+                    if other in found or len(found) + len(discovered) >= limit:
+                        continue
+                    found[other] = (None, None, hops, relation, direction, found[origin][1])
+                    discovered.append(other)
+                for offset in range(0, len(discovered), CHUNK):
+                    chunk = discovered[offset:offset + CHUNK]
+                    query = f"SELECT id, type, value FROM entities WHERE id IN ({','.join('?' * len(chunk))})"
+                    for entity_id, entity_type, entity_value in conn.execute(query, chunk):
+                        found[entity_id] = (entity_type, entity_value) + found[entity_id][2:]
+                frontier = discovered
+        return list(found.values())
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            entities = dict(conn.execute("SELECT type, COUNT(*) FROM entities GROUP BY type").fetchall())
+            edges = conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+        return entities, edges
+
+
+entity_graph = EntityGraph()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pivot across entities found by earlier scans")
+    parser.add_argument("entity", nargs="?", help="username, email, domain, IP or type:value")
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--sync", action="store_true", help="merge saved results not yet in the graph")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the graph from every saved result")
+    args = parser.parse_args()
+
+    if args.sync or args.rebuild:
+        files, links = entity_graph.rebuild() if args.rebuild else entity_graph.sync()
+        print(f"Merged {links} links from {files} result files")
+        if not args.entity:
+            sys.exit(0)
+
+    if not args.entity:
+        entities, edges = entity_graph.stats()
+        print(f"{sum(entities.values())} entities, {edges} edges")
+        for kind, count in sorted(entities.items()):
+            print(f"  {kind:<12} {count}")
+        sys.exit(0)
+
+    rows = entity_graph.neighbourhood(*guess_type(args.entity), depth=args.depth, limit=args.limit)
+    if rows is None:
+        print(f"Unknown entity: {args.entity}")
+        sys.exit(1)
+    for kind, value, hops, relation, direction, parent in rows[1:]:
+        arrow = f"-[{relation}]->" if direction == '->' else f"<-[{relation}]-"
+        print(f"{'  ' * (hops - 1)}{parent} {arrow} {kind}:{value}")
@@ -0,0 +1,356 @@
+import os
+import re
+import csv
+import sys
+import json
+import mmap
+import socket
+import struct
+import argparse
+import ipaddress
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Shared with scanner.cpp, which memory-maps the same file (or OSINT_GEO_DB)
+GEO_DB_PATH = Path(os.environ.get("OSINT_GEO_DB", Path("osint_results") / "geo.bin"))
+
+# Layout, all little-endian:
+#   header   "OSINTGEO", version, range count, string table size, reserved (uint32 each)
+#   columns  COLUMNS arrays of `count` uint32 values, ranges sorted by start
+#   strings  NUL-terminated UTF-8; country/city/org columns hold offsets into it
+MAGIC = b"OSINTGEO"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")
+COLUMNS = ('start', 'end', 'country', 'city', 'asn', 'org')
+# IPv4 addresses as stored in IPv6 editions of the IP2Location CSVs (::ffff:0:0/96)
+IPV4_MAPPED = 0xFFFF00000000
+
+# Addresses or CIDR ranges anywhere in a line, so log files work as input; a
+# full stop may end the address ("closed by 1.2.3.5.") but not a fifth octet
+ADDRESS_PATTERN = re.compile(r'(?<![\d.])(\d{1,3}(?:\.\d{1,3}){3})(?:/(\d{1,2}))?(?!\.?\d)')
+BULK_CHUNK = 1 << 18
+# Wider CIDR ranges than this are refused unless asked for (a /16 is 65536 addresses)
+MIN_PREFIX = 16
+BULK_FIELDS = ('ip', 'country', 'city', 'asn', 'org')
+
+
+def _ipv4_number(value):
+    """IPv4 address as an int from an IP2Location number, or None for IPv6-only rows"""
+    number = int(value)
+    if IPV4_MAPPED <= number <= IPV4_MAPPED + 0xFFFFFFFF:
+        return number - IPV4_MAPPED
+    return number if number <= 0xFFFFFFFF else None
+
+
+def read_ip2location(path):
+    """(start, end, country, city) rows from an IP2Location LITE DB1/DB3/DB5/DB11 CSV"""
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        for row in csv.reader(f):
+            if len(row) < 4 or not row[0].isdigit():
+                continue
+            start, end = _ipv4_number(row[0]), _ipv4_number(row[1])
+            if start is None or end is None or row[2] == '-':
+                continue
+            yield start, end, row[3] or row[2], row[5] if len(row) > 5 and row[5] != '-' else ''
+
+
+def read_asn(path):
+    """(start, end, asn, org) rows from an IP2Location ASN CSV or a pyasn ipasn.dat file"""
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if not line.strip() or line.startswith((';', '#')):
+                continue
+            if '\t' in line:
+                # pyasn: "1.0.0.0/24<TAB>13335"
+                prefix, asn = line.split('\t')[:2]
+                network = ipaddress.ip_network(prefix.strip(), strict=False)
+                if network.version == 4 and asn.strip().isdigit():
+                    yield int(network.network_address), int(network.broadcast_address), int(asn), ''
+                continue
+            row = next(csv.reader([line]))
+            if len(row) < 5 or not row[0].isdigit() or not row[3].isdigit():
+                continue
+            start, end = _ipv4_number(row[0]), _ipv4_number(row[1])
+            if start is not None and end is not None:
+                yield start, end, int(row[3]), row[4] if row[4] != '-' else ''
+
+
+def _drain(flat, stack, pos, limit):
+    """Emit the innermost open range from pos up to limit; returns the next unemitted address"""
+    while stack and pos < limit:
+        top = stack[-1]
+        if top[1] >= pos:
+            end = min(top[1], limit - 1)
+            flat.append((pos, end) + top[2:])
+            pos = end + 1
+            if top[1] > end:
+                continue
+        stack.pop()
+    return pos
+
+
+def _flatten(rows):
+    """Sorted, non-overlapping ranges; where ranges nest the more specific one wins"""
+    flat = []
+    stack = []
+    pos = 0
+    for row in sorted(rows, key=lambda r: (r[0], -r[1])):
+        pos = max(_drain(flat, stack, pos, row[0]), row[0])
+        stack.append(row)
+    _drain(flat, stack, pos, 1 << 32)
+    return flat
+
+
+def merge_ranges(geo_rows, asn_rows):
+    """Overlay geolocation and ASN ranges into sorted, non-overlapping (start, end, country, city, asn, org)"""
+    geo = _flatten(geo_rows)
+    asn = _flatten(asn_rows)
+    bounds = sorted({r[0] for r in geo + asn} | {r[1] + 1 for r in geo + asn})
+    merged = []
+    g = a = 0
+    for start, next_start in zip(bounds, bounds[1:]):
+        while g < len(geo) and geo[g][1] < start:
+            g += 1
+        while a < len(asn) and asn[a][1] < start:
+            a += 1
+        country, city = geo[g][2:] if g < len(geo) and geo[g][0] <= start else ('', '')
+        number, org = asn[a][2:] if a < len(asn) and asn[a][0] <= start else (0, '')
+        if not (country or city or number or org):
+            continue
+        values = (country, city, number, org)
+        if merged and merged[-1][1] == start - 1 and merged[-1][2:] == values:
+            merged[-1] = (merged[-1][0], next_start - 1) + values
+        else:
+            merged.append((start, next_start - 1) + values)
+    return merged
+
+
+def write_table(ranges, path=GEO_DB_PATH):
+    """Write merged ranges in the binary layout scanner.cpp maps"""
+    strings = bytearray(b"\0")
+    offsets = {'': 0}
+
+    def intern(text):
+        if text not in offsets:
+            offsets[text] = len(strings)
+            strings.extend(text.encode('utf-8') + b"\0")
+        return offsets[text]
+
+    columns = [array('I') for _ in COLUMNS]
+    for start, end, country, city, number, org in ranges:
+        for column, value in zip(columns, (start, end, intern(country), intern(city), number, intern(org))):
+            column.append(value)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(ranges), len(strings), 0))
+        for column in columns:
+            if sys.byteorder != 'little':
+                column.byteswap()
+            column.tofile(f)
+        f.write(strings)
+    tmp.replace(path)
+
+
+class GeoTable:
+    """Memory-mapped view of a table written by write_table"""
+
+    def __init__(self, path=GEO_DB_PATH):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, strings_size, _ = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} geo table")
+        if len(self._map) < HEADER.size + 4 * len(COLUMNS) * self.count + strings_size:
+            raise ValueError(f"{path} is truncated")
+        view = memoryview(self._map)
+        offset = HEADER.size
+        self.columns = {}
+        for name in COLUMNS:
+            self.columns[name] = view[offset:offset + 4 * self.count].cast('I')
+            offset += 4 * self.count
+        self._strings = offset
+
+    def text(self, offset):
+        """String stored at offset in the string table"""
+        start = self._strings + offset
+        return self._map[start:self._map.find(b"\0", start)].decode('utf-8')
+
+    def _index(self, number):
+        """Row holding number, or -1"""
+        index = bisect_right(self.columns['start'], number) - 1
+        return index if index >= 0 and self.columns['end'][index] >= number else -1
+
+    def lookup(self, ip):
+        """{'country', 'city', 'asn', 'org'} for an IPv4 address, or None"""
+        index = self._index(int(ipaddress.IPv4Address(ip)))
+        if index < 0:
+            return None
+        return {
+            'country': self.text(self.columns['country'][index]),
+            'city': self.text(self.columns['city'][index]),
+            'asn': self.columns['asn'][index],
+            'org': self.text(self.columns['org'][index]),
+        }
+
+    def _arrays(self):
+        """Columns as NumPy arrays over the same mapping (no copy)"""
+        if not hasattr(self, '_np_columns'):
+            self._np_columns = {name: np.frombuffer(self._map, dtype='<u4', count=self.count,
+                                                    offset=HEADER.size + 4 * self.count * position)
+                                for position, name in enumerate(COLUMNS)}
+        return self._np_columns
+
+    def lookup_many(self, numbers):
+        """Row index of each address in a uint32 array, -1 where the table has none.
+
+        One searchsorted call over the range starts replaces a binary
+        search per address.
+        """
+        columns = self._arrays()
+        index = np.searchsorted(columns['start'], numbers, side='right') - 1
+        found = index >= 0
+        found[found] = columns['end'][index[found]] >= numbers[found]
+        index[~found] = -1
+        return index
+
+    def enrich(self, lines, min_prefix=MIN_PREFIX, found_only=False):
+        """Yield (ip, country, city, asn, org) for every address and expanded CIDR range in lines"""
+        texts = {}
+
+        def text(offset):
+            if offset not in texts:
+                texts[offset] = self.text(offset)
+            return texts[offset]
+
+        fields = ('country', 'city', 'asn', 'org')
+        for numbers in address_chunks(lines, min_prefix):
+            if self.count == 0:
+                # Nothing to gather from, e.g. a table built from an IPv6-only CSV
+                rows = ((number, -1, 0, 0, 0, 0) for number in (numbers.tolist() if np is not None else numbers))
+            elif np is not None:
+                index = self.lookup_many(numbers)
+                safe = np.maximum(index, 0)
+                columns = self._arrays()
+                rows = zip(numbers.tolist(), index.tolist(), *(columns[name][safe].tolist() for name in fields))
+            else:
+                index = [self._index(number) for number in numbers]
+                rows = zip(numbers, index, *([self.columns[name][i] if i >= 0 else 0 for i in index]
+                                             for name in fields))
+            for number, i, country, city, asn, org in rows:
+                ip = socket.inet_ntoa(struct.pack('!I', number))
+                if i >= 0:
+                    yield ip, text(country), text(city), asn or '', text(org)
+                elif not found_only:
+                    yield ip, '', '', '', ''
+
+
+def address_chunks(lines, min_prefix=MIN_PREFIX):
+    """IPv4 addresses from lines of IPs, CIDR ranges or log text, in chunks of at most BULK_CHUNK.
+
+    Chunks are uint32 NumPy arrays when NumPy is installed, otherwise
+    plain sequences of ints. CIDR ranges are expanded to every address.
+    """
+    def emit(values):
+        return np.frombuffer(values, dtype=np.uint32) if np is not None else values
+
+    pending = array('I')
+    for line in lines:
+        for address, prefix in ADDRESS_PATTERN.findall(line):
+            try:
+                number = struct.unpack('!I', socket.inet_aton(address))[0]
+            except OSError:
+                continue
+            if not prefix or int(prefix) == 32:
+                pending.append(number)
+                if len(pending) >= BULK_CHUNK:
+                    yield emit(pending)
+                    pending = array('I')
+                continue
+            bits = int(prefix)
+            if bits > 32:
+                continue
+            if bits < min_prefix:
+                raise ValueError(f"{address}/{bits} is {1 << (32 - bits)} addresses; "
+                                 f"allow it with a minimum prefix of {bits}")
+            if pending:
+                # keep input order: single addresses seen so far come first
+                yield emit(pending)
+                pending = array('I')
+            start = number & ~((1 << (32 - bits)) - 1) & 0xFFFFFFFF
+            end = start + (1 << (32 - bits))
+            for block in range(start, end, BULK_CHUNK):
+                stop = min(block + BULK_CHUNK, end)
+                yield np.arange(block, stop, dtype=np.uint32) if np is not None else range(block, stop)
+    if pending:
+        yield emit(pending)
+
+
+def write_bulk(rows, out, fmt='csv'):
+    """Stream enrichment rows as CSV (with a header) or JSON lines; returns the row count"""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(BULK_FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            out.write(json.dumps(dict(zip(BULK_FIELDS, row))) + "\n")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the offline IP geolocation/ASN table")
+    sub = parser.add_subparsers(dest="action")
+    build = sub.add_parser("build", help="convert IP2Location / pyasn files into the binary table")
+    build.add_argument("--geo", help="IP2Location LITE CSV (DB1, DB3, DB5 or DB11)")
+    build.add_argument("--asn", help="IP2Location ASN CSV or pyasn ipasn.dat")
+    build.add_argument("-o", "--output", default=str(GEO_DB_PATH))
+    lookup = sub.add_parser("lookup", help="look up addresses in the table")
+    lookup.add_argument("ips", nargs="+")
+    lookup.add_argument("--db", default=str(GEO_DB_PATH))
+    bulk = sub.add_parser("bulk", help="enrich every address and CIDR range in files (or stdin)")
+    bulk.add_argument("files", nargs="*")
+    bulk.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    bulk.add_argument("--found-only", action="store_true", help="skip addresses missing from the table")
+    bulk.add_argument("--min-prefix", type=int, default=MIN_PREFIX, help="widest CIDR range to expand")
+    bulk.add_argument("--db", default=str(GEO_DB_PATH))
+    args = parser.parse_args()
+
+    if args.action == "build":
+        if not args.geo and not args.asn:
+            build.error("give --geo, --asn or both")
+        ranges = merge_ranges(read_ip2location(args.geo) if args.geo else [],
+                              read_asn(args.asn) if args.asn else [])
+        write_table(ranges, args.output)
+        print(f"Wrote {len(ranges)} ranges to {args.output}")
+    elif args.action == "lookup":
+        table = GeoTable(args.db)
+        for ip in args.ips:
+            print(f"{ip}\t{table.lookup(ip)}")
+    elif args.action == "bulk":
+        table = GeoTable(args.db)
+        sources = [open(name, encoding='utf-8', errors='replace') for name in args.files] or [sys.stdin]
+
+        def lines():
+            for source in sources:
+                yield from source
+
+        try:
+            write_bulk(table.enrich(lines(), args.min_prefix, args.found_only), sys.stdout, args.format)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+    else:
+        parser.print_usage()
@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from latency import latency, timed, host_of
+from circuit_breaker import CircuitOpen, breakers
+
+try:
+    import imagehash
+    from PIL import Image
+except ImportError:
+    imagehash = None
+
+IMAGE_DIR = Path("osint_results") / "images"
+# One "phash<TAB>url<TAB>username<TAB>seen" line per image, appended as images are indexed
+HASHES_PATH = IMAGE_DIR / "hashes.tsv"
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+DEFAULT_WORKERS = 8
+# Hamming distance between 64-bit pHashes still treated as the same picture
+MATCH_DISTANCE = 8
+# Hashes shared by more usernames than this are default avatars, not a signal
+COMMON_HASH_USERS = 5
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes with Hamming distance.
+
+    A search only descends into children whose edge distance is within
+    max_distance of the query's distance to the node, so near-duplicate
+    lookups touch a small part of the tree instead of every hash.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        """Store item under value; items with an identical hash share a node"""
+        self.size += 1
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """(distance, items) for every stored hash within max_distance of value"""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.append((distance, node[1]))
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return sorted(found, key=lambda match: match[0])
+
+
+def cache_path(url):
+    return IMAGE_DIR / (hashlib.sha1(url.encode('utf-8')).hexdigest() + ".img")
+
+
+def fetch_image(http, url, timeout=10, max_bytes=MAX_IMAGE_BYTES):
+    """Path of the cached image for url, downloading it first if needed; None if unusable"""
+    path = cache_path(url)
+    if path.exists():
+        return path
+    host = host_of(url)
+    with breakers.guarded(host, requests.Timeout, requests.RequestException), timed(host, requests.Timeout), \
+            http.get(url, timeout=latency.timeout(host, timeout), stream=True) as r:
+        if r.status_code != 200 or not r.headers.get('Content-Type', 'image/').startswith('image/'):
+            return None
+        if int(r.headers.get('Content-Length') or 0) > max_bytes:
+            return None
+        data = bytearray()
+        for chunk in r.iter_content(chunk_size=65536):
+            data += chunk
+            if len(data) > max_bytes:
+                return None
+    IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    tmp.replace(path)
+    return path
+
+
+def perceptual_hash(path):
+    """64-bit pHash of an image file as an int"""
+    with Image.open(path) as image:
+        return int(str(imagehash.phash(image)), 16)
+
+
+class ImageIndex:
+    """Perceptual hashes of every avatar seen, searchable by similarity.
+
+    The hash file is append-only and shared between processes; each
+    instance reads only the lines added since it last looked, so the
+    BK-tree grows in place instead of being rebuilt. Every username an
+    image URL was seen for is kept, since a shared avatar URL is itself
+    the strongest link between two accounts.
+    """
+
+    def __init__(self, path=HASHES_PATH):
+        self.path = path
+        self.tree = BKTree()
+        self.hashes = {}
+        self.seen = set()
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            if self.path.stat().st_size == self._offset:
+                return
+        except OSError:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                parts = line.decode('utf-8', 'replace').rstrip("\n").split("\t")
+                if len(parts) == 4 and (parts[1], parts[2]) not in self.seen:
+                    value = int(parts[0], 16)
+                    self.hashes.setdefault(parts[1], value)
+                    self.seen.add((parts[1], parts[2]))
+                    self.tree.add(value, (parts[1], parts[2]))
+
+    def lookup(self, url):
+        """Stored hash for url, or None"""
+        with self._lock:
+            self._refresh()
+            return self.hashes.get(url)
+
+    def add(self, url, value, username):
+        with self._lock:
+            self._refresh()
+            if (url, username) in self.seen:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            line = f"{value:016x}\t{url}\t{username}\t{int(time.time())}\n".encode('utf-8')
+            with open(self.path, 'ab') as f:
+                f.write(line)
+            self.hashes.setdefault(url, value)
+            self.seen.add((url, username))
+            self.tree.add(value, (url, username))
+
+    def matches(self, value, max_distance=MATCH_DISTANCE, exclude_username=None):
+        """(distance, url, username) of stored images that look like value, closest first"""
+        with self._lock:
+            self._refresh()
+            found = self.tree.search(value, max_distance)
+        results = []
+        for distance, items in found:
+            if len({username for _, username in items}) > COMMON_HASH_USERS:
+                continue
+            results.extend((distance, url, username) for url, username in items if username != exclude_username)
+        return results
+
+
+image_index = ImageIndex()
+
+
+def index_images(urls, username, http=None, workers=DEFAULT_WORKERS, max_distance=MATCH_DISTANCE):
+    """Fetch, hash and index images concurrently; returns avatar matches against everything seen before.
+
+    Each match is a dict with the scanned image, the matching image, the
+    username it was found for and the Hamming distance between them.
+    Returns an empty list when imagehash/Pillow are not installed.
+    """
+    if imagehash is None or not urls:
+        return []
+    http = http or requests.Session()
+
+    def hash_one(url):
+        value = image_index.lookup(url)
+        if value is None:
+            try:
+                path = fetch_image(http, url)
+                if path is None:
+                    return url, None
+                value = perceptual_hash(path)
+            except (requests.RequestException, CircuitOpen, OSError, ValueError):
+                return url, None
+        return url, value
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as executor:
+        hashed = [(url, value) for url, value in executor.map(hash_one, urls) if value is not None]
+
+    matches = []
+    for url, value in hashed:
+        for distance, other_url, other_username in image_index.matches(value, max_distance, exclude_username=username):
+            matches.append({'image': url, 'match': other_url, 'username': other_username, 'distance': distance})
+        image_index.add(url, value, username)
+    return matches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find avatars that look like an image seen in earlier scans")
+    parser.add_argument("image", nargs="?", help="image URL or local file")
+    parser.add_argument("--distance", type=int, default=MATCH_DISTANCE, help="max Hamming distance")
+    args = parser.parse_args()
+
+    if imagehash is None:
+        print("imagehash and Pillow are required: pip install imagehash")
+        sys.exit(1)
+    if not args.image:
+        image_index.lookup("")
+        print(f"{len(image_index.hashes)} images indexed in {HASHES_PATH}")
+        sys.exit(0)
+
+    source = Path(args.image) if os.path.exists(args.image) else fetch_image(requests.Session(), args.image)
+    if source is None:
+        print(f"Could not fetch {args.image}")
+        sys.exit(1)
+    for distance, url, username in image_index.matches(perceptual_hash(source), args.distance):
+        print(f"{distance:>2}  {username:<24} {url}")
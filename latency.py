@@ -0,0 +1,166 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Shared with scanner.cpp: "endpoint<TAB>count,count,..." with one count per
+# bucket of BOUNDS_MS plus a final overflow bucket
+LATENCY_PATH = Path("osint_results") / "latency.tsv"
+BOUNDS_MS = (50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 20000, 30000,
+             60000, 120000, 180000)
+# Fewer observations than this and the caller's default timeout is used
+MIN_SAMPLES = 20
+# Timeout = observed p99 times this factor
+HEADROOM = 2.0
+MIN_TIMEOUT = float(os.environ.get("OSINT_TIMEOUT_MIN", 2))
+# Histograms are halved past this many samples so old behaviour fades out
+DECAY_AT = 2000
+
+
+def host_of(url):
+    return (urlparse(url).hostname or url).lower()
+
+
+def _percentile_ms(counts, fraction):
+    """Upper bound of the bucket holding the given fraction of samples; None if it is the overflow bucket"""
+    wanted = sum(counts) * fraction
+    seen = 0
+    for bound, count in zip(BOUNDS_MS, counts):
+        seen += count
+        if seen >= wanted:
+            return bound
+    return None
+
+
+class LatencyTracker:
+    """Latency histograms per endpoint, persisted across runs.
+
+    An endpoint is a host for HTTP requests, or a name such as
+    'tool:maigret' or 'scanner:dlkp' for whole subprocess runs. Once a
+    host has enough samples its timeout is its p99 with headroom,
+    clamped between MIN_TIMEOUT and the caller's old fixed value, so a
+    hung host that normally answers in 300 ms gives up after about a
+    second instead of holding a worker for the full default. Subprocess
+    runs are only recorded: how long they take depends on the input
+    (one domain or a file of them), not on any host.
+    """
+
+    def __init__(self, path=LATENCY_PATH):
+        self.path = path
+        self.counts = {}
+        self.pending = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _read(self):
+        counts = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith('#') or '\t' not in line:
+                        continue
+                    endpoint, values = line.rstrip("\n").split("\t", 1)
+                    values = values.split(',')
+                    if len(values) == len(BOUNDS_MS) + 1 and all(v.isdigit() for v in values):
+                        counts[endpoint] = [int(v) for v in values]
+        except OSError:
+            pass
+        return counts
+
+    def _histogram(self, endpoint):
+        if not self._loaded:
+            self._loaded = True
+            self.counts = self._read()
+        stored = self.counts.get(endpoint)
+        added = self.pending.get(endpoint)
+        if stored and added:
+            return [a + b for a, b in zip(stored, added)]
+        return stored or added
+
+    def timeout(self, endpoint, default, minimum=MIN_TIMEOUT):
+        """Seconds to wait for endpoint, derived from its observed p99"""
+        with self._lock:
+            counts = self._histogram(endpoint)
+        if not counts or sum(counts) < MIN_SAMPLES:
+            return default
+        p99 = _percentile_ms(counts, 0.99)
+        if p99 is None:
+            return default
+        timeout = max(p99 / 1000.0 * HEADROOM, minimum)
+        return timeout if default is None else min(timeout, default)
+
+    def record(self, endpoint, seconds):
+        milliseconds = seconds * 1000
+        bucket = next((i for i, bound in enumerate(BOUNDS_MS) if milliseconds <= bound), len(BOUNDS_MS))
+        with self._lock:
+            counts = self.pending.setdefault(endpoint, [0] * (len(BOUNDS_MS) + 1))
+            counts[bucket] += 1
+
+    def save(self):
+        """Merge this process's samples into the shared file"""
+        with self._lock:
+            if not self.pending:
+                return
+            counts = self._read()
+            for endpoint, added in self.pending.items():
+                merged = [a + b for a, b in zip(counts.get(endpoint, [0] * len(added)), added)]
+                if sum(merged) > DECAY_AT:
+                    merged = [count // 2 for count in merged]
+                counts[endpoint] = merged
+            self.pending = {}
+            self.counts = counts
+            self._loaded = True
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write("# bounds_ms: " + ",".join(map(str, BOUNDS_MS)) + ",overflow\n")
+                for endpoint, values in sorted(counts.items()):
+                    f.write(f"{endpoint}\t{','.join(map(str, values))}\n")
+            tmp.replace(self.path)
+
+
+latency = LatencyTracker()
+
+
+@contextmanager
+def timed(endpoint, timeouts=(), tracker=None):
+    """Record how long the block took against endpoint.
+
+    Failures are only recorded when they are one of the given timeout
+    exception types; an instant connection error says nothing about how
+    long the endpoint takes to answer.
+    """
+    started = time.monotonic()
+    try:
+        yield
+    except timeouts:
+        (tracker or latency).record(endpoint, time.monotonic() - started)
+        raise
+    (tracker or latency).record(endpoint, time.monotonic() - started)
+
+
+def run_timed(endpoint, args, timeout, **kwargs):
+    """subprocess.run under the caller's fixed timeout, recording how long endpoint took"""
+    with timed(endpoint, subprocess.TimeoutExpired):
+        result = subprocess.run(args, timeout=timeout, **kwargs)
+    latency.save()
+    return result
+
+
+if __name__ == "__main__":
+    tracker = LatencyTracker()
+    counts = tracker._read()
+    if not counts:
+        print(f"No latency data in {LATENCY_PATH}")
+        sys.exit(0)
+    print(f"{'endpoint':<40} {'samples':>7} {'p50':>8} {'p99':>8} {'timeout':>8}")
+    for endpoint, values in sorted(counts.items()):
+        p50, p99 = _percentile_ms(values, 0.5), _percentile_ms(values, 0.99)
+        # Only hosts get a learned timeout; "tool:"/"scanner:" runs keep their fixed one
+        timeout = None if ':' in endpoint else tracker.timeout(endpoint, None)
+        print(f"{endpoint:<40} {sum(values):>7} {str(p50 or '-'):>8} {str(p99 or '-'):>8} "
+              f"{f'{timeout:.1f}' if timeout else '-':>8}")
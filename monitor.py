@@ -0,0 +1,276 @@
+import re
+import json
+import time
+import heapq
+import random
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_jobs import run_job_command, CPP_COMMANDS, PYTHON_COMMANDS
+
+MONITOR_DIR = Path("osint_results") / "monitor"
+WATCHLIST_PATH = MONITOR_DIR / "watchlist.json"
+DEFAULT_INTERVAL = 3600
+MIN_INTERVAL = 60
+# Each rescan lands within +/- this fraction of its interval
+JITTER = 0.1
+DEFAULT_WORKERS = 2
+
+# advanced scanner result keys compared between runs
+ADVANCED_FACT_KEYS = ['usernames', 'images', 'links', 'emails']
+
+
+def entry_id(command, target):
+    """Filesystem-safe ID for a watched command/target pair"""
+    return f"{command}_{re.sub(r'[^A-Za-z0-9_.@-]', '_', target)}"
+
+
+def extract_facts(command, output):
+    """Reduce a scan output to a sorted list of comparable facts.
+
+    Python scans are compared on profile URLs and the other result lists;
+    C++ scans on their non-empty output lines, which carry no timestamps.
+    """
+    facts = set()
+    if command in PYTHON_COMMANDS:
+        results = json.loads(output)
+        for profile in results.get('profiles', []):
+            facts.add(f"profile: {profile.get('url') or profile.get('platform')}")
+        for key in ADVANCED_FACT_KEYS:
+            facts.update(f"{key[:-1]}: {value}" for value in results.get(key, []))
+    else:
+        facts.update(line.strip() for line in output.splitlines() if line.strip())
+    return sorted(facts)
+
+
+class Watchlist:
+    """Watched targets persisted as a small JSON file.
+
+    The prompt thread adds and removes entries while the monitor thread
+    schedules them, so changes and full iterations hold the lock.
+    """
+
+    def __init__(self, path=WATCHLIST_PATH):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.RLock()
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                self.entries = {e['id']: e for e in json.load(f)}
+
+    def all(self):
+        """Snapshot of the watched entries, safe to iterate while others change"""
+        with self._lock:
+            return list(self.entries.values())
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with self._lock:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(list(self.entries.values()), f, indent=2)
+            tmp.replace(self.path)
+
+    def add(self, command, target, interval=DEFAULT_INTERVAL):
+        if command not in CPP_COMMANDS + PYTHON_COMMANDS:
+            raise ValueError(f"Command not supported for monitoring: {command}")
+        entry = {
+            'id': entry_id(command, target),
+            'command': command,
+            'target': target,
+            'interval': max(int(interval), MIN_INTERVAL),
+            'added': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock:
+            self.entries[entry['id']] = entry
+            self.save()
+        return entry
+
+    def remove(self, watch_id):
+        with self._lock:
+            removed = self.entries.pop(watch_id, None)
+            if removed:
+                self.save()
+        return removed
+
+
+class TargetHistory:
+    """Last known facts for one watched target plus its log of deltas.
+
+    Only changes are written: the snapshot is replaced and a delta line
+    appended when the facts differ, and unchanged runs touch no files.
+    """
+
+    def __init__(self, watch_id):
+        self.path = MONITOR_DIR / watch_id
+        self.snapshot_path = self.path / "snapshot.json"
+        self.deltas_path = self.path / "deltas.jsonl"
+
+    def snapshot(self):
+        if not self.snapshot_path.exists():
+            return None
+        with open(self.snapshot_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def record(self, facts):
+        """Compare facts with the snapshot; returns the delta or None if unchanged"""
+        previous = self.snapshot()
+        old = set(previous['facts']) if previous else set()
+        added = sorted(set(facts) - old)
+        removed = sorted(old - set(facts))
+        if previous is not None and not added and not removed:
+            return None
+
+        now = datetime.now().isoformat(timespec='seconds')
+        delta = {'ts': now, 'baseline': previous is None, 'added': added, 'removed': removed}
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'updated': now, 'facts': facts}, f)
+        tmp.replace(self.snapshot_path)
+        with open(self.deltas_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(delta) + "\n")
+        return delta
+
+    def deltas(self, limit=None):
+        if not self.deltas_path.exists():
+            return []
+        with open(self.deltas_path, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return entries[-limit:] if limit else entries
+
+
+class Monitor:
+    """Background scheduler that rescans watched targets and reports deltas.
+
+    First runs are spread uniformly over each target's interval and every
+    later run is jittered, so a large watchlist never fires all at once.
+    `on_event(event, **data)` receives 'delta' and 'failed' events.
+    """
+
+    def __init__(self, watchlist=None, workers=DEFAULT_WORKERS, run=run_job_command, on_event=None):
+        self.watchlist = watchlist or Watchlist()
+        self.workers = workers
+        self.run_command = run
+        self.on_event = on_event or (lambda event, **data: None)
+        self.stop_event = threading.Event()
+        self.wakeup = threading.Event()
+        self.last_run = {}
+        self._heap = []
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running():
+            return
+        self.stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wakeup.set()
+
+    def reload(self):
+        """Pick up watchlist changes without waiting for the next due run"""
+        self.wakeup.set()
+
+    def check(self, entry):
+        """Scan one entry now and store its delta, if any"""
+        output = self.run_command(entry['command'], entry['target'])
+        delta = TargetHistory(entry['id']).record(extract_facts(entry['command'], output))
+        self.last_run[entry['id']] = time.time()
+        if delta:
+            self.on_event('delta', entry=entry, delta=delta)
+        return delta
+
+    def _check_safely(self, entry):
+        try:
+            self.check(entry)
+        except Exception as e:
+            self.on_event('failed', entry=entry, error=str(e))
+
+    def _schedule(self, now):
+        heap = []
+        for entry in self.watchlist.all():
+            interval = entry['interval']
+            last = self.last_run.get(entry['id'])
+            if last is None:
+                due = now + random.uniform(0, interval)
+            else:
+                due = last + interval * random.uniform(1 - JITTER, 1 + JITTER)
+            heapq.heappush(heap, (due, entry['id']))
+        return heap
+
+    def run_forever(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self._heap = self._schedule(time.time())
+            while not self.stop_event.is_set():
+                with self._lock:
+                    if self.wakeup.is_set():
+                        # Schedule newly watched entries; removed ones drop out when popped
+                        self.wakeup.clear()
+                        known = {watch_id for _, watch_id in self._heap} | self._in_flight
+                        for item in self._schedule(time.time()):
+                            if item[1] not in known:
+                                heapq.heappush(self._heap, item)
+
+                    now = time.time()
+                    while self._heap and self._heap[0][0] <= now:
+                        _, watch_id = heapq.heappop(self._heap)
+                        entry = self.watchlist.entries.get(watch_id)
+                        if entry is None or watch_id in self._in_flight:
+                            continue
+                        self._in_flight.add(watch_id)
+                        future = executor.submit(self._check_safely, entry)
+                        future.add_done_callback(lambda f, e=entry: self._reschedule(e))
+
+                    delay = self._heap[0][0] - time.time() if self._heap else 60
+                self.wakeup.wait(max(0.1, min(delay, 60)))
+
+    def _reschedule(self, entry):
+        with self._lock:
+            self._in_flight.discard(entry['id'])
+            if entry['id'] in self.watchlist.entries:
+                due = time.time() + entry['interval'] * random.uniform(1 - JITTER, 1 + JITTER)
+                heapq.heappush(self._heap, (due, entry['id']))
+
+
+def format_delta(entry, delta):
+    """Human-readable lines for one delta"""
+    if delta['baseline']:
+        return [f"Baseline for {entry['command']} {entry['target']}: {len(delta['added'])} facts"]
+    lines = [f"Change in {entry['command']} {entry['target']} at {delta['ts']}"]
+    lines.extend(f"  + {fact}" for fact in delta['added'])
+    lines.extend(f"  - {fact}" for fact in delta['removed'])
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rescan watched targets and print only what changed")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--once", action="store_true", help="check every entry once and exit")
+    args = parser.parse_args()
+
+    def print_event(event, **data):
+        if event == 'delta':
+            print("\n".join(format_delta(data['entry'], data['delta'])))
+        else:
+            print(f"Failed {data['entry']['command']} {data['entry']['target']}: {data['error']}")
+
+    monitor = Monitor(workers=args.workers, on_event=print_event)
+    if args.once:
+        for entry in monitor.watchlist.all():
+            monitor._check_safely(entry)
+    else:
+        try:
+            monitor.run_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,116 @@
+import os
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Shared with scanner.cpp: one "platform<TAB>identifier<TAB>expiry" line per
+# miss, expiry in unix seconds, later lines win
+NEGATIVE_CACHE_PATH = Path("osint_results") / "negative_cache.tsv"
+DEFAULT_TTL = int(os.environ.get("OSINT_NEGATIVE_TTL", 6 * 3600))
+# Rewrite the file once it holds this many lines and most are stale
+COMPACT_LINES = 5000
+
+
+class NegativeCache:
+    """Not-found results, kept for a shorter time than real answers.
+
+    Both scanners append to the same file, so a username that was missing
+    on a platform in a C++ run is skipped by the Python scanner and the
+    other way round. The file is re-read whenever another process has
+    appended to it. Appends and compaction hold an flock on a sibling
+    .lock file (the data file itself is replaced on compaction), so no
+    process's lines are lost to another's rewrite.
+    """
+
+    def __init__(self, path=NEGATIVE_CACHE_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.lock_path = path.with_suffix(".lock")
+        self.ttl = ttl
+        self.entries = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other processes, where fcntl exists"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read(self):
+        """(entries, line count) from the file"""
+        entries = {}
+        lines = 0
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                lines += 1
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 3 and parts[2].isdigit():
+                    entries[(parts[0], parts[1])] = int(parts[2])
+        return entries, lines
+
+    def _refresh(self):
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        self.entries, lines = self._read()
+        if lines > COMPACT_LINES:
+            self._compact()
+
+    def _compact(self):
+        with self._file_lock():
+            # Re-read under the lock: another process may have appended or compacted since
+            try:
+                entries, lines = self._read()
+            except OSError:
+                return
+            self.entries = entries
+            if lines <= COMPACT_LINES:
+                return
+            now = time.time()
+            live = {key: expires for key, expires in entries.items() if expires > now}
+            if len(live) * 2 > COMPACT_LINES:
+                return
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for (platform, identifier), expires in live.items():
+                    f.write(f"{platform}\t{identifier}\t{expires}\n")
+            tmp.replace(self.path)
+            self.entries = live
+            self._mtime = self.path.stat().st_mtime
+
+    def is_miss(self, platform, identifier):
+        """True if identifier was recently not found on platform"""
+        with self._lock:
+            self._refresh()
+            return self.entries.get((platform, identifier), 0) > time.time()
+
+    def record_miss(self, platform, identifier):
+        if self.ttl <= 0 or any(c.isspace() for c in identifier):
+            return
+        expires = int(time.time()) + self.ttl
+        with self._lock:
+            self.entries[(platform, identifier)] = expires
+            with self._file_lock():
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(f"{platform}\t{identifier}\t{expires}\n")
+
+
+negative_cache = NegativeCache()
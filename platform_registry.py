@@ -0,0 +1,302 @@
+import os
+import sys
+import json
+import time
+import string
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from latency import latency, timed
+from circuit_breaker import CircuitOpen, breakers
+
+# Shared with scanner.cpp, which reads the same file (or OSINT_PLATFORMS)
+REGISTRY_PATH = Path(os.environ.get("OSINT_PLATFORMS", Path(__file__).resolve().parent / "platforms.json"))
+PROBE_MODES = ("head", "status", "match")
+PROBE_MAX_BYTES = 128 * 1024
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+DEFAULT_WORKERS = 16
+
+
+def page_contains(http, url, needle, timeout=5, max_bytes=PROBE_MAX_BYTES, headers=None):
+    """Stream the start of a page and stop as soon as needle shows up (case-insensitive)"""
+    needle = needle.lower().encode('utf-8')
+    headers = dict(headers or {}, **{'Accept-Encoding': 'gzip, deflate', 'Range': f'bytes=0-{max_bytes - 1}'})
+    with http.get(url, timeout=timeout, stream=True, headers=headers) as r:
+        if r.status_code == 404:
+            return False
+        r.raise_for_status()
+        tail = b""
+        received = 0
+        for chunk in r.iter_content(chunk_size=16384):
+            window = tail + chunk.lower()
+            if needle in window:
+                return True
+            tail = window[-len(needle):]
+            received += len(chunk)
+            if received >= max_bytes:
+                break
+    return False
+
+
+def _json_path(data, path):
+    """Follow a dotted path such as 'them.0.pictures.primary.url'; None if absent"""
+    for part in path:
+        if isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        elif isinstance(data, dict) and part in data:
+            data = data[part]
+        else:
+            return None
+    return data
+
+
+class Platform:
+    """One compiled registry entry"""
+
+    __slots__ = ('name', 'key', 'url', 'profile_url', 'probe', 'marker', 'expect_status', 'headers',
+                 'min_interval', 'timeout', 'label', 'extract', 'host')
+
+    def __init__(self, entry, defaults):
+        merged = dict(defaults, **entry)
+        self.name = entry['name']
+        self.key = entry['key']
+        self.url = entry['url']
+        self.profile_url = entry.get('profile_url', entry['url'])
+        self.probe = merged['probe']
+        self.marker = merged.get('marker')
+        self.expect_status = frozenset(merged['expect_status'])
+        self.headers = dict(merged.get('headers', {}))
+        self.headers.setdefault('User-Agent', DEFAULT_USER_AGENT)
+        self.min_interval = 1.0 / merged['rate_per_sec']
+        self.timeout = merged['timeout']
+        self.label = entry.get('label', self.name + ": {username}")
+        # (field, path parts, display label or None)
+        self.extract = tuple((f['field'], tuple(f['path'].split('.')), f.get('display'))
+                             for f in entry.get('extract', []))
+        self.host = urlparse(self.url).hostname
+
+    def url_for(self, username):
+        return self.url.replace("{username}", username)
+
+    def profile_for(self, username):
+        return self.profile_url.replace("{username}", username)
+
+    def marker_for(self, username):
+        return self.marker.replace("{username}", username) if self.marker else self.marker
+
+    def fields(self, data):
+        """Extracted values by field name; missing values are left out"""
+        fields = {}
+        for field, path, _ in self.extract:
+            value = _json_path(data, path)
+            if value not in (None, ''):
+                fields[field] = value
+        return fields
+
+    def parse(self, data, username):
+        """Result entry in the shape search_username collects"""
+        fields = self.fields(data)
+        values = {field: username for field, _, _ in self.extract}
+        values.update(fields, username=username)
+        return {
+            'username': string.Formatter().vformat(self.label, (), values),
+            'image': fields.get('image', ''),
+            'links': [fields['link']] if fields.get('link') else [],
+            'profile': self.profile_for(username),
+        }
+
+
+def validate(raw):
+    """Problems found in a registry document; an empty list means it is valid"""
+    errors = []
+    defaults = raw.get('defaults', {})
+    entries = raw.get('platforms')
+    if not isinstance(entries, list):
+        return ["'platforms' must be a list"]
+
+    seen = set()
+    for index, entry in enumerate(entries):
+        where = f"platforms[{index}] ({entry.get('name', '?')})"
+        merged = dict(defaults, **entry)
+        for required in ('name', 'key', 'url'):
+            if not entry.get(required):
+                errors.append(f"{where}: missing '{required}'")
+        if entry.get('key') in seen:
+            errors.append(f"{where}: duplicate key '{entry['key']}'")
+        seen.add(entry.get('key'))
+        for template in ('url', 'profile_url', 'label'):
+            value = entry.get(template)
+            if not value:
+                continue
+            try:
+                names = {name for _, name, _, _ in string.Formatter().parse(value) if name}
+            except ValueError as e:
+                errors.append(f"{where}: bad {template}: {e}")
+                continue
+            if template == 'label':
+                fields = {f.get('field') for f in entry.get('extract', [])}
+                unknown = names - fields - {'username'}
+                if unknown:
+                    errors.append(f"{where}: label uses unknown fields {', '.join(sorted(unknown))}")
+            elif names != {'username'}:
+                errors.append(f"{where}: {template} must contain exactly the {{username}} placeholder")
+        if merged.get('probe') not in PROBE_MODES:
+            errors.append(f"{where}: probe must be one of {', '.join(PROBE_MODES)}")
+        if merged.get('probe') == 'match' and not merged.get('marker'):
+            errors.append(f"{where}: probe 'match' needs a marker")
+        if not all(isinstance(s, int) for s in merged.get('expect_status', [])) or not merged.get('expect_status'):
+            errors.append(f"{where}: expect_status must be a non-empty list of integers")
+        if not isinstance(merged.get('rate_per_sec'), (int, float)) or merged['rate_per_sec'] <= 0:
+            errors.append(f"{where}: rate_per_sec must be positive")
+        if not isinstance(merged.get('timeout'), (int, float)) or merged['timeout'] <= 0:
+            errors.append(f"{where}: timeout must be positive")
+        for item in entry.get('extract', []):
+            if not item.get('field') or not item.get('path'):
+                errors.append(f"{where}: extract entries need 'field' and 'path'")
+    return errors
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def load_registry(path=None):
+    """Load, validate and compile the registry once per process"""
+    global _registry
+    with _registry_lock:
+        if _registry is not None and path is None:
+            return _registry
+        with open(path or REGISTRY_PATH, encoding='utf-8') as f:
+            raw = json.load(f)
+        errors = validate(raw)
+        if errors:
+            raise ValueError("Invalid platform registry:\n  " + "\n  ".join(errors))
+        platforms = [Platform(entry, raw.get('defaults', {})) for entry in raw['platforms']]
+        if path is None:
+            _registry = platforms
+        return platforms
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host according to each platform's rate.
+
+    One instance (rate_limiter) is shared by every scan in the process, so
+    rate_per_sec holds across concurrent scans. It is per process: batch
+    workers in separate processes each get their own budget.
+    """
+
+    def __init__(self):
+        self.next_allowed = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host, min_interval):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.next_allowed.get(host, now))
+            self.next_allowed[host] = start + min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+rate_limiter = HostRateLimiter()
+
+
+def check_platform(http, platform, username, limiter=None):
+    """Probe one platform; returns (status, found, data).
+
+    Platforms with fields to extract are fetched in full. The rest are
+    probed the cheap way their registry entry allows: HEAD, a GET that
+    stops after the headers, or a streamed search for the marker.
+    `status` is None when no definite answer came back. The timeout
+    follows the host's observed latency, capped at the registry value;
+    CircuitOpen is raised without a request while the host is failing.
+    """
+    url = platform.url_for(username)
+    with breakers.guarded(platform.host, requests.Timeout, requests.RequestException) as outcome:
+        if limiter is not None:
+            limiter.wait(platform.host, platform.min_interval)
+        with timed(platform.host, requests.Timeout):
+            result = _probe(http, platform, url, username, latency.timeout(platform.host, platform.timeout))
+        if result[0] >= 500 or result[0] == 429:
+            outcome['kind'] = 'error'
+        return result
+
+
+def _probe(http, platform, url, username, timeout):
+    if platform.extract:
+        r = http.get(url, headers=platform.headers, timeout=timeout)
+        found = r.status_code in platform.expect_status and \
+            (platform.probe != 'match' or platform.marker_for(username) in r.text)
+        data = None
+        if found:
+            try:
+                data = r.json()
+            except ValueError:
+                data = {}
+        return r.status_code, found, data
+
+    if platform.probe == 'match':
+        found = page_contains(http, url, platform.marker_for(username), timeout=timeout,
+                              headers=platform.headers)
+        return 200, found, None
+
+    if platform.probe == 'head':
+        r = http.head(url, headers=platform.headers, timeout=timeout, allow_redirects=True)
+        if r.status_code not in (405, 501):
+            return r.status_code, r.status_code in platform.expect_status, None
+    with http.get(url, headers=platform.headers, timeout=timeout, stream=True) as r:
+        return r.status_code, r.status_code in platform.expect_status, None
+
+
+def check_all(username, http=None, platforms=None, workers=DEFAULT_WORKERS):
+    """Probe every platform concurrently, yielding (platform, status, found, data, seconds).
+
+    Platforms on an open circuit are skipped with status None and the
+    CircuitOpen exception as data.
+    """
+    http = http or requests.Session()
+    platforms = load_registry() if platforms is None else platforms
+
+    def probe_one(platform):
+        started = time.monotonic()
+        try:
+            status, found, data = check_platform(http, platform, username, rate_limiter)
+        except CircuitOpen as e:
+            status, found, data = None, False, e
+        except (requests.RequestException, ValueError):
+            status, found, data = None, False, None
+        return platform, status, found, data, time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=min(workers, max(len(platforms), 1))) as executor:
+        for future in as_completed([executor.submit(probe_one, p) for p in platforms]):
+            yield future.result()
+    latency.save()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate or benchmark the shared platform registry")
+    parser.add_argument("action", choices=["validate", "bench"])
+    parser.add_argument("username", nargs="?", default="github")
+    parser.add_argument("--file", default=None, help=f"registry file (default {REGISTRY_PATH})")
+    args = parser.parse_args()
+
+    try:
+        platforms = load_registry(args.file)
+    except (OSError, ValueError) as e:
+        print(e)
+        sys.exit(1)
+    if args.action == "validate":
+        print(f"{len(platforms)} platforms OK")
+    else:
+        started = time.monotonic()
+        for platform, status, found, data, seconds in sorted(check_all(args.username, platforms=platforms),
+                                                          key=lambda r: r[4]):
+            state = "FOUND" if found else ("NOT FOUND" if status else
+                                           "DEFERRED" if isinstance(data, CircuitOpen) else "ERROR")
+            print(f"{platform.name:<20} {str(status):>5} {state:<10} {seconds * 1000:7.0f} ms")
+        print(f"{len(platforms)} platforms in {time.monotonic() - started:.2f}s")
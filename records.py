@@ -0,0 +1,262 @@
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import shutil
+import itertools
+import threading
+from pathlib import Path
+from datetime import datetime
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+URL_PATTERN = re.compile(r'https?://[^\s\'"<>\]\[)]+')
+# Anchored at the start of a word so long runs of text are not rescanned from every offset
+EMAIL_PATTERN = re.compile(r'(?<![\w.+-])[\w.+-]{1,64}@[\w-]+\.[\w.-]+')
+# "📱 Checking GitHub... ✅ FOUND: https://..." from the C++ username search
+FOUND_PATTERN = re.compile(r'Checking (.+?)\.\.\. ✅ FOUND: (\S+)')
+
+SESSION_DIR = Path("osint_results") / "session"
+# Records whose output and entities stay in memory; older ones are spilled to disk
+SESSION_CACHE = int(os.environ.get("OSINT_SESSION_CACHE", 200))
+ENTITY_KEYS = ('usernames', 'images', 'links', 'emails', 'profiles')
+
+
+def intern_name(value):
+    """Platform, host, source and command names repeat across every record; share one copy"""
+    return sys.intern(value) if value else ''
+
+
+class Profile:
+    """One account found on a platform"""
+
+    __slots__ = ('platform', 'host', 'url', 'username', 'source')
+
+    def __init__(self, platform, url, username='', source=''):
+        self.platform = intern_name(platform)
+        self.host = intern_name(urlparse(url).hostname or '') if url else ''
+        self.url = url
+        self.username = username
+        self.source = intern_name(source)
+
+    def to_dict(self):
+        profile = {'platform': self.platform, 'url': self.url, 'username': self.username}
+        if self.source:
+            profile['source'] = self.source
+        return profile
+
+
+class ScanRecord:
+    """Normalized result of one scan, built from either scanner.
+
+    Entity lists are tuples and repeated names are interned. The raw
+    output is kept zlib-compressed and only inflated when it is viewed or
+    exported, which is what lets one process hold results for very large
+    batches. spill() moves the output and entity lists to a file, leaving
+    only the metadata in memory; they are read back on access.
+    """
+
+    __slots__ = ('kind', 'command', 'target', 'timestamp', 'saved_to', 'failed', '_data',
+                 '_spill_path')
+
+    def __init__(self, kind, command, target, output='', usernames=(), images=(), links=(), emails=(),
+                 profiles=(), saved_to=None, timestamp=None):
+        self.kind = intern_name(kind)
+        self.command = intern_name(command)
+        self.target = target
+        self.timestamp = timestamp or time.time()
+        self.saved_to = str(saved_to) if saved_to else None
+        self.failed = "error" in output.lower()
+        # (compressed output, entity tuples) in one slot, so a reader on another
+        # thread sees either both or None (spilled), never half of a spill
+        self._data = (zlib.compress(output.encode('utf-8')) if output else b'',
+                      (tuple(usernames), tuple(images), tuple(links), tuple(emails), tuple(profiles)))
+        self._spill_path = None
+
+    @classmethod
+    def from_advanced(cls, target, results, output='', saved_to=None, command='advanced'):
+        """Build from the results dict search_username returns"""
+        profiles = [Profile(p.get('platform', ''), p.get('url', ''), p.get('username', ''), p.get('source', ''))
+                    for p in results.get('profiles', [])]
+        return cls('python', command, target, output, results.get('usernames', ()), results.get('images', ()),
+                   results.get('links', ()), results.get('emails', ()), profiles, saved_to)
+
+    @classmethod
+    def from_output(cls, kind, command, target, output, saved_to=None):
+        """Build from scanner text output, pulling out profiles, links and emails"""
+        if kind == 'python' and output.startswith('{'):
+            try:
+                return cls.from_advanced(target, json.loads(output), output, saved_to, command)
+            except ValueError:
+                pass
+        found = dict((url, name) for name, url in FOUND_PATTERN.findall(output))
+        profiles = [Profile(name, url, target, 'scanner') for url, name in found.items()]
+        links = [url for url in dict.fromkeys(URL_PATTERN.findall(output)) if url not in found]
+        emails = list(dict.fromkeys(EMAIL_PATTERN.findall(output)))
+        return cls(kind, command, target, output, links=links, emails=emails, profiles=profiles,
+                   saved_to=saved_to)
+
+    def _read_spill(self):
+        """(output text, entity tuples) from the spill file"""
+        with open(self._spill_path, 'rb') as f:
+            data = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        profiles = tuple(Profile(p['platform'], p['url'], p['username'], p.get('source', ''))
+                         for p in data['profiles'])
+        return data['output'], tuple(tuple(data[key]) for key in ENTITY_KEYS[:-1]) + (profiles,)
+
+    def _payload(self):
+        """(compressed output, entity tuples), read from the spill file if they are not in memory"""
+        data = self._data
+        if data is not None:
+            return data
+        output, entities = self._read_spill()
+        return zlib.compress(output.encode('utf-8')) if output else b'', entities
+
+    def _output_and_entities(self):
+        """(output text, entity tuples) without recompressing a spilled record's output"""
+        data = self._data
+        if data is None:
+            return self._read_spill()
+        compressed, entities = data
+        return zlib.decompress(compressed).decode('utf-8') if compressed else '', entities
+
+    def spill(self, path):
+        """Write output and entities to path and drop them from memory"""
+        data = self._data
+        if data is None:
+            return
+        if self._spill_path != str(path):
+            self._write(path, *data)
+        self._spill_path = str(path)
+        self._data = None
+
+    def _write(self, path, compressed, entities):
+        data = dict(zip(ENTITY_KEYS[:-1], (list(values) for values in entities[:-1])),
+                    profiles=[p.to_dict() for p in entities[-1]],
+                    output=zlib.decompress(compressed).decode('utf-8') if compressed else '')
+        tmp = Path(path).with_suffix(".tmp")
+        with open(tmp, 'wb') as f:
+            f.write(zlib.compress(json.dumps(data).encode('utf-8')))
+        tmp.replace(path)
+
+    def reload(self):
+        """Bring spilled output and entities back into memory"""
+        if self._data is None:
+            self._data = self._payload()
+
+    @property
+    def spilled(self):
+        return self._data is None
+
+    @property
+    def output(self):
+        return self._output_and_entities()[0]
+
+    @property
+    def usernames(self):
+        return self._payload()[1][0]
+
+    @property
+    def images(self):
+        return self._payload()[1][1]
+
+    @property
+    def links(self):
+        return self._payload()[1][2]
+
+    @property
+    def emails(self):
+        return self._payload()[1][3]
+
+    @property
+    def profiles(self):
+        return self._payload()[1][4]
+
+    @property
+    def when(self):
+        return datetime.fromtimestamp(self.timestamp)
+
+    def to_dict(self, include_output=False):
+        """JSON-ready form; the entity keys match search_username's results dict"""
+        output, (usernames, images, links, emails, profiles) = self._output_and_entities()
+        record = {
+            'kind': self.kind,
+            'command': self.command,
+            'target': self.target,
+            'timestamp': self.when.isoformat(timespec='seconds'),
+            'usernames': list(usernames),
+            'images': list(images),
+            'links': list(links),
+            'emails': list(emails),
+            'profiles': [p.to_dict() for p in profiles],
+            'saved_to': self.saved_to,
+        }
+        if include_output:
+            record['output'] = output
+        return record
+
+
+class SessionStore:
+    """Scan records of one terminal session in bounded memory.
+
+    Behaves like the ordered dict it replaces. Every record's metadata
+    stays in memory, but only the `capacity` most recently stored or
+    viewed records keep their output and entities; the rest are spilled
+    to a per-session directory. Reading a spilled record's output goes to
+    disk without bringing it back, so exporting a long session does not
+    refill memory; getting it by key (viewing it) does.
+    """
+
+    def __init__(self, directory=None, capacity=SESSION_CACHE):
+        self.directory = Path(directory or SESSION_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}")
+        self.capacity = max(capacity, 1)
+        self.records = {}
+        self.loaded = OrderedDict()
+        self._files = {}
+        self._numbers = itertools.count()
+        self._lock = threading.Lock()
+
+    def _touch(self, key):
+        self.loaded[key] = True
+        self.loaded.move_to_end(key)
+        while len(self.loaded) > self.capacity:
+            old, _ = self.loaded.popitem(last=False)
+            if old not in self._files:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._files[old] = self.directory / f"{next(self._numbers)}.rec"
+            self.records[old].spill(self._files[old])
+
+    def __setitem__(self, key, record):
+        with self._lock:
+            replaced = self._files.pop(key, None)
+            if replaced:
+                # A spill that failed may never have created the file
+                replaced.unlink(missing_ok=True)
+            self.records[key] = record
+            self._touch(key)
+
+    def __getitem__(self, key):
+        with self._lock:
+            record = self.records[key]
+            record.reload()
+            self._touch(key)
+            return record
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def __iter__(self):
+        return iter(list(self.records))
+
+    def __len__(self):
+        return len(self.records)
+
+    def items(self):
+        """(key, record) pairs in insertion order; spilled records are not reloaded"""
+        return list(self.records.items())
+
+    def close(self):
+        """Remove the spill directory"""
+        shutil.rmtree(self.directory, ignore_errors=True)
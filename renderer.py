@@ -0,0 +1,137 @@
+import time
+import queue
+import threading
+
+from rich.table import Table
+from rich.text import Text
+
+# Events drained per render pass, and the pause between passes
+MAX_BATCH = 500
+RENDER_INTERVAL = 0.1
+
+
+class Renderer:
+    """Owns all terminal output produced by background scans.
+
+    Worker threads never touch the console; they post events to a queue.
+    A single renderer thread drains the queue in batches and prints
+    messages in order, and job status updates are coalesced (only the
+    latest per job is kept). The in-flight jobs are drawn by ask(), just
+    before the prompt, rather than by a live area that would fight the
+    prompt for the cursor; messages arriving while the prompt waits go on
+    their own lines and the prompt is drawn again below them.
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self.events = queue.Queue()
+        self.jobs = {}
+        self._prompt = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="renderer", daemon=True)
+                self._thread.start()
+
+    def post(self, kind, **data):
+        """Queue an event for the renderer thread"""
+        self._ensure_started()
+        self.events.put((kind, data))
+
+    def print(self, *objects, **kwargs):
+        """Queue a console.print call"""
+        self.post('print', objects=objects, kwargs=kwargs)
+
+    def job_started(self, job_id, description):
+        self.post('job', job_id=job_id, description=description, started=time.time(), detail="")
+
+    def job_progress(self, job_id, detail):
+        self.post('job', job_id=job_id, detail=detail)
+
+    def job_finished(self, job_id):
+        self.post('job_done', job_id=job_id)
+
+    def ask(self, prompt):
+        """Show in-flight jobs, then run a rich Prompt/Confirm instance and return its answer"""
+        with self._lock:
+            jobs = [dict(job) for job in self.jobs.values()]
+        if jobs:
+            self.console.print(self._status_table(jobs))
+        self._prompt = prompt.make_prompt(...)
+        try:
+            return prompt()
+        finally:
+            self._prompt = None
+
+    def stop(self, timeout=5):
+        """Flush queued output and stop the renderer thread"""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self.events.put(('stop', {}))
+        self._thread.join(timeout)
+
+    def _status_table(self, jobs):
+        table = Table.grid(padding=(0, 2))
+        now = time.time()
+        for job in jobs:
+            elapsed = int(now - job['started'])
+            table.add_row(Text("⏳", style="yellow"), Text(job['description'], style="bold yellow"),
+                          Text(job['detail'], style="white"), Text(f"{elapsed}s", style="dim"))
+        return table
+
+    def _drain(self):
+        """Block for the next event, then take whatever else is queued"""
+        batch = []
+        try:
+            batch.append(self.events.get(timeout=1.0))
+        except queue.Empty:
+            return batch
+        while len(batch) < MAX_BATCH:
+            try:
+                batch.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _render(self, batch):
+        stop = False
+        prompt = self._prompt
+        printed = False
+        for kind, data in batch:
+            if kind == 'print':
+                if prompt is not None and not printed:
+                    # Start below the prompt line instead of after what is being typed
+                    self.console.print()
+                printed = True
+                self.console.print(*data['objects'], **data['kwargs'])
+            elif kind == 'job':
+                with self._lock:
+                    job = self.jobs.setdefault(data['job_id'],
+                                               {'description': '', 'detail': '', 'started': time.time()})
+                    job.update(data)
+            elif kind == 'job_done':
+                with self._lock:
+                    self.jobs.pop(data['job_id'], None)
+            elif kind == 'stop':
+                stop = True
+
+        if printed and prompt is not None and self._prompt is not None and not stop:
+            self.console.print(prompt, end="")
+        return stop
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            try:
+                if self._render(batch):
+                    return
+            except Exception as e:
+                self.console.print(f"[red]Renderer error: {e}[/]")
+            if batch and not self._stopping:
+                # Let more events pile up so bursts render in one pass
+                time.sleep(RENDER_INTERVAL)
@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from circuit_breaker import CircuitOpen, run_scanner
+
+DEFAULT_DEPTH = 2
+DEFAULT_FAN_OUT = 10
+DEFAULT_WORKERS = 4
+
+# Upper bound on scanner processes running at once in this process. The
+# terminal prompt, API mode, planner, batch jobs and monitor all launch
+# scans through this one semaphore, so together they never exceed it.
+MAX_CONCURRENT_SCANS = int(os.environ.get("OSINT_MAX_SCANS", "4"))
+scan_slots = threading.BoundedSemaphore(MAX_CONCURRENT_SCANS)
+
+
+def run_cpp(command, target, timeout=120):
+    """Run one C++ scanner command and return its stdout"""
+    if not os.path.exists("./scanner"):
+        raise FileNotFoundError("C++ scanner binary not found")
+    with scan_slots:
+        result = run_scanner(command, ["./scanner", command, target], timeout, capture_output=True, text=True)
+    if result.returncode != 0:
+        detail = f": {result.stderr.strip()}" if result.stderr.strip() else ""
+        raise RuntimeError(f"scanner exited with code {result.returncode}{detail}")
+    return result.stdout.strip()
+
+
+def run_advanced(username, timeout=180):
+    """Run the Python advanced scanner in JSON mode and return its results dict"""
+    with scan_slots:
+        result = run_scanner(
+            "advanced", [sys.executable, "advanced_scanner.py", username, "--json"], timeout,
+            capture_output=True, text=True
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"advanced scanner exited with code {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def extract_ips(output):
+    """IPs from dlkp output lines such as '📍 A | 93.184.216.34'"""
+    ips = []
+    for line in output.splitlines():
+        parts = line.strip().split(' | ', 1)
+        if len(parts) == 2 and parts[0].endswith((" A", " AAAA")):
+            ips.append(parts[1].strip())
+    return [('ip', ip) for ip in ips]
+
+
+def extract_subdomains(output):
+    """Subdomains from ssll output lines such as '🔗 www.example.com'"""
+    return [('domain', line.strip()[2:].strip())
+            for line in output.splitlines() if line.strip().startswith("🔗 ")]
+
+
+def extract_linked_domains(results, username):
+    """Domains of links that are not themselves profile pages for the username.
+
+    Maigret/Sherlock hits are profile URLs on big platforms; following those
+    would only rescan twitter.com and friends, so they are skipped.
+    """
+    domains = []
+    for link in results.get('links', []):
+        parsed = urlparse(link)
+        host = (parsed.hostname or '').lower()
+        if not host or username.lower() in parsed.path.lower():
+            continue
+        domains.append(('domain', host[4:] if host.startswith('www.') else host))
+    return domains
+
+
+# kind -> [(scan name, description, runner, extractor)]
+SCAN_GRAPH = {
+    'domain': [
+        ('dlkp', "DNS Lookup", lambda v: run_cpp("dLkp", v), extract_ips),
+        ('whis', "WHOIS Information", lambda v: run_cpp("wHis", v), None),
+        ('ssll', "SSL Certificates", lambda v: run_cpp("sSll", v), extract_subdomains),
+        ('wbck', "Wayback Archive", lambda v: run_cpp("wBck", v), None),
+    ],
+    'ip': [
+        ('iplc', "IP Geolocation", lambda v: run_cpp("iPlc", v), None),
+    ],
+    'username': [
+        ('adv', "Advanced Username Scan", run_advanced, None),
+    ],
+}
+
+
+class ScanPlanner:
+    """Expands a seed target into a DAG of scans and runs independent nodes concurrently.
+
+    Each completed scan may yield child targets (domain -> IPs, username ->
+    linked domains), which are scheduled one level deeper until `max_depth`.
+    At most `fan_out` children are followed per scan.
+    """
+
+    def __init__(self, max_depth=DEFAULT_DEPTH, fan_out=DEFAULT_FAN_OUT, workers=DEFAULT_WORKERS,
+                 on_event=None):
+        self.max_depth = max_depth
+        self.fan_out = fan_out
+        self.workers = workers
+        self.on_event = on_event or (lambda event, **data: None)
+        self.nodes = {}
+        self.edges = []
+        self._lock = threading.Lock()
+
+    def _add_node(self, kind, value, depth, parent=None, via=None):
+        key = f"{kind}:{value}"
+        with self._lock:
+            if parent:
+                self.edges.append({'from': parent, 'to': key, 'via': via})
+            if key in self.nodes:
+                return None
+            self.nodes[key] = {
+                'kind': kind,
+                'value': value,
+                'depth': depth,
+                'parent': parent,
+                'scans': {},
+            }
+        self.on_event('node', key=key, kind=kind, value=value, depth=depth)
+        return key
+
+    def _tasks_for(self, key):
+        node = self.nodes[key]
+        return [(key, scan) for scan in SCAN_GRAPH.get(node['kind'], [])]
+
+    def _run_task(self, key, scan):
+        name, description, runner, _ = scan
+        node = self.nodes[key]
+        self.on_event('start', key=key, scan=name, description=description)
+        started = datetime.now()
+        output = runner(node['value'])
+        return output, (datetime.now() - started).total_seconds()
+
+    def _children(self, key, scan, output):
+        extractor = scan[3]
+        if extractor is None:
+            return []
+        node = self.nodes[key]
+        if node['kind'] == 'username':
+            children = extractor(output, node['value'])
+        else:
+            children = extractor(output)
+        unique = list(dict.fromkeys(c for c in children if c[1] and f"{c[0]}:{c[1]}" != key))
+        return unique[:self.fan_out]
+
+    def run(self, kind, value):
+        """Run the plan from a seed target and return the aggregated record"""
+        started = datetime.now()
+        seed = self._add_node(kind, value, 0)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            for key, scan in self._tasks_for(seed):
+                pending[executor.submit(self._run_task, key, scan)] = (key, scan)
+
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, scan = pending.pop(future)
+                    name = scan[0]
+                    try:
+                        output, elapsed = future.result()
+                    except CircuitOpen as e:
+                        # The host is down; record it and move on instead of waiting out timeouts
+                        self.nodes[key]['scans'][name] = {'status': 'deferred', 'error': str(e)}
+                        self.on_event('deferred', key=key, scan=name, description=scan[1], error=str(e))
+                        continue
+                    except Exception as e:
+                        self.nodes[key]['scans'][name] = {'status': 'failed', 'error': str(e)}
+                        self.on_event('failed', key=key, scan=name, description=scan[1], error=str(e))
+                        continue
+
+                    self.nodes[key]['scans'][name] = {'status': 'success', 'elapsed': elapsed, 'output': output}
+                    self.on_event('done', key=key, scan=name, description=scan[1])
+
+                    depth = self.nodes[key]['depth'] + 1
+                    if depth > self.max_depth:
+                        continue
+                    for child_kind, child_value in self._children(key, scan, output):
+                        child = self._add_node(child_kind, child_value, depth, parent=key, via=name)
+                        if child is None:
+                            continue
+                        for task in self._tasks_for(child):
+                            pending[executor.submit(self._run_task, *task)] = task
+
+        return {
+            'seed': seed,
+            'started': started.isoformat(timespec='seconds'),
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'max_depth': self.max_depth,
+            'fan_out': self.fan_out,
+            'nodes': self.nodes,
+            'edges': self.edges,
+        }
+
+
+def format_plan_results(record):
+    """Render an aggregated plan record as plain text for saving and display"""
+    lines = [f"Seed: {record['seed']}",
+             f"Nodes: {len(record['nodes'])} | Edges: {len(record['edges'])}",
+             ""]
+    for key, node in sorted(record['nodes'].items(), key=lambda item: (item[1]['depth'], item[0])):
+        via = f" (from {node['parent']})" if node['parent'] else ""
+        lines.append(f"{'  ' * node['depth']}■ {key}{via}")
+        for name, scan in node['scans'].items():
+            if scan['status'] == 'deferred':
+                lines.append(f"{'  ' * node['depth']}  ⏸ {name}: deferred, {scan['error']}")
+                continue
+            if scan['status'] != 'success':
+                lines.append(f"{'  ' * node['depth']}  ✗ {name}: {scan['error']}")
+                continue
+            output = scan['output']
+            if isinstance(output, dict):
+                output = json.dumps(output, indent=2)
+            lines.append(f"{'  ' * node['depth']}  ✓ {name} ({scan['elapsed']:.1f}s)")
+            for out_line in output.splitlines():
+                lines.append(f"{'  ' * node['depth']}    {out_line}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        planner = ScanPlanner(max_depth=int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_DEPTH,
+                              fan_out=int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_FAN_OUT)
+        print(json.dumps(planner.run(sys.argv[1], sys.argv[2]), indent=2, default=str))
+    else:
+        print("Usage: python scan_planner.py <domain|ip|username> <target> [depth] [fan-out]")
+        print("Example: python scan_planner.py domain example.com 2 10")
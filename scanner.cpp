@@ -10,6 +10,29 @@
 #include <regex>
 #include <algorithm>
 #include <cctype>
+#include <deque>
+#include <mutex>
+#include <condition_variable>
+#include <functional>
+#include <unordered_set>
+#include <fstream>
+#include <cstdlib>
+#include <cstring>
+#include <ctime>
+#include <cerrno>
+#include <stdexcept>
+#include <sys/types.h>
+#include <sys/socket.h>
+#include <netdb.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <poll.h>
+#include <cstdint>
+#include <cmath>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/file.h>
+#include <arpa/inet.h>
 
 using json = nlohmann::json;
 using namespace std;
@@ -21,15 +44,300 @@ string toLower(const string& str) {
     return result;
 }
 
+// Bounded buffer between a curl transfer and a stream consumer.
+// The writer blocks once `limit` bytes are queued, so memory stays flat
+// no matter how large the response body is.
+class ChunkStream : public streambuf {
+private:
+    mutex mtx;
+    condition_variable cv;
+    deque<string> chunks;
+    string current;
+    size_t buffered;
+    size_t limit;
+    bool finished;
+    bool aborted;
+
+protected:
+    int_type underflow() override {
+        if(gptr() < egptr()) {
+            return traits_type::to_int_type(*gptr());
+        }
+        unique_lock<mutex> lock(mtx);
+        cv.wait(lock, [this]() { return !chunks.empty() || finished || aborted; });
+        if(chunks.empty() || aborted) {
+            return traits_type::eof();
+        }
+        current.swap(chunks.front());
+        chunks.pop_front();
+        buffered -= current.size();
+        cv.notify_all();
+        setg(&current[0], &current[0], &current[0] + current.size());
+        return traits_type::to_int_type(*gptr());
+    }
+
+public:
+    explicit ChunkStream(size_t limit_bytes)
+        : buffered(0), limit(limit_bytes), finished(false), aborted(false) {}
+
+    // Returns false once the consumer has stopped reading
+    bool push(const char* data, size_t len) {
+        unique_lock<mutex> lock(mtx);
+        cv.wait(lock, [this]() { return buffered < limit || aborted; });
+        if(aborted) {
+            return false;
+        }
+        chunks.emplace_back(data, len);
+        buffered += len;
+        cv.notify_all();
+        return true;
+    }
+
+    void finish() {
+        lock_guard<mutex> lock(mtx);
+        finished = true;
+        cv.notify_all();
+    }
+
+    void abort() {
+        lock_guard<mutex> lock(mtx);
+        aborted = true;
+        chunks.clear();
+        buffered = 0;
+        cv.notify_all();
+    }
+};
+
+// SAX handler for the crt.sh JSON array: pulls host names out of each
+// certificate record without ever building the document tree, printing
+// each in-scope name the first time it is seen.
+class CertificateNameCollector : public nlohmann::json_sax<json> {
+private:
+    std::string domain;
+    std::string current_key;
+    int depth;
+
+    void addNames(const std::string& value) {
+        stringstream names(value);
+        std::string name;
+        while(getline(names, name)) {
+            name = toLower(name);
+            name.erase(remove_if(name.begin(), name.end(), ::isspace), name.end());
+            if(name.compare(0, 2, "*.") == 0) {
+                name = name.substr(2);
+            }
+            if(name.empty() || name.find('@') != std::string::npos) {
+                continue;
+            }
+            bool in_scope = name == domain ||
+                (name.size() > domain.size() &&
+                 name.compare(name.size() - domain.size() - 1, std::string::npos, "." + domain) == 0);
+            // Print each name the first time it shows up, so a reader of the
+            // pipe (sres) can start resolving before the download finishes
+            if(in_scope && subdomains.insert(name).second) {
+                cout << "  🔗 " << name << endl;
+            }
+        }
+    }
+
+public:
+    size_t certificates;
+    std::string first_common_name;
+    unordered_set<std::string> subdomains;
+
+    explicit CertificateNameCollector(const std::string& target)
+        : domain(toLower(target)), depth(0), certificates(0) {}
+
+    bool null() override { return true; }
+    bool boolean(bool) override { return true; }
+    bool number_integer(number_integer_t) override { return true; }
+    bool number_unsigned(number_unsigned_t) override { return true; }
+    bool number_float(number_float_t, const string_t&) override { return true; }
+    bool binary(binary_t&) override { return true; }
+
+    bool string(string_t& val) override {
+        if(depth == 2 && (current_key == "common_name" || current_key == "name_value")) {
+            if(current_key == "common_name" && first_common_name.empty()) {
+                first_common_name = val;
+            }
+            addNames(val);
+        }
+        return true;
+    }
+
+    bool start_object(size_t) override {
+        depth++;
+        if(depth == 2) {
+            certificates++;
+        }
+        return true;
+    }
+
+    bool key(string_t& val) override {
+        if(depth == 2) {
+            current_key = val;
+        }
+        return true;
+    }
+
+    bool end_object() override {
+        depth--;
+        return true;
+    }
+
+    bool start_array(size_t) override {
+        depth++;
+        return true;
+    }
+
+    bool end_array() override {
+        depth--;
+        return true;
+    }
+
+    bool parse_error(size_t, const std::string&, const nlohmann::detail::exception&) override {
+        return false;
+    }
+};
+
+// Read-only view of the offline IP table written by geo_db.py. The file is
+// memory-mapped, so opening it reads nothing up front; a lookup is a binary
+// search over the sorted range starts. Layout (little-endian): "OSINTGEO",
+// version, count, string table size, reserved; then start, end, country,
+// city, asn and org columns of `count` uint32 each; then the string table.
+class GeoTable {
+private:
+    const char* base;
+    size_t length;
+    uint32_t count;
+    const uint32_t* columns[6];
+    const char* strings;
+    uint32_t strings_size;
+
+    enum { START, END, COUNTRY, CITY, ASN, ORG };
+
+    string text(uint32_t offset) const {
+        return offset < strings_size ? string(strings + offset) : string();
+    }
+
+public:
+    struct Entry {
+        string country;
+        string city;
+        uint32_t asn;
+        string org;
+    };
+
+    GeoTable() : base(nullptr), length(0), count(0), strings(nullptr), strings_size(0) {}
+
+    ~GeoTable() {
+        if(base) {
+            munmap((void*)base, length);
+        }
+    }
+
+    bool open(const string& path) {
+        int fd = ::open(path.c_str(), O_RDONLY);
+        if(fd < 0) {
+            return false;
+        }
+        struct stat info;
+        const size_t header = 24;
+        if(fstat(fd, &info) != 0 || (size_t)info.st_size < header) {
+            close(fd);
+            return false;
+        }
+        void* mapped = mmap(nullptr, info.st_size, PROT_READ, MAP_SHARED, fd, 0);
+        close(fd);
+        if(mapped == MAP_FAILED) {
+            return false;
+        }
+        const char* data = (const char*)mapped;
+        uint32_t fields[4];
+        memcpy(fields, data + 8, sizeof(fields));
+        if(memcmp(data, "OSINTGEO", 8) != 0 || fields[0] != 1 ||
+           (size_t)info.st_size < header + 24 * (size_t)fields[1] + fields[2]) {
+            munmap(mapped, info.st_size);
+            return false;
+        }
+        base = data;
+        length = info.st_size;
+        count = fields[1];
+        for(int column = 0; column < 6; column++) {
+            columns[column] = (const uint32_t*)(data + header + 4 * (size_t)count * column);
+        }
+        strings = data + header + 24 * (size_t)count;
+        strings_size = fields[2];
+        return true;
+    }
+
+    bool lookup(const string& ip, Entry& entry) const {
+        in_addr addr;
+        if(!base || inet_pton(AF_INET, ip.c_str(), &addr) != 1) {
+            return false;
+        }
+        uint32_t number = ntohl(addr.s_addr);
+        const uint32_t* starts = columns[START];
+        size_t index = upper_bound(starts, starts + count, number) - starts;
+        if(index == 0 || columns[END][index - 1] < number) {
+            return false;
+        }
+        index--;
+        entry.country = text(columns[COUNTRY][index]);
+        entry.city = text(columns[CITY][index]);
+        entry.asn = columns[ASN][index];
+        entry.org = text(columns[ORG][index]);
+        return true;
+    }
+};
+
 class OSINTFramework {
 private:
     string user_agent;
+    CURLM* multi;
+
+    // DNS answers cached by "name|TYPE" until their TTL runs out
+    struct CachedAnswer {
+        chrono::steady_clock::time_point expires;
+        json answers;
+    };
+    map<string, CachedAnswer> dns_cache;
+
+    // WHOIS server per TLD, learned from IANA referrals and kept on disk
+    // so separate scanner runs skip the IANA round trip
+    map<string, string> whois_servers;
+    bool whois_servers_loaded;
+
+    // Not-found results shared with the Python scanner (negative_cache.py):
+    // "platform<TAB>identifier<TAB>expiry" lines, later lines win
+    map<string, time_t> negative_cache;
+    bool negative_cache_loaded;
+
+    // Offline geolocation/ASN table (geo_db.py), opened on first use
+    GeoTable geo_table;
+    bool geo_table_loaded;
+
+    // Latency histograms per host shared with the Python scanner (latency.py):
+    // "endpoint<TAB>count,count,..." over latencyBoundsMs() plus an overflow
+    // bucket. Samples from this run are merged into the file on exit.
+    map<string, vector<long>> latency_counts;
+    map<string, vector<long>> latency_pending;
+    bool latency_loaded;
+    mutex latency_mutex;
     
     static size_t WriteCallback(void* contents, size_t size, size_t nmemb, string* response) {
         size_t total_size = size * nmemb;
         response->append((char*)contents, total_size);
         return total_size;
     }
+
+    static size_t StreamCallback(void* contents, size_t size, size_t nmemb, ChunkStream* stream) {
+        size_t total_size = size * nmemb;
+        if(!stream->push((char*)contents, total_size)) {
+            return 0;  // Consumer is done, abort the transfer
+        }
+        return total_size;
+    }
     
     // Simple struct to hold request results
     struct RequestResult {
@@ -43,6 +351,11 @@ private:
         string response;
         long status_code = 0;
         
+        if(hostDeferred(hostOf(url))) {
+            RequestResult result;
+            result.status_code = 0;
+            return result;
+        }
         curl = curl_easy_init();
         
         if(curl) {
@@ -51,8 +364,9 @@ private:
             curl_easy_setopt(curl, CURLOPT_WRITEDATA, &response);
             curl_easy_setopt(curl, CURLOPT_USERAGENT, user_agent.c_str());
             curl_easy_setopt(curl, CURLOPT_FOLLOWLOCATION, 1L);
-            curl_easy_setopt(curl, CURLOPT_TIMEOUT, 30L);
+            curl_easy_setopt(curl, CURLOPT_TIMEOUT_MS, adaptiveTimeoutMs(hostOf(url), 30000));
             curl_easy_setopt(curl, CURLOPT_SSL_VERIFYPEER, 0L);
+            curl_easy_setopt(curl, CURLOPT_ACCEPT_ENCODING, "");
             
             struct curl_slist* chunk = NULL;
             for(const auto& header : headers) {
@@ -65,13 +379,14 @@ private:
             res = curl_easy_perform(curl);
             
             curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE, &status_code);
+            recordLatency(hostOf(url), curl, res);
             
             if(chunk) {
                 curl_slist_free_all(chunk);
             }
             
             if(res != CURLE_OK) {
-                cerr << "Request failed: " << curl_easy_strerror(res) << endl;
+                cerr << "Request failed (" << hostOf(url) << "): " << curl_easy_strerror(res) << endl;
             }
             
             curl_easy_cleanup(curl);
@@ -85,6 +400,869 @@ private:
         return result;
     }
     
+    // Fetch many URLs at once over the shared multi handle. Transfers to the
+    // same host are multiplexed over a single reused HTTP/2 connection, and
+    // the connection stays open for later calls. headers[i], if given, are
+    // extra request headers for urls[i].
+    vector<RequestResult> makeConcurrentRequests(const vector<string>& urls,
+                                                 const vector<vector<string>>& headers = {},
+                                                 size_t max_in_flight = 64) {
+        vector<RequestResult> results(urls.size());
+        vector<string> bodies(urls.size());
+        map<CURL*, size_t> active;
+        map<CURL*, struct curl_slist*> header_lists;
+        size_t next = 0;
+        int running = 0;
+
+        for(auto& result : results) {
+            result.status_code = 0;
+        }
+
+        while(next < urls.size() || !active.empty()) {
+            while(next < urls.size() && active.size() < max_in_flight) {
+                CURL* curl = hostDeferred(hostOf(urls[next])) ? NULL : curl_easy_init();
+                if(!curl) {
+                    next++;
+                    continue;
+                }
+                curl_easy_setopt(curl, CURLOPT_URL, urls[next].c_str());
+                curl_easy_setopt(curl, CURLOPT_WRITEFUNCTION, WriteCallback);
+                curl_easy_setopt(curl, CURLOPT_WRITEDATA, &bodies[next]);
+                curl_easy_setopt(curl, CURLOPT_USERAGENT, user_agent.c_str());
+                curl_easy_setopt(curl, CURLOPT_FOLLOWLOCATION, 1L);
+                curl_easy_setopt(curl, CURLOPT_TIMEOUT_MS, adaptiveTimeoutMs(hostOf(urls[next]), 30000));
+                curl_easy_setopt(curl, CURLOPT_SSL_VERIFYPEER, 0L);
+                curl_easy_setopt(curl, CURLOPT_ACCEPT_ENCODING, "");
+                curl_easy_setopt(curl, CURLOPT_HTTP_VERSION, (long)CURL_HTTP_VERSION_2TLS);
+                curl_easy_setopt(curl, CURLOPT_PIPEWAIT, 1L);
+                if(next < headers.size() && !headers[next].empty()) {
+                    struct curl_slist* list = NULL;
+                    for(const auto& header : headers[next]) {
+                        list = curl_slist_append(list, header.c_str());
+                    }
+                    curl_easy_setopt(curl, CURLOPT_HTTPHEADER, list);
+                    header_lists[curl] = list;
+                }
+                curl_multi_add_handle(multi, curl);
+                active[curl] = next++;
+            }
+
+            curl_multi_perform(multi, &running);
+
+            CURLMsg* msg;
+            int queued;
+            while((msg = curl_multi_info_read(multi, &queued))) {
+                if(msg->msg != CURLMSG_DONE) {
+                    continue;
+                }
+                CURL* curl = msg->easy_handle;
+                size_t index = active[curl];
+                if(msg->data.result != CURLE_OK) {
+                    cerr << "Request failed (" << hostOf(urls[index]) << "): "
+                         << curl_easy_strerror(msg->data.result) << endl;
+                }
+                curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE, &results[index].status_code);
+                recordLatency(hostOf(urls[index]), curl, msg->data.result);
+                results[index].response.swap(bodies[index]);
+                curl_multi_remove_handle(multi, curl);
+                curl_easy_cleanup(curl);
+                auto list = header_lists.find(curl);
+                if(list != header_lists.end()) {
+                    curl_slist_free_all(list->second);
+                    header_lists.erase(list);
+                }
+                active.erase(curl);
+            }
+
+            if(!active.empty()) {
+                curl_multi_wait(multi, NULL, 0, 1000, NULL);
+            }
+        }
+
+        return results;
+    }
+
+    static string dnsTypeName(int type) {
+        switch(type) {
+            case 1: return "A";
+            case 2: return "NS";
+            case 5: return "CNAME";
+            case 6: return "SOA";
+            case 15: return "MX";
+            case 16: return "TXT";
+            case 28: return "AAAA";
+            default: return "TYPE" + to_string(type);
+        }
+    }
+
+    // Split a dlkp argument into domains: "a.com,b.com" or "@file" (one per line)
+    static vector<string> expandTargets(const string& param) {
+        vector<string> targets;
+        if(!param.empty() && param[0] == '@') {
+            ifstream file(param.substr(1));
+            string line;
+            while(getline(file, line)) {
+                line.erase(remove_if(line.begin(), line.end(), ::isspace), line.end());
+                if(!line.empty() && line[0] != '#') {
+                    targets.push_back(line);
+                }
+            }
+        } else {
+            stringstream ss(param);
+            string item;
+            while(getline(ss, item, ',')) {
+                if(!item.empty()) {
+                    targets.push_back(item);
+                }
+            }
+        }
+        return targets;
+    }
+
+    // Send one query to a WHOIS server ("host" or "host:port", default port 43)
+    // and read the reply until the server closes the connection
+    static string whoisQuery(const string& server, const string& query, int timeout_ms = 15000) {
+        string host = server;
+        string port = "43";
+        size_t colon = server.rfind(':');
+        if(colon != string::npos && server.find(':') == colon) {
+            host = server.substr(0, colon);
+            port = server.substr(colon + 1);
+        }
+
+        struct addrinfo hints;
+        memset(&hints, 0, sizeof(hints));
+        hints.ai_family = AF_UNSPEC;
+        hints.ai_socktype = SOCK_STREAM;
+        struct addrinfo* addrs = NULL;
+        if(getaddrinfo(host.c_str(), port.c_str(), &hints, &addrs) != 0) {
+            cerr << "WHOIS: cannot resolve " << host << endl;
+            return "";
+        }
+
+        int fd = -1;
+        for(struct addrinfo* addr = addrs; addr && fd < 0; addr = addr->ai_next) {
+            fd = socket(addr->ai_family, addr->ai_socktype, addr->ai_protocol);
+            if(fd < 0) {
+                continue;
+            }
+            fcntl(fd, F_SETFL, fcntl(fd, F_GETFL, 0) | O_NONBLOCK);
+            if(connect(fd, addr->ai_addr, addr->ai_addrlen) == 0) {
+                break;
+            }
+            int error = errno;
+            struct pollfd pfd = {fd, POLLOUT, 0};
+            socklen_t len = sizeof(error);
+            if(error != EINPROGRESS || poll(&pfd, 1, timeout_ms) != 1 ||
+               getsockopt(fd, SOL_SOCKET, SO_ERROR, &error, &len) != 0 || error != 0) {
+                close(fd);
+                fd = -1;
+            }
+        }
+        freeaddrinfo(addrs);
+        if(fd < 0) {
+            cerr << "WHOIS: cannot connect to " << server << endl;
+            return "";
+        }
+
+        string request = query + "\r\n";
+        string response;
+        size_t sent = 0;
+        char buffer[4096];
+        auto deadline = chrono::steady_clock::now() + chrono::milliseconds(timeout_ms);
+        while(true) {
+            int remaining = (int)chrono::duration_cast<chrono::milliseconds>(
+                deadline - chrono::steady_clock::now()).count();
+            struct pollfd pfd = {fd, (short)(sent < request.size() ? POLLOUT : POLLIN), 0};
+            if(remaining <= 0 || poll(&pfd, 1, remaining) != 1) {
+                cerr << "WHOIS: timeout from " << server << endl;
+                break;
+            }
+            if(sent < request.size()) {
+                ssize_t n = send(fd, request.data() + sent, request.size() - sent, 0);
+                if(n < 0 && errno != EAGAIN) {
+                    break;
+                }
+                sent += n > 0 ? n : 0;
+                continue;
+            }
+            ssize_t n = recv(fd, buffer, sizeof(buffer), 0);
+            if(n < 0 && errno == EAGAIN) {
+                continue;
+            }
+            if(n <= 0 || response.size() > 1024 * 1024) {
+                break;
+            }
+            response.append(buffer, n);
+        }
+        close(fd);
+        return response;
+    }
+
+    // "Key: value" lines of a WHOIS reply, keys lowercased, repeats kept in order
+    static vector<pair<string, string>> parseWhois(const string& response) {
+        vector<pair<string, string>> fields;
+        stringstream ss(response);
+        string line;
+        while(getline(ss, line)) {
+            size_t start = line.find_first_not_of(" \t");
+            size_t colon = line.find(':');
+            if(start == string::npos || colon == string::npos || colon < start ||
+               line[start] == '%' || line[start] == '#' || line[start] == '>') {
+                continue;
+            }
+            string key = toLower(line.substr(start, colon - start));
+            size_t value_start = line.find_first_not_of(" \t", colon + 1);
+            if(value_start == string::npos) {
+                continue;
+            }
+            string value = line.substr(value_start);
+            value.erase(value.find_last_not_of(" \t\r") + 1);
+            if(!value.empty()) {
+                fields.push_back(make_pair(key, value));
+            }
+        }
+        return fields;
+    }
+
+    static vector<string> whoisValues(const vector<pair<string, string>>& fields,
+                                      const vector<string>& keys) {
+        vector<string> values;
+        unordered_set<string> seen;
+        for(const auto& key : keys) {
+            for(const auto& field : fields) {
+                if(field.first == key && seen.insert(toLower(field.second)).second) {
+                    values.push_back(field.second);
+                }
+            }
+            if(!values.empty()) {
+                break;  // First key with a value wins; later keys are fallbacks
+            }
+        }
+        return values;
+    }
+
+    // Normalise a referral such as "whois://whois.example.net/" to "whois.example.net"
+    static string whoisServerName(string value) {
+        size_t scheme = value.find("://");
+        if(scheme != string::npos) {
+            value = value.substr(scheme + 3);
+        }
+        while(!value.empty() && (value.back() == '/' || isspace((unsigned char)value.back()))) {
+            value.pop_back();
+        }
+        return toLower(value);
+    }
+
+    // Root of the referral chain; OSINT_WHOIS_SERVER points it at a local stand-in
+    static string whoisRootServer() {
+        const char* root = getenv("OSINT_WHOIS_SERVER");
+        return root && *root ? root : "whois.iana.org";
+    }
+
+    // Referrals learned from a stand-in root are never written to the shared cache
+    static string whoisCachePath() {
+        return whoisRootServer() == "whois.iana.org" ? "osint_results/whois_servers.tsv" : "";
+    }
+
+    string whoisServerFor(const string& tld) {
+        if(!whois_servers_loaded && !whoisCachePath().empty()) {
+            whois_servers_loaded = true;
+            ifstream cache(whoisCachePath());
+            string cached_tld, server;
+            while(cache >> cached_tld >> server) {
+                whois_servers[cached_tld] = server;
+            }
+        }
+        auto cached = whois_servers.find(tld);
+        if(cached != whois_servers.end()) {
+            return cached->second;
+        }
+
+        vector<pair<string, string>> fields = parseWhois(whoisQuery(whoisRootServer(), tld));
+        vector<string> refer = whoisValues(fields, {"refer", "whois"});
+        if(refer.empty()) {
+            return "";
+        }
+        string server = whoisServerName(refer[0]);
+        whois_servers[tld] = server;
+        if(!whoisCachePath().empty()) {
+            ofstream cache(whoisCachePath(), ios::app);
+            cache << tld << "\t" << server << "\n";
+        }
+        return server;
+    }
+
+    static string negativeCachePath() {
+        return "osint_results/negative_cache.tsv";
+    }
+
+    // Held while appending; negative_cache.py holds it while appending or compacting
+    static string negativeCacheLockPath() {
+        return "osint_results/negative_cache.lock";
+    }
+
+    // Misses are kept for a shorter time than real answers; 0 disables caching
+    static long negativeCacheTtl() {
+        const char* ttl = getenv("OSINT_NEGATIVE_TTL");
+        return ttl && *ttl ? atol(ttl) : 6 * 3600;
+    }
+
+    bool cachedMiss(const string& platform, const string& identifier) {
+        if(!negative_cache_loaded) {
+            negative_cache_loaded = true;
+            ifstream cache(negativeCachePath());
+            string line;
+            while(getline(cache, line)) {
+                size_t first = line.find('\t');
+                size_t second = first == string::npos ? string::npos : line.find('\t', first + 1);
+                if(second != string::npos) {
+                    negative_cache[line.substr(0, second)] = (time_t)atoll(line.c_str() + second + 1);
+                }
+            }
+        }
+        auto cached = negative_cache.find(platform + "\t" + identifier);
+        return cached != negative_cache.end() && cached->second > time(NULL);
+    }
+
+    void recordMiss(const string& platform, const string& identifier) {
+        long ttl = negativeCacheTtl();
+        if(ttl <= 0 || find_if(identifier.begin(), identifier.end(), ::isspace) != identifier.end()) {
+            return;
+        }
+        time_t expires = time(NULL) + ttl;
+        negative_cache[platform + "\t" + identifier] = expires;
+        int lock = open(negativeCacheLockPath().c_str(), O_WRONLY | O_CREAT | O_APPEND, 0644);
+        if(lock >= 0) {
+            flock(lock, LOCK_EX);
+        }
+        {
+            ofstream cache(negativeCachePath(), ios::app);
+            cache << platform << "\t" << identifier << "\t" << (long long)expires << "\n";
+        }
+        if(lock >= 0) {
+            flock(lock, LOCK_UN);
+            close(lock);
+        }
+    }
+
+    // Hosts whose circuit breaker is open in the terminal (circuit_breaker.py),
+    // passed down as OSINT_OPEN_HOSTS="a.com,b.com"; requests to them are skipped
+    static bool hostDeferred(const string& host) {
+        static unordered_set<string> open_hosts;
+        static once_flag parsed;
+        call_once(parsed, []() {
+            const char* hosts = getenv("OSINT_OPEN_HOSTS");
+            stringstream ss(hosts ? hosts : "");
+            string item;
+            while(getline(ss, item, ',')) {
+                if(!item.empty()) {
+                    open_hosts.insert(toLower(item));
+                }
+            }
+        });
+        if(open_hosts.count(host) == 0) {
+            return false;
+        }
+        cerr << "Request deferred (" << host << "): circuit open" << endl;
+        return true;
+    }
+
+    static const vector<long>& latencyBoundsMs() {
+        static const vector<long> bounds = {50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500,
+                                            10000, 15000, 20000, 30000, 60000, 120000, 180000};
+        return bounds;
+    }
+
+    static string latencyPath() {
+        return "osint_results/latency.tsv";
+    }
+
+    static map<string, vector<long>> readLatency() {
+        map<string, vector<long>> counts;
+        ifstream file(latencyPath());
+        string line;
+        while(getline(file, line)) {
+            size_t tab = line.find('\t');
+            if(line.empty() || line[0] == '#' || tab == string::npos) {
+                continue;
+            }
+            vector<long> values;
+            stringstream ss(line.substr(tab + 1));
+            string item;
+            while(getline(ss, item, ',')) {
+                if(item.empty() || !all_of(item.begin(), item.end(), ::isdigit)) {
+                    break;
+                }
+                values.push_back(atol(item.c_str()));
+            }
+            if(values.size() == latencyBoundsMs().size() + 1) {
+                counts[line.substr(0, tab)] = values;
+            }
+        }
+        return counts;
+    }
+
+    // Timeout for a host from its observed p99 with 2x headroom, between
+    // OSINT_TIMEOUT_MIN (seconds, default 2) and the old fixed default
+    long adaptiveTimeoutMs(const string& endpoint, long default_ms) {
+        const vector<long>& bounds = latencyBoundsMs();
+        vector<long> counts(bounds.size() + 1, 0);
+        {
+            lock_guard<mutex> lock(latency_mutex);
+            if(!latency_loaded) {
+                latency_loaded = true;
+                latency_counts = readLatency();
+            }
+            for(const auto* source : {&latency_counts, &latency_pending}) {
+                auto found = source->find(endpoint);
+                if(found != source->end()) {
+                    for(size_t i = 0; i < counts.size(); i++) {
+                        counts[i] += found->second[i];
+                    }
+                }
+            }
+        }
+        long total = 0;
+        for(long count : counts) {
+            total += count;
+        }
+        if(total < 20) {
+            return default_ms;
+        }
+        long seen = 0;
+        for(size_t i = 0; i < bounds.size(); i++) {
+            seen += counts[i];
+            if(seen * 100 >= total * 99) {
+                const char* floor = getenv("OSINT_TIMEOUT_MIN");
+                long minimum = (long)((floor && *floor ? atof(floor) : 2.0) * 1000);
+                return min(max(bounds[i] * 2, minimum), default_ms);
+            }
+        }
+        return default_ms;
+    }
+
+    // Only transfers that got an answer or ran out of time say how slow a host is
+    void recordLatency(const string& endpoint, CURL* curl, CURLcode res) {
+        long status_code = 0;
+        double seconds = 0;
+        curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE, &status_code);
+        curl_easy_getinfo(curl, CURLINFO_TOTAL_TIME, &seconds);
+        if(status_code == 0 && res != CURLE_OPERATION_TIMEDOUT) {
+            return;
+        }
+        const vector<long>& bounds = latencyBoundsMs();
+        size_t bucket = lower_bound(bounds.begin(), bounds.end(), (long)ceil(seconds * 1000)) - bounds.begin();
+        lock_guard<mutex> lock(latency_mutex);
+        vector<long>& counts = latency_pending[endpoint];
+        counts.resize(bounds.size() + 1, 0);
+        counts[bucket]++;
+    }
+
+    void saveLatency() {
+        lock_guard<mutex> lock(latency_mutex);
+        if(latency_pending.empty()) {
+            return;
+        }
+        map<string, vector<long>> counts = readLatency();
+        for(const auto& entry : latency_pending) {
+            vector<long>& merged = counts[entry.first];
+            merged.resize(entry.second.size(), 0);
+            long total = 0;
+            for(size_t i = 0; i < merged.size(); i++) {
+                merged[i] += entry.second[i];
+                total += merged[i];
+            }
+            // Halve past 2000 samples so old behaviour fades out
+            if(total > 2000) {
+                for(long& count : merged) {
+                    count /= 2;
+                }
+            }
+        }
+        string tmp = latencyPath() + "." + to_string(getpid()) + ".tmp";
+        {
+            ofstream file(tmp);
+            if(!file) {
+                return;
+            }
+            file << "# bounds_ms: ";
+            for(long bound : latencyBoundsMs()) {
+                file << bound << ",";
+            }
+            file << "overflow\n";
+            for(const auto& entry : counts) {
+                file << entry.first << "\t";
+                for(size_t i = 0; i < entry.second.size(); i++) {
+                    file << (i ? "," : "") << entry.second[i];
+                }
+                file << "\n";
+            }
+        }
+        rename(tmp.c_str(), latencyPath().c_str());
+        latency_pending.clear();
+    }
+
+    // Like makeRequest, but hands the body to `consume` as it arrives
+    // instead of buffering it into a string.
+    long makeStreamingRequest(const string& url, const function<void(istream&)>& consume) {
+        ChunkStream buffer(1 << 20);
+        long status_code = 0;
+        string host = hostOf(url);
+        if(hostDeferred(host)) {
+            return 0;
+        }
+        long timeout_ms = adaptiveTimeoutMs(host, 120000);
+
+        thread producer([&]() {
+            CURL* curl = curl_easy_init();
+            if(curl) {
+                curl_easy_setopt(curl, CURLOPT_URL, url.c_str());
+                curl_easy_setopt(curl, CURLOPT_WRITEFUNCTION, StreamCallback);
+                curl_easy_setopt(curl, CURLOPT_WRITEDATA, &buffer);
+                curl_easy_setopt(curl, CURLOPT_USERAGENT, user_agent.c_str());
+                curl_easy_setopt(curl, CURLOPT_FOLLOWLOCATION, 1L);
+                curl_easy_setopt(curl, CURLOPT_TIMEOUT_MS, timeout_ms);
+                curl_easy_setopt(curl, CURLOPT_SSL_VERIFYPEER, 0L);
+                curl_easy_setopt(curl, CURLOPT_ACCEPT_ENCODING, "");
+
+                CURLcode res = curl_easy_perform(curl);
+                curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE, &status_code);
+                recordLatency(host, curl, res);
+
+                if(res != CURLE_OK && res != CURLE_WRITE_ERROR) {
+                    cerr << "Request failed (" << host << "): " << curl_easy_strerror(res) << endl;
+                }
+
+                curl_easy_cleanup(curl);
+            }
+            buffer.finish();
+        });
+
+        istream body(&buffer);
+        consume(body);
+        buffer.abort();
+        producer.join();
+
+        this_thread::sleep_for(chrono::milliseconds(500));
+        return status_code;
+    }
+
+    // How an existence probe decides a hit without downloading the whole page
+    enum ProbeMode {
+        PROBE_HEAD,    // Status of a HEAD request; falls back to PROBE_STATUS if HEAD is refused
+        PROBE_STATUS,  // Status of a GET that is cut off at the first body byte
+        PROBE_MATCH    // Ranged GET of the first bytes, stopped as soon as the marker appears
+    };
+
+    struct ProbeState {
+        string marker;
+        string window;
+        size_t received;
+        size_t max_bytes;
+        bool matched;
+    };
+
+    struct ProbeResult {
+        long status_code;
+        bool matched;
+        bool deferred;
+    };
+
+    static size_t ProbeCallback(void* contents, size_t size, size_t nmemb, ProbeState* state) {
+        size_t total_size = size * nmemb;
+        if(state->marker.empty()) {
+            return 0;  // Status code already decided the probe
+        }
+        state->window.append((char*)contents, total_size);
+        state->received += total_size;
+        if(state->window.find(state->marker) != string::npos) {
+            state->matched = true;
+            return 0;
+        }
+        if(state->received >= state->max_bytes) {
+            return 0;
+        }
+        // Keep just enough to catch a marker split across two chunks
+        if(state->window.size() >= state->marker.size()) {
+            state->window.erase(0, state->window.size() - state->marker.size() + 1);
+        }
+        return total_size;
+    }
+
+    struct ProbeJob {
+        string url;
+        ProbeMode mode;
+        string marker;
+        vector<string> headers;
+        string host;
+        long min_interval_ms;
+        long timeout;
+        size_t max_bytes;
+    };
+
+    static string hostOf(const string& url) {
+        size_t start = url.find("://");
+        start = start == string::npos ? 0 : start + 3;
+        size_t end = url.find_first_of(":/?#", start);
+        return toLower(url.substr(start, end == string::npos ? string::npos : end - start));
+    }
+
+    // Run existence probes over the shared multi handle. Probes to different
+    // hosts overlap; probes to one host are spaced by its min_interval_ms.
+    vector<ProbeResult> probeConcurrent(const vector<ProbeJob>& jobs, size_t max_in_flight = 32) {
+        struct Active {
+            size_t index;
+            ProbeMode mode;
+            ProbeState state;
+            struct curl_slist* headers;
+        };
+
+        vector<ProbeResult> results(jobs.size());
+        deque<pair<size_t, ProbeMode>> pending;
+        for(size_t i = 0; i < jobs.size(); i++) {
+            results[i].status_code = 0;
+            results[i].matched = false;
+            results[i].deferred = hostDeferred(jobs[i].host);
+            if(!results[i].deferred) {
+                pending.push_back(make_pair(i, jobs[i].mode));
+            }
+        }
+        map<string, chrono::steady_clock::time_point> next_allowed;
+        map<CURL*, Active*> active;
+        int running = 0;
+
+        while(!pending.empty() || !active.empty()) {
+            auto now = chrono::steady_clock::now();
+            for(auto it = pending.begin(); it != pending.end() && active.size() < max_in_flight;) {
+                const ProbeJob& job = jobs[it->first];
+                auto ready = next_allowed.find(job.host);
+                if(ready != next_allowed.end() && ready->second > now) {
+                    ++it;
+                    continue;
+                }
+                next_allowed[job.host] = now + chrono::milliseconds(job.min_interval_ms);
+
+                Active* probe = new Active();
+                probe->index = it->first;
+                probe->mode = it->second;
+                probe->state.marker = probe->mode == PROBE_MATCH ? job.marker : "";
+                probe->state.received = 0;
+                probe->state.max_bytes = job.max_bytes;
+                probe->state.matched = false;
+                probe->headers = NULL;
+                for(const auto& header : job.headers) {
+                    probe->headers = curl_slist_append(probe->headers, header.c_str());
+                }
+                it = pending.erase(it);
+
+                CURL* curl = curl_easy_init();
+                if(!curl) {
+                    curl_slist_free_all(probe->headers);
+                    delete probe;
+                    continue;
+                }
+                curl_easy_setopt(curl, CURLOPT_URL, job.url.c_str());
+                curl_easy_setopt(curl, CURLOPT_WRITEFUNCTION, ProbeCallback);
+                curl_easy_setopt(curl, CURLOPT_WRITEDATA, &probe->state);
+                curl_easy_setopt(curl, CURLOPT_USERAGENT, user_agent.c_str());
+                curl_easy_setopt(curl, CURLOPT_FOLLOWLOCATION, 1L);
+                curl_easy_setopt(curl, CURLOPT_TIMEOUT_MS, adaptiveTimeoutMs(job.host, job.timeout * 1000));
+                curl_easy_setopt(curl, CURLOPT_SSL_VERIFYPEER, 0L);
+                curl_easy_setopt(curl, CURLOPT_ACCEPT_ENCODING, "");
+                curl_easy_setopt(curl, CURLOPT_HTTP_VERSION, (long)CURL_HTTP_VERSION_2TLS);
+                curl_easy_setopt(curl, CURLOPT_PIPEWAIT, 1L);
+                if(probe->headers) {
+                    curl_easy_setopt(curl, CURLOPT_HTTPHEADER, probe->headers);
+                }
+                if(probe->mode == PROBE_HEAD) {
+                    curl_easy_setopt(curl, CURLOPT_NOBODY, 1L);
+                } else if(probe->mode == PROBE_MATCH) {
+                    string range = "0-" + to_string(job.max_bytes - 1);
+                    curl_easy_setopt(curl, CURLOPT_RANGE, range.c_str());
+                }
+                curl_multi_add_handle(multi, curl);
+                active[curl] = probe;
+            }
+
+            curl_multi_perform(multi, &running);
+
+            CURLMsg* msg;
+            int queued;
+            while((msg = curl_multi_info_read(multi, &queued))) {
+                if(msg->msg != CURLMSG_DONE) {
+                    continue;
+                }
+                CURL* curl = msg->easy_handle;
+                Active* probe = active[curl];
+                ProbeResult& result = results[probe->index];
+                curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE, &result.status_code);
+                recordLatency(jobs[probe->index].host, curl, msg->data.result);
+                // Aborted and truncated transfers are expected; only a missing response is an error
+                if(msg->data.result != CURLE_OK && result.status_code == 0) {
+                    cerr << "Request failed (" << jobs[probe->index].host << "): "
+                         << curl_easy_strerror(msg->data.result) << endl;
+                }
+                result.matched = probe->state.matched;
+                if(probe->mode == PROBE_HEAD && (result.status_code == 405 || result.status_code == 501)) {
+                    pending.push_back(make_pair(probe->index, PROBE_STATUS));
+                }
+                curl_multi_remove_handle(multi, curl);
+                curl_easy_cleanup(curl);
+                curl_slist_free_all(probe->headers);
+                delete probe;
+                active.erase(curl);
+            }
+
+            if(!active.empty()) {
+                curl_multi_wait(multi, NULL, 0, 100, NULL);
+            } else if(!pending.empty()) {
+                this_thread::sleep_for(chrono::milliseconds(10));
+            }
+        }
+
+        return results;
+    }
+
+    // Platform registry shared with the Python scanner (platforms.json)
+    struct PlatformField {
+        string field;
+        vector<string> path;
+        string display;
+    };
+
+    struct PlatformSpec {
+        string name;
+        string key;
+        string url;
+        ProbeMode mode;
+        string marker;
+        vector<long> expect_status;
+        vector<string> headers;
+        long min_interval_ms;
+        long timeout;
+        vector<PlatformField> extract;
+
+        // Every {username}, like str.replace in platform_registry.py
+        static string substitute(string text, const string& username) {
+            size_t pos = 0;
+            while((pos = text.find("{username}", pos)) != string::npos) {
+                text.replace(pos, 10, username);
+                pos += username.size();
+            }
+            return text;
+        }
+
+        string urlFor(const string& username) const {
+            return substitute(url, username);
+        }
+
+        bool expects(long status) const {
+            // A ranged request may come back as 206 where the registry lists 200
+            return find(expect_status.begin(), expect_status.end(), status) != expect_status.end() ||
+                   (status == 206 && find(expect_status.begin(), expect_status.end(), 200L) != expect_status.end());
+        }
+    };
+
+    vector<PlatformSpec> platforms;
+    bool platforms_loaded;
+
+    // Follow a registry path such as {"them", "0", "pictures"}; null if absent
+    static json jsonPath(const json& data, const vector<string>& path) {
+        const json* node = &data;
+        for(const auto& part : path) {
+            if(node->is_object() && node->find(part) != node->end()) {
+                node = &(*node)[part];
+            } else if(node->is_array() && !part.empty() && all_of(part.begin(), part.end(), ::isdigit) &&
+                      stoul(part) < node->size()) {
+                node = &(*node)[stoul(part)];
+            } else {
+                return json();
+            }
+        }
+        return *node;
+    }
+
+    // OSINT_PLATFORMS, else platforms.json next to the executable (as Python
+    // resolves it next to platform_registry.py), whatever the working directory
+    static string platformsPath() {
+        const char* path = getenv("OSINT_PLATFORMS");
+        if(path && *path) {
+            return path;
+        }
+        char exe[4096];
+        ssize_t length = readlink("/proc/self/exe", exe, sizeof(exe) - 1);
+        if(length > 0) {
+            string dir(exe, length);
+            size_t slash = dir.rfind('/');
+            if(slash != string::npos) {
+                return dir.substr(0, slash + 1) + "platforms.json";
+            }
+        }
+        return "platforms.json";
+    }
+
+    // Load platforms.json once; entries the Python validator would reject are
+    // skipped, but a missing or unparsable registry is an error, not zero platforms
+    const vector<PlatformSpec>& loadPlatforms() {
+        if(platforms_loaded) {
+            return platforms;
+        }
+        ifstream file(platformsPath());
+        json raw;
+        try {
+            raw = json::parse(file);
+        } catch (...) {
+            throw runtime_error("Could not read platform registry: " + platformsPath());
+        }
+        platforms_loaded = true;
+
+        json defaults = raw.value("defaults", json::object());
+        for(const auto& entry : raw.value("platforms", json::array())) {
+            PlatformSpec spec;
+            // A wrongly typed field (say a numeric header value) skips the entry rather than the registry
+            try {
+                json merged = defaults;
+                merged.update(entry);
+                spec.name = merged.value("name", "");
+                spec.key = merged.value("key", "");
+                spec.url = merged.value("url", "");
+                string probe = merged.value("probe", "status");
+                spec.mode = probe == "head" ? PROBE_HEAD : probe == "match" ? PROBE_MATCH : PROBE_STATUS;
+                spec.marker = merged.value("marker", "");
+                spec.expect_status = merged.value("expect_status", vector<long>{200});
+                json headers = merged.value("headers", json::object());
+                for(const auto& header : headers.items()) {
+                    spec.headers.push_back(header.key() + ": " + header.value().get<std::string>());
+                }
+                double rate = merged.value("rate_per_sec", 2.0);
+                spec.min_interval_ms = rate > 0 ? (long)(1000 / rate) : 0;
+                spec.timeout = merged.value("timeout", 10L);
+                for(const auto& item : merged.value("extract", json::array())) {
+                    PlatformField field;
+                    field.field = item.value("field", "");
+                    stringstream path(item.value("path", ""));
+                    string part;
+                    while(getline(path, part, '.')) {
+                        field.path.push_back(part);
+                    }
+                    field.display = item.value("display", "");
+                    spec.extract.push_back(field);
+                }
+            } catch (const json::exception&) {
+                cerr << "Skipping invalid platform entry: " << entry.dump() << endl;
+                continue;
+            }
+            if(spec.name.empty() || spec.key.empty() || spec.url.find("{username}") == string::npos ||
+               (spec.mode == PROBE_MATCH && spec.marker.empty())) {
+                cerr << "Skipping invalid platform entry: " << entry.dump() << endl;
+                continue;
+            }
+            platforms.push_back(spec);
+        }
+        return platforms;
+    }
+
     json parseJSON(const string& response) {
         try {
             return json::parse(response);
@@ -94,67 +1272,181 @@ private:
     }
 
 public:
-    OSINTFramework() : user_agent("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36") {
+    OSINTFramework() : user_agent("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"),
+                       whois_servers_loaded(false), negative_cache_loaded(false), geo_table_loaded(false),
+                       latency_loaded(false), platforms_loaded(false) {
         curl_global_init(CURL_GLOBAL_DEFAULT);
+        multi = curl_multi_init();
+        curl_multi_setopt(multi, CURLMOPT_PIPELINING, CURLPIPE_MULTIPLEX);
+        curl_multi_setopt(multi, CURLMOPT_MAX_HOST_CONNECTIONS, 1L);
     }
     
     ~OSINTFramework() {
+        saveLatency();
+        curl_multi_cleanup(multi);
         curl_global_cleanup();
     }
 
-    // wTnk - Username search across multiple platforms
-    void usernameSearch(const string& username) {
+    // wTnk - Username search across multiple platforms; wPrb skips the profile details
+    void usernameSearch(const string& username, bool details = true) {
         cout << "\n🔍 Searching for username: " << username << endl;
 
-        map<string, string> platforms = {
-            {"Reddit", "https://www.reddit.com/user/" + username + "/about.json"},
-            {"GitHub", "https://api.github.com/users/" + username},
-            {"GitLab", "https://gitlab.com/api/v4/users?username=" + username},
-            {"Keybase", "https://keybase.io/_/api/1.0/user/lookup.json?usernames=" + username}
-        };
+        const vector<PlatformSpec>& specs = loadPlatforms();
+        vector<ProbeJob> jobs;
+        vector<size_t> probed;
+        for(size_t i = 0; i < specs.size(); i++) {
+            if(cachedMiss(specs[i].key, username)) {
+                continue;
+            }
+            ProbeJob job;
+            job.url = specs[i].urlFor(username);
+            job.mode = specs[i].mode;
+            job.marker = PlatformSpec::substitute(specs[i].marker, username);
+            job.headers = specs[i].headers;
+            job.host = hostOf(job.url);
+            job.min_interval_ms = specs[i].min_interval_ms;
+            job.timeout = specs[i].timeout;
+            job.max_bytes = 64 * 1024;
+            jobs.push_back(job);
+            probed.push_back(i);
+        }
+        vector<ProbeResult> probes = probeConcurrent(jobs);
 
-        for(map<string, string>::const_iterator it = platforms.begin(); it != platforms.end(); ++it) {
-            cout << "📱 Checking " << it->first << "... ";
-            RequestResult result = makeRequest(it->second);
-            bool exists = (result.status_code == 200);
-            if (exists) {
-                cout << "✅ FOUND: " + it->second << endl;
-                json data = parseJSON(result.response);
-                if (!data.empty()) {
-                    if (it->first == "GitHub") {
-                        cout << "  👤 Name: " << data.value("name", "N/A") << endl;
-                        cout << "  📊 Repos: " << data.value("public_repos", 0) << endl;
-                        cout << "  👥 Followers: " << data.value("followers", 0) << endl;
-                    } else if (it->first == "Reddit") {
-                        if (data.find("data") != data.end()) {
-                            auto user_data = data["data"];
-                            cout << "  ⭐ Karma: " << user_data.value("total_karma", 0) << endl;
-                            cout << "  🕒 Created: " << user_data.value("created_utc", 0) << endl;
-                        }
-                    } else if (it->first == "GitLab") {
-                        if (data.is_array() && !data.empty()) {
-                            auto user_data = data[0];
-                            cout << "  👤 Name: " << user_data.value("name", "N/A") << endl;
-                        }
-                    }
+        // Only hits with fields to show pay for the full profile document
+        vector<bool> exists(specs.size(), false);
+        vector<bool> deferred(specs.size(), false);
+        vector<string> detail_urls;
+        vector<vector<string>> detail_headers;
+        vector<size_t> detail_specs;
+        for(size_t n = 0; n < probed.size(); n++) {
+            const PlatformSpec& spec = specs[probed[n]];
+            deferred[probed[n]] = probes[n].deferred;
+            bool answered = spec.expects(probes[n].status_code);
+            exists[probed[n]] = answered && (spec.mode != PROBE_MATCH || probes[n].matched);
+            if(!exists[probed[n]]) {
+                // Only definite answers are cached, never rate limits or outages
+                if(probes[n].status_code == 404 || answered) {
+                    recordMiss(spec.key, username);
                 }
-            } else {
+                continue;
+            }
+            bool has_display = false;
+            for(const auto& field : spec.extract) {
+                has_display = has_display || !field.display.empty();
+            }
+            if(details && has_display) {
+                detail_urls.push_back(jobs[n].url);
+                detail_headers.push_back(spec.headers);
+                detail_specs.push_back(probed[n]);
+            }
+        }
+        vector<RequestResult> documents = makeConcurrentRequests(detail_urls, detail_headers);
+        map<size_t, json> profiles;
+        for(size_t n = 0; n < documents.size(); n++) {
+            profiles[detail_specs[n]] = parseJSON(documents[n].response);
+        }
+
+        for(size_t i = 0; i < specs.size(); i++) {
+            cout << "📱 Checking " << specs[i].name << "... ";
+            if (deferred[i]) {
+                cout << "⏸️ DEFERRED: host unavailable" << endl;
+                continue;
+            }
+            if (!exists[i]) {
                 cout << "❌ NOT FOUND" << endl;
+                continue;
+            }
+            cout << "✅ FOUND: " + specs[i].urlFor(username) << endl;
+            auto profile = profiles.find(i);
+            if (profile == profiles.end() || profile->second.empty()) {
+                continue;
+            }
+            for(const auto& field : specs[i].extract) {
+                if(field.display.empty()) {
+                    continue;
+                }
+                json value = jsonPath(profile->second, field.path);
+                cout << "  " << field.display << ": "
+                     << (value.is_null() ? "N/A" : value.is_string() ? value.get<std::string>() : value.dump()) << endl;
             }
         }
     }
 
-    // dLkp - DNS lookup
-    void dnsLookup(const string& domain) {
-        cout << "\n🌐 DNS Lookup for: " << domain << endl;
-        string url = "https://dns.google/resolve?name=" + domain + "&type=A";
-        RequestResult result = makeRequest(url);
-        json data = parseJSON(result.response);
-        
-        if(!data.empty() && data.find("Answer") != data.end()) {
-            for(const auto& answer : data["Answer"]) {
-                cout << "📍 " << answer.value("type", 0) 
-                     << " | " << answer.value("data", "N/A") << endl;
+    // dLkp - DNS lookup (A, AAAA, CNAME, MX, NS, TXT and SOA; accepts "a.com,b.com" or "@file")
+    void dnsLookup(const string& param) {
+        static const char* record_types[] = {"A", "AAAA", "CNAME", "MX", "NS", "TXT", "SOA"};
+        vector<string> domains;
+        unordered_set<string> seen;
+        for(const auto& domain : expandTargets(param)) {
+            if(seen.insert(toLower(domain)).second) {
+                domains.push_back(domain);
+            }
+        }
+        auto now = chrono::steady_clock::now();
+
+        // Queue every (domain, type) pair that is not already cached
+        vector<string> keys;
+        vector<string> urls;
+        for(const auto& domain : domains) {
+            for(const char* type : record_types) {
+                string key = toLower(domain) + "|" + type;
+                auto cached = dns_cache.find(key);
+                if(cached != dns_cache.end() && cached->second.expires > now) {
+                    continue;
+                }
+                keys.push_back(key);
+                urls.push_back("https://dns.google/resolve?name=" + domain + "&type=" + type);
+            }
+        }
+
+        vector<RequestResult> responses = makeConcurrentRequests(urls);
+        for(size_t i = 0; i < responses.size(); i++) {
+            json data = parseJSON(responses[i].response);
+            if(responses[i].status_code != 200 || data.empty()) {
+                continue;  // Leave failures uncached so they are retried
+            }
+
+            CachedAnswer entry;
+            entry.answers = json::array();
+            long ttl = 300;  // Negative answers fall back to the SOA minimum below
+            bool have_ttl = false;
+            if(data.find("Answer") != data.end()) {
+                for(const auto& answer : data["Answer"]) {
+                    entry.answers.push_back(answer);
+                    long answer_ttl = answer.value("TTL", 300L);
+                    ttl = have_ttl ? min(ttl, answer_ttl) : answer_ttl;
+                    have_ttl = true;
+                }
+            } else if(data.find("Authority") != data.end()) {
+                for(const auto& authority : data["Authority"]) {
+                    ttl = min(ttl, authority.value("TTL", 300L));
+                }
+            }
+            entry.expires = now + chrono::seconds(ttl);
+            dns_cache[keys[i]] = entry;
+        }
+
+        for(const auto& domain : domains) {
+            cout << "\n🌐 DNS Lookup for: " << domain << endl;
+            bool any = false;
+            for(const char* type : record_types) {
+                auto cached = dns_cache.find(toLower(domain) + "|" + type);
+                if(cached == dns_cache.end()) {
+                    continue;
+                }
+                for(const auto& answer : cached->second.answers) {
+                    // A CNAME chain is echoed for every type; only print the record asked for
+                    string answer_type = dnsTypeName(answer.value("type", 0));
+                    if(answer_type != type) {
+                        continue;
+                    }
+                    cout << "📍 " << answer_type
+                         << " | " << answer.value("data", "N/A") << endl;
+                    any = true;
+                }
+            }
+            if(!any) {
+                cout << "❌ No DNS records found" << endl;
             }
         }
     }
@@ -183,9 +1475,17 @@ public:
     // gHub - GitHub info
     void githubInfo(const string& username) {
         cout << "\n💻 GitHub Info for: " << username << endl;
+        if(cachedMiss("github", username)) {
+            cout << "❌ User not found" << endl;
+            return;
+        }
         string url = "https://api.github.com/users/" + username;
         RequestResult result = makeRequest(url);
         json data = parseJSON(result.response);
+        if(result.status_code == 404) {
+            recordMiss("github", username);
+            data = json();
+        }
         
         if(!data.empty()) {
             cout << "👤 Name: " << data.value("name", "N/A") << endl;
@@ -201,9 +1501,16 @@ public:
     // rDdt - Reddit info
     void redditInfo(const string& username) {
         cout << "\n📱 Reddit Info for: " << username << endl;
+        if(cachedMiss("reddit", username)) {
+            cout << "❌ User not found" << endl;
+            return;
+        }
         string url = "https://www.reddit.com/user/" + username + "/about.json";
         RequestResult result = makeRequest(url);
         json data = parseJSON(result.response);
+        if(result.status_code == 404) {
+            recordMiss("reddit", username);
+        }
         
         if(!data.empty() && data.find("data") != data.end()) {
             auto user_data = data["data"];
@@ -214,9 +1521,39 @@ public:
         }
     }
 
-    // iPlc - IP location
+    static string geoTablePath() {
+        const char* path = getenv("OSINT_GEO_DB");
+        return path && *path ? path : "osint_results/geo.bin";
+    }
+
+    const GeoTable& geoTable() {
+        if(!geo_table_loaded) {
+            geo_table_loaded = true;
+            geo_table.open(geoTablePath());
+        }
+        return geo_table;
+    }
+
+    // iPlc - IP location, from the local table when it has the address;
+    // OSINT_GEO_OFFLINE=1 turns off the ipapi.co fallback
     void ipLocation(const string& ip) {
         cout << "\n📍 IP Location for: " << ip << endl;
+        GeoTable::Entry entry;
+        if(geoTable().lookup(ip, entry)) {
+            cout << "🏙️ City: " << (entry.city.empty() ? "N/A" : entry.city) << endl;
+            cout << "🌍 Country: " << (entry.country.empty() ? "N/A" : entry.country) << endl;
+            cout << "🏢 ISP: " << (entry.org.empty() ? "N/A" : entry.org) << endl;
+            if(entry.asn) {
+                cout << "🔢 ASN: AS" << entry.asn << endl;
+            }
+            cout << "📚 Source: local database" << endl;
+            return;
+        }
+        const char* offline = getenv("OSINT_GEO_OFFLINE");
+        if(offline && string(offline) == "1") {
+            cout << "❌ IP not in local database" << endl;
+            return;
+        }
         string url = "http://ipapi.co/" + ip + "/json/";
         RequestResult result = makeRequest(url);
         json data = parseJSON(result.response);
@@ -230,21 +1567,63 @@ public:
         }
     }
 
-    // wHis - WHOIS lookup
-    void whoisLookup(const string& domain) {
-        cout << "\n🔍 WHOIS Lookup for: " << domain << endl;
-        string url = "https://www.whois.com/whois/" + domain;
-        RequestResult result = makeRequest(url);
-        
-        regex domain_regex("Domain Name: ([^\\n]+)");
-        regex created_regex("Creation Date: ([^\\n]+)");
-        
-        smatch match;
-        if(regex_search(result.response, match, domain_regex)) {
-            cout << "🏷️ Domain: " << match[1] << endl;
-        }
-        if(regex_search(result.response, match, created_regex)) {
-            cout << "📅 Created: " << match[1] << endl;
+    // wHis - WHOIS lookup over port 43, following IANA -> registry -> registrar
+    // referrals (accepts "a.com,b.com" or "@file")
+    void whoisLookup(const string& param) {
+        // Output label, field names in order of preference, and whether every value is shown
+        static const struct { const char* label; vector<string> keys; bool all; } field_map[] = {
+            {"🏷️ Domain: ", {"domain name", "domain"}, false},
+            {"🏢 Registrar: ", {"registrar", "sponsoring registrar", "registrar name"}, false},
+            {"📅 Created: ", {"creation date", "created", "registered", "registration time", "created on"}, false},
+            {"🔄 Updated: ", {"updated date", "last updated", "last-update", "changed", "last modified"}, false},
+            {"⏳ Expires: ", {"registry expiry date", "registrar registration expiration date", "expiry date",
+                              "expiration date", "expires", "paid-till", "expiration time"}, false},
+            {"📌 Status: ", {"domain status", "status", "state"}, true},
+            {"🖥️ Name Server: ", {"name server", "nserver", "nameservers", "name servers"}, true},
+        };
+
+        for(const auto& domain : expandTargets(param)) {
+            cout << "\n🔍 WHOIS Lookup for: " << domain << endl;
+            string name = toLower(domain);
+            size_t dot = name.rfind('.');
+            string server = whoisServerFor(dot == string::npos ? name : name.substr(dot + 1));
+            if(server.empty()) {
+                cout << "❌ No WHOIS server found" << endl;
+                continue;
+            }
+
+            // Registry answer first; a registrar referral adds the fields it lacks
+            vector<pair<string, string>> fields;
+            vector<string> chain;
+            for(int hop = 0; hop < 3 && !server.empty(); hop++) {
+                if(find(chain.begin(), chain.end(), server) != chain.end()) {
+                    break;
+                }
+                chain.push_back(server);
+                vector<pair<string, string>> reply = parseWhois(whoisQuery(server, domain));
+                fields.insert(fields.end(), reply.begin(), reply.end());
+                vector<string> referral = whoisValues(reply, {"registrar whois server", "referralserver"});
+                server = referral.empty() ? "" : whoisServerName(referral[0]);
+            }
+
+            if(fields.empty()) {
+                cout << "❌ No WHOIS data" << endl;
+                continue;
+            }
+            for(const auto& field : field_map) {
+                vector<string> values = whoisValues(fields, field.keys);
+                if(!field.all && values.size() > 1) {
+                    values.resize(1);
+                }
+                for(const auto& value : values) {
+                    cout << field.label << value << endl;
+                }
+            }
+            string via;
+            for(const auto& hop : chain) {
+                via += (via.empty() ? "" : " -> ") + hop;
+            }
+            cout << "🔗 Source: " << via << endl;
         }
     }
 
@@ -252,18 +1631,31 @@ public:
     void sslInfo(const string& domain) {
         cout << "\n🔒 SSL Certificates for: " << domain << endl;
         string url = "https://crt.sh/?q=" + domain + "&output=json";
-        RequestResult result = makeRequest(url);
-        
-        try {
-            json data = json::parse(result.response);
-            if(data.is_array() && !data.empty()) {
-                cout << "📜 Found " << data.size() << " certificates" << endl;
-                auto cert = data[0];
-                cout << "📛 Common Name: " << cert.value("common_name", "N/A") << endl;
+
+        CertificateNameCollector collector(domain);
+        bool parsed = false;
+        long status_code = makeStreamingRequest(url, [&](istream& body) {
+            try {
+                parsed = json::sax_parse(body, &collector);
+            } catch (...) {
+                parsed = false;
             }
-        } catch (...) {
-            cout << "❌ No certificate data" << endl;
+        });
+
+        if(status_code != 200 || !parsed || collector.certificates == 0) {
+            if(collector.subdomains.empty()) {
+                cout << "❌ No certificate data" << endl;
+            } else {
+                cout << "⚠️ Certificate data incomplete" << endl;
+                cout << "🌐 Unique subdomains: " << collector.subdomains.size() << endl;
+            }
+            return;
         }
+
+        // The names themselves were printed by the collector as they arrived
+        cout << "📜 Found " << collector.certificates << " certificates" << endl;
+        cout << "📛 Common Name: " << (collector.first_common_name.empty() ? "N/A" : collector.first_common_name) << endl;
+        cout << "🌐 Unique subdomains: " << collector.subdomains.size() << endl;
     }
 
     // eMbp - Email breach check
@@ -304,9 +1696,17 @@ public:
     // hNws - Hacker News user
     void hackerNewsUser(const string& username) {
         cout << "\n👨‍💻 Hacker News User: " << username << endl;
+        if(cachedMiss("hackernews", username)) {
+            cout << "❌ User not found" << endl;
+            return;
+        }
         string url = "https://hacker-news.firebaseio.com/v0/user/" + username + ".json";
         RequestResult result = makeRequest(url);
         json data = parseJSON(result.response);
+        // The API answers 200 with a null body for unknown users
+        if(result.status_code == 200 && data.is_null()) {
+            recordMiss("hackernews", username);
+        }
         
         if(!data.empty()) {
             cout << "⭐ Karma: " << data.value("karma", 0) << endl;
@@ -318,9 +1718,16 @@ public:
     // sOvf - Stack Overflow user
     void stackOverflowUser(const string& user_id) {
         cout << "\n💼 Stack Overflow User ID: " << user_id << endl;
+        if(cachedMiss("stackoverflow", user_id)) {
+            cout << "❌ User not found" << endl;
+            return;
+        }
         string url = "https://api.stackexchange.com/2.3/users/" + user_id + "?site=stackoverflow";
         RequestResult result = makeRequest(url);
         json data = parseJSON(result.response);
+        if(result.status_code == 200 && data.is_object() && data.find("items") != data.end() && data["items"].empty()) {
+            recordMiss("stackoverflow", user_id);
+        }
         
         if(!data.empty() && data.find("items") != data.end() && !data["items"].empty()) {
             auto user = data["items"][0];
@@ -369,6 +1776,9 @@ void parseCommand(const string& command, OSINTFramework& osint) {
     if (cmdLower == "wtnk" && !param.empty()) {
         osint.usernameSearch(param);
     }
+    else if (cmdLower == "wprb" && !param.empty()) {
+        osint.usernameSearch(param, false);
+    }
     else if (cmdLower == "dlkp" && !param.empty()) {
         osint.dnsLookup(param);
     }
@@ -411,12 +1821,13 @@ void parseCommand(const string& command, OSINTFramework& osint) {
     else if (cmdLower == "help") {
         cout << "\n🛠️ OSINT Commands:" << endl;
         cout << "wTnk + username    - Username search across platforms" << endl;
-        cout << "dLkp + domain      - DNS lookup" << endl;
+        cout << "wPrb + username    - Username existence probe (no profile details)" << endl;
+        cout << "dLkp + domain      - DNS lookup (a.com,b.com or @file for batch)" << endl;
         cout << "wBck + domain      - Wayback Machine URLs" << endl;
         cout << "gHub + username    - GitHub user info" << endl;
         cout << "rDdt + username    - Reddit user info" << endl;
         cout << "iPlc + IP          - IP geolocation" << endl;
-        cout << "wHis + domain      - WHOIS lookup" << endl;
+        cout << "wHis + domain      - WHOIS lookup (a.com,b.com or @file for batch)" << endl;
         cout << "sSll + domain      - SSL certificate info" << endl;
         cout << "eMbp + email       - Email breach check" << endl;
         cout << "bTcn + address     - Bitcoin address info" << endl;
@@ -443,7 +1854,12 @@ int main(int argc, char* argv[]) {
     if (argc >= 3) {
         string command = argv[1];
         string target = argv[2];
-        parseCommand(command + " " + target, osint);
+        try {
+            parseCommand(command + " " + target, osint);
+        } catch (const exception& e) {
+            cerr << "❌ " << e.what() << endl;
+            return 1;
+        }
         return 0;
     }
     
@@ -457,7 +1873,11 @@ int main(int argc, char* argv[]) {
         getline(cin, command);
         
         if (!command.empty()) {
-            parseCommand(command, osint);
+            try {
+                parseCommand(command, osint);
+            } catch (const exception& e) {
+                cerr << "❌ " << e.what() << endl;
+            }
         }
     }
 
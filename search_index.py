@@ -0,0 +1,152 @@
+import re
+import sys
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+
+RESULTS_DIR = Path("osint_results")
+INDEX_PATH = RESULTS_DIR / "search_index.db"
+DEFAULT_LIMIT = 20
+# Header written by save_scan_results ahead of the scan output
+HEADER_PATTERN = re.compile(r'Command: (\S+) ?(.*)\nTimestamp: (.+)\n=+\n\n?')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+-- rowid of each indexed document is its files.id
+CREATE VIRTUAL TABLE IF NOT EXISTS results USING fts5(
+    command, target, timestamp UNINDEXED, body
+);
+"""
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must appear, punctuation is literal.
+
+    URLs and emails become phrase queries, so "github.com/bob" matches the
+    tokens github, com, bob next to each other.
+    """
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def parse_result_file(text):
+    """(command, target, timestamp, body) from a saved result file"""
+    match = HEADER_PATTERN.search(text, 0, 512)
+    if not match:
+        return '', '', '', text
+    return match.group(1), match.group(2).strip(), match.group(3).strip(), text[match.end():]
+
+
+class SearchIndex:
+    """Full-text index over saved scan results, kept in SQLite FTS5.
+
+    save_scan_results adds each file as it is written; sync() picks up
+    files written before the index existed, changed or deleted since, so
+    only the difference is ever re-read.
+    """
+
+    def __init__(self, path=INDEX_PATH, results_dir=RESULTS_DIR):
+        self.path = path
+        self.results_dir = results_dir
+        self._conn = None
+        self._synced = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _store(self, conn, path, stat, command, target, timestamp, body):
+        self._forget(conn, path)
+        file_id = conn.execute("INSERT INTO files (path, mtime, size) VALUES (?, ?, ?)",
+                               (path, stat.st_mtime, stat.st_size)).lastrowid
+        conn.execute("INSERT INTO results (rowid, command, target, timestamp, body) VALUES (?, ?, ?, ?, ?)",
+                     (file_id, command, target, timestamp, body))
+
+    def _forget(self, conn, path):
+        row = conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM results WHERE rowid = ?", row)
+            conn.execute("DELETE FROM files WHERE id = ?", row)
+
+    def add(self, filename, command, target, timestamp, body):
+        """Index a result file that was just written"""
+        path = str(filename)
+        stat = Path(filename).stat()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._store(conn, path, stat, command, target, timestamp, body)
+
+    def sync(self):
+        """Index new or changed result files and forget deleted ones; returns (added, removed)"""
+        with self._lock:
+            conn = self._connect()
+            known = {path: (mtime, size) for path, mtime, size in conn.execute("SELECT path, mtime, size FROM files")}
+            added = 0
+            with conn:
+                for filename in self.results_dir.glob("*.txt"):
+                    path = str(filename)
+                    stat = filename.stat()
+                    if known.pop(path, None) == (stat.st_mtime, stat.st_size):
+                        continue
+                    with open(filename, encoding='utf-8', errors='replace') as f:
+                        self._store(conn, path, stat, *parse_result_file(f.read()))
+                    added += 1
+                for path in known:
+                    self._forget(conn, path)
+            self._synced = True
+            return added, len(known)
+
+    def search(self, text, limit=DEFAULT_LIMIT, highlight=('[', ']')):
+        """Best matches first as (path, command, target, timestamp, snippet) tuples"""
+        query = fts_query(text)
+        if not query:
+            return []
+        if not self._synced:
+            self.sync()
+        with self._lock:
+            return self._connect().execute(
+                "SELECT files.path, command, target, timestamp, snippet(results, 3, ?, ?, '…', 12) "
+                "FROM results JOIN files ON files.id = results.rowid "
+                "WHERE results MATCH ? ORDER BY rank LIMIT ?", (*highlight, query, limit)).fetchall()
+
+    def rebuild(self):
+        """Drop everything and index the results directory from scratch"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM results")
+                conn.execute("DELETE FROM files")
+        return self.sync()
+
+
+search_index = SearchIndex()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search saved scan results")
+    parser.add_argument("text", nargs="*", help="words, URLs or emails to look for")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--rebuild", action="store_true", help="re-index every saved result")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        added, _ = search_index.rebuild()
+        print(f"Indexed {added} result files")
+    if args.text:
+        for path, command, target, timestamp, snippet in search_index.search(" ".join(args.text), args.limit):
+            print(f"{timestamp}  {command} {target}  {path}\n    {snippet}")
+    elif not args.rebuild:
+        parser.print_usage()
+        sys.exit(1)
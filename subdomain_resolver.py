@@ -0,0 +1,218 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from rich.console import Console
+
+from circuit_breaker import CircuitOpen, breakers, SCAN_HOSTS
+
+DOH_URL = "https://dns.google/resolve"
+DOH_HOST = "dns.google"
+RECORD_TYPES = {1: "A", 28: "AAAA", 5: "CNAME"}
+DEFAULT_WORKERS = 16
+NEGATIVE_TTL = 300
+
+_local = threading.local()
+
+
+def get_session():
+    """Return the calling thread's HTTP session"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({'User-Agent': 'OSINT-Tool/1.0', 'Accept': 'application/dns-json'})
+        _local.session = session
+    return session
+
+
+class DNSCache:
+    """Thread-safe answer cache honouring each record's TTL"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            expires, answer = entry
+            if expires < time.time():
+                del self._entries[name]
+                return None
+            return answer
+
+    def put(self, name, answer, ttl):
+        with self._lock:
+            self._entries[name] = (time.time() + max(ttl, 0), answer)
+
+
+# Shared across pipelines in the same process
+dns_cache = DNSCache()
+
+
+def stream_subdomains(domain, scanner="./scanner", timeout=120):
+    """Yield subdomains from the C++ certificate lookup as its output arrives.
+
+    Raises FileNotFoundError if the scanner binary is missing, and
+    CircuitOpen before starting the scanner while crt.sh is failing.
+    """
+    if not os.path.exists(scanner):
+        raise FileNotFoundError("C++ scanner binary not found")
+    host = SCAN_HOSTS['ssll']
+    breakers.check(host)
+
+    process = subprocess.Popen(
+        [scanner, "ssll", domain],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env=breakers.subprocess_env(),
+    )
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        for line in process.stdout:
+            line = line.strip()
+            if line.startswith("🔗 "):
+                yield line[2:].strip()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+        # The scanner only writes a few lines to stderr, so reading it last cannot block it
+        stderr = process.stderr.read()
+        process.stderr.close()
+        process.wait()
+        if timed_out.is_set():
+            breakers.record(host, 'timeout')
+        else:
+            breakers.record_output(stderr, host)
+
+
+def resolve_name(name, timeout=10):
+    """Resolve A and AAAA records for a name over DNS-over-HTTPS"""
+    cached = dns_cache.get(name)
+    if cached is not None:
+        return dict(cached, cached=True)
+
+    addresses = []
+    cnames = []
+    ttls = []
+    status = None
+
+    for record_type in ("A", "AAAA"):
+        with breakers.guarded(DOH_HOST, requests.Timeout, requests.RequestException) as outcome:
+            r = get_session().get(DOH_URL, params={'name': name, 'type': record_type}, timeout=timeout)
+            if r.status_code >= 500 or r.status_code == 429:
+                outcome['kind'] = 'error'
+        r.raise_for_status()
+        data = r.json()
+        status = data.get('Status', status)
+        for answer in data.get('Answer', []):
+            rtype = RECORD_TYPES.get(answer.get('type'))
+            ttls.append(answer.get('TTL', NEGATIVE_TTL))
+            if rtype in ("A", "AAAA"):
+                addresses.append(answer.get('data', ''))
+            elif rtype == "CNAME":
+                cnames.append(answer.get('data', '').rstrip('.'))
+
+    answer = {
+        'name': name,
+        'addresses': list(dict.fromkeys(addresses)),
+        'cnames': list(dict.fromkeys(cnames)),
+        'status': 'NOERROR' if status == 0 else 'NXDOMAIN' if status == 3 else f'RCODE{status}',
+        'ttl': min(ttls) if ttls else NEGATIVE_TTL,
+    }
+    dns_cache.put(name, answer, answer['ttl'])
+    return dict(answer, cached=False)
+
+
+def resolve_subdomains(names, workers=DEFAULT_WORKERS, timeout=10):
+    """Resolve names concurrently, yielding each answer as soon as it completes.
+
+    `names` may be any iterable, including a generator that is still
+    producing; at most `workers * 2` lookups are in flight at a time.
+    """
+    seen = set()
+    window = max(workers, 1) * 2
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        names = iter(names)
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                try:
+                    name = next(names)
+                except StopIteration:
+                    exhausted = True
+                    break
+                name = name.strip().lower().rstrip('.')
+                if not name or name in seen:
+                    continue
+                seen.add(name)
+                pending[executor.submit(resolve_name, name, timeout)] = name
+
+            if not pending:
+                continue
+
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    yield future.result()
+                except CircuitOpen as e:
+                    yield {'name': name, 'addresses': [], 'cnames': [], 'status': 'DEFERRED',
+                           'ttl': 0, 'cached': False, 'error': str(e)}
+                except Exception as e:
+                    yield {'name': name, 'addresses': [], 'cnames': [], 'status': 'ERROR',
+                           'ttl': 0, 'cached': False, 'error': str(e)}
+
+
+def format_answer(answer):
+    """Render one resolution result as a single output line"""
+    if answer['status'] == 'DEFERRED':
+        return f"⏸️ {answer['name']} | deferred: {answer['error']}"
+    if answer.get('error'):
+        return f"❌ {answer['name']} | error: {answer['error']}"
+    if not answer['addresses']:
+        return f"❌ {answer['name']} | {answer['status']}"
+    via = f" (via {', '.join(answer['cnames'])})" if answer['cnames'] else ""
+    return f"✅ {answer['name']} | {', '.join(answer['addresses'])}{via}"
+
+
+def resolve_certificate_subdomains(domain, workers=DEFAULT_WORKERS):
+    """Pipeline: certificate lookup -> concurrent resolution"""
+    return resolve_subdomains(stream_subdomains(domain), workers=workers)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        console = Console()
+        domain = sys.argv[1]
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WORKERS
+        console.print(f"\n🌐 [bold cyan]Resolving certificate subdomains for: {domain}[/bold cyan]")
+        resolved = total = 0
+        for answer in resolve_certificate_subdomains(domain, workers):
+            total += 1
+            if answer['addresses']:
+                resolved += 1
+            console.print(format_answer(answer), markup=False)
+        console.print(f"\n📊 Resolved {resolved}/{total} subdomains")
+    else:
+        print("Usage: python subdomain_resolver.py <domain> [workers]")
+        print("Example: python subdomain_resolver.py example.com 32")
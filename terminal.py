@@ -1,10 +1,9 @@
 import os
-import time
 import sys
 import subprocess
 import threading
-import json
 import platform
+import itertools
 from pathlib import Path
 from datetime import datetime
 
@@ -13,18 +12,47 @@ from colorama import Fore, Style
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from rich.prompt import Prompt, Confirm
 from rich.text import Text
+from rich.markup import escape
 from rich import box
 
+from renderer import Renderer
+
+from subdomain_resolver import resolve_certificate_subdomains, format_answer
+from scan_planner import ScanPlanner, SCAN_GRAPH, format_plan_results, DEFAULT_DEPTH, DEFAULT_FAN_OUT, scan_slots
+from batch_jobs import BatchJob, CPP_COMMANDS, PYTHON_COMMANDS, run_job_command
+from monitor import Monitor, TargetHistory, format_delta
+from records import ScanRecord, SessionStore
+from search_index import search_index
+from entity_graph import entity_graph, guess_type
+from geo_db import GeoTable, GEO_DB_PATH, write_bulk
+from coordinator import CoordinatorClient, JobExpired
+from circuit_breaker import CircuitOpen, breakers, run_scanner, OPEN, HALF_OPEN
+from latency import latency
+
 colorama.init()
 console = Console()
 
+# Background scans report through the renderer thread, never the console directly
+renderer = Renderer(console)
+_job_ids = itertools.count(1)
+
+def next_job_id(prefix):
+    """Unique ID for a job listed above the prompt while it runs"""
+    return f"{prefix}_{next(_job_ids)}"
+
 # Global results storage
-scan_results = {}
+scan_results = SessionStore()
 current_session = {}
 
+# Set from --coordinator / OSINT_COORDINATOR to run scans on remote workers
+coordinator_client = None
+
+# Result panels longer than this are cut short; 'view' pages the full output
+PANEL_MAX_LINES = 40
+PANEL_MAX_CHARS = 6000
+
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
@@ -58,57 +86,96 @@ def save_scan_results(command, target, results):
         results_dir = create_results_directory()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = results_dir / f"{command}_{target}_{timestamp}.txt"
+        saved_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(f"weThink OSINT Scan Results\n")
             f.write(f"Command: {command} {target}\n")
-            f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Timestamp: {saved_at}\n")
             f.write("=" * 50 + "\n\n")
             f.write(results)
-        
-        return filename
     except Exception as e:
-        console.print(f"[yellow]Warning: Could not save results: {e}[/]")
+        renderer.print(f"[yellow]Warning: Could not save results: {e}[/]")
         return None
+    
+    try:
+        search_index.add(filename, command, target, saved_at, results)
+    except Exception as e:
+        renderer.print(f"[yellow]Warning: Could not index results: {e}[/]")
+    return filename
+
+def link_result(record):
+    """Merge a scan record's entities into the pivot graph"""
+    try:
+        entity_graph.add_record(record)
+    except Exception as e:
+        renderer.print(f"[yellow]Warning: Could not update entity graph: {e}[/]")
+
+def remember_result(session_key, record):
+    """Keep a scan record for this session and merge its entities into the pivot graph"""
+    scan_results[session_key] = record
+    link_result(record)
+
+def save_and_link(prefix, command, target, output):
+    """Save a batch or API scan and merge it into the pivot graph"""
+    filename = save_scan_results(f"{prefix}_{command}", target, output)
+    kind = 'python' if command in PYTHON_COMMANDS else 'cpp'
+    link_result(ScanRecord.from_output(kind, command, target, output, filename))
+    return filename
+
+def run_remote(command, target, timeout):
+    """Run a scan on a coordinator worker, returning it like subprocess.run would"""
+    job_id = coordinator_client.submit(command, target)
+    try:
+        job = coordinator_client.wait(job_id, timeout=timeout)
+    except TimeoutError:
+        raise subprocess.TimeoutExpired(f"remote {command} {target}", timeout)
+    except JobExpired as e:
+        return subprocess.CompletedProcess(command, 1, stdout="", stderr=str(e))
+    if job['status'] == 'failed':
+        return subprocess.CompletedProcess(command, 1, stdout="", stderr=job['error'] or "")
+    return subprocess.CompletedProcess(command, 0, stdout=job['output'] or "", stderr="")
 
 def run_scanner_command(command, target, timeout=120):
     """Run C++ scanner command"""
     try:
-        if not os.path.exists("./scanner"):
+        if coordinator_client is None and not os.path.exists("./scanner"):
             return "[bold red]C++ Scanner binary not found.[/]"
         
-        console.print(f"[bold yellow][C++ Scanner] Executing: {command} {target}[/]")
-        
-        with console.status(f"[bold green]Running {command} scan...", spinner="dots") as status:
-            result = subprocess.run(
-                ["./scanner", command, target],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+        job_id = next_job_id("cpp")
+        renderer.job_started(job_id, f"[C++ Scanner] {command} {target}")
+        try:
+            with scan_slots:
+                if coordinator_client is not None:
+                    result = run_remote(command.lower(), target, timeout)
+                else:
+                    result = run_scanner(
+                        command,
+                        ["./scanner", command, target],
+                        timeout,
+                        capture_output=True,
+                        text=True
+                    )
+        finally:
+            renderer.job_finished(job_id)
         
         output = result.stdout.strip()
         
         if result.returncode == 0:
             filename = save_scan_results(f"cpp_{command}", target, output)
             if filename:
-                console.print(f"[green]Results saved to: {filename}[/]")
+                renderer.print(f"[green]Results saved to: {filename}[/]")
             
             session_key = f"cpp_{command}_{target}"
-            scan_results[session_key] = {
-                'timestamp': datetime.now(),
-                'command': command,
-                'target': target,
-                'results': output,
-                'saved_to': str(filename) if filename else None,
-                'type': 'cpp'
-            }
+            remember_result(session_key, ScanRecord.from_output('cpp', command, target, output, filename))
             
             return output
         else:
             error_msg = f"[bold red]C++ Scanner Error (Code {result.returncode}):[/]\n{result.stderr}"
             return error_msg
             
+    except CircuitOpen as e:
+        return f"[yellow]⏸️  Deferred {command} {target}: {e}[/]"
     except subprocess.TimeoutExpired:
         return "[bold red]C++ Scan timeout: Operation took too long[/]"
     except FileNotFoundError:
@@ -119,35 +186,35 @@ def run_scanner_command(command, target, timeout=120):
 def run_advanced_scanner(username, timeout=180):
     """Run the Python advanced scanner"""
     try:
-        if not os.path.exists("advanced_scanner.py"):
+        if coordinator_client is None and not os.path.exists("advanced_scanner.py"):
             return "[bold red]Advanced Python scanner not found.[/]"
         
-        console.print(f"[bold yellow][Python Scanner] Executing advanced scan for: {username}[/]")
-        
-        with console.status(f"[bold green]Running advanced OSINT scan...", spinner="dots") as status:
-            result = subprocess.run(
-                [sys.executable, "advanced_scanner.py", username],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+        job_id = next_job_id("python")
+        renderer.job_started(job_id, f"[Python Scanner] advanced scan {username}")
+        try:
+            with scan_slots:
+                if coordinator_client is not None:
+                    result = run_remote("adv", username, timeout)
+                else:
+                    result = run_scanner(
+                        "advanced",
+                        [sys.executable, "advanced_scanner.py", username],
+                        timeout,
+                        capture_output=True,
+                        text=True
+                    )
+        finally:
+            renderer.job_finished(job_id)
         
         output = result.stdout.strip()
         
         if result.returncode == 0:
             filename = save_scan_results("advanced_python", username, output)
             if filename:
-                console.print(f"[green]Advanced results saved to: {filename}[/]")
+                renderer.print(f"[green]Advanced results saved to: {filename}[/]")
             
             session_key = f"advanced_python_{username}"
-            scan_results[session_key] = {
-                'timestamp': datetime.now(),
-                'command': 'advanced',
-                'target': username,
-                'results': output,
-                'saved_to': str(filename) if filename else None,
-                'type': 'python'
-            }
+            remember_result(session_key, ScanRecord.from_output('python', 'advanced', username, output, filename))
             
             return output
         else:
@@ -161,85 +228,440 @@ def run_advanced_scanner(username, timeout=180):
     except Exception as e:
         return f"[bold red]Advanced scanner execution error: {e}[/]"
 
+def result_panel(result, title, border_style, session_key=None):
+    """Build a result panel capped at PANEL_MAX_LINES / PANEL_MAX_CHARS"""
+    lines = result.splitlines()
+    if len(lines) <= PANEL_MAX_LINES and len(result) <= PANEL_MAX_CHARS:
+        return Panel(result, title=title, border_style=border_style)
+    
+    shown = "\n".join(lines[:PANEL_MAX_LINES])[:PANEL_MAX_CHARS]
+    hidden = len(lines) - shown.count("\n") - 1
+    hint = f"\n[dim]... {hidden} more lines"
+    if session_key in scan_results:
+        hint += f" - type 'view {list(scan_results).index(session_key) + 1}' to page through the full output"
+    return Panel(shown + hint + "[/]", title=title, border_style=border_style)
+
+def view_result(selector):
+    """Page through a stored result by session number or key"""
+    keys = list(scan_results)
+    if selector.isdigit() and 1 <= int(selector) <= len(keys):
+        key = keys[int(selector) - 1]
+    elif selector in scan_results:
+        key = selector
+    else:
+        console.print(f"[bold red]No session result: {selector}[/]")
+        console.print("[yellow]Type 'session' to list results[/]")
+        return
+    
+    result = scan_results[key]
+    with console.pager(styles=True):
+        console.print(f"[bold cyan]{result.command} {result.target}[/] "
+                      f"({result.when.strftime('%H:%M:%S')})\n")
+        console.print(Text(result.output))
+
 def run_scanner_command_async(command, target):
     """Run scanner command asynchronously"""
     def run_and_display():
         result = run_scanner_command(command, target)
         
-        console.print(f"\n[bold cyan]C++ Scanner Results for {command} {target}:[/]")
+        renderer.print(f"\n[bold cyan]C++ Scanner Results for {command} {target}:[/]")
         
         if "error" in result.lower() or "not found" in result:
-            console.print(Panel(result, title=f"[red]C++ Scan Failed: {command}[/]", border_style="red"))
+            renderer.print(result_panel(result, f"[red]C++ Scan Failed: {command}[/]", "red"))
         else:
-            console.print(Panel(result, title=f"[green]C++ Scan Complete: {command}[/]", border_style="green"))
+            renderer.print(result_panel(result, f"[green]C++ Scan Complete: {command}[/]", "green",
+                                        f"cpp_{command}_{target}"))
     
     thread = threading.Thread(target=run_and_display)
     thread.daemon = True
     thread.start()
     
-    console.print(f"[yellow]Started C++ async scan: {command} {target}[/]")
+    renderer.print(f"[yellow]Started C++ async scan: {command} {target}[/]")
 
 def run_advanced_scanner_async(username):
     """Run advanced Python scanner asynchronously"""
     def run_and_display():
         result = run_advanced_scanner(username)
         
-        console.print(f"\n[bold cyan]Python Advanced Scanner Results for {username}:[/]")
+        renderer.print(f"\n[bold cyan]Python Advanced Scanner Results for {username}:[/]")
         
         if "error" in result.lower() or "not found" in result:
-            console.print(Panel(result, title=f"[red]Advanced Scan Failed[/]", border_style="red"))
+            renderer.print(result_panel(result, f"[red]Advanced Scan Failed[/]", "red"))
         else:
-            console.print(Panel(result, title=f"[green]Advanced Scan Complete[/]", border_style="green"))
+            renderer.print(result_panel(result, f"[green]Advanced Scan Complete[/]", "green",
+                                        f"advanced_python_{username}"))
     
     thread = threading.Thread(target=run_and_display)
     thread.daemon = True
     thread.start()
     
-    console.print(f"[yellow]Started Python advanced async scan: {username}[/]")
-
-def run_comprehensive_scan(target_type, target):
-    """Run multiple scans based on target type"""
-    scans = []
-    
-    if target_type == "domain":
-        scans = [
-            ("dLkp", target, "DNS Lookup"),
-            ("wHis", target, "WHOIS Information"),
-            ("sSll", target, "SSL Certificates"),
-            ("wBck", target, "Wayback Archive"),
-        ]
-    elif target_type == "username":
-        # Use Python advanced scanner for usernames
-        console.print(f"[bold blue]Starting comprehensive username scan: {target}[/]")
-        run_advanced_scanner_async(target)
+    renderer.print(f"[yellow]Started Python advanced async scan: {username}[/]")
+
+def run_subdomain_resolution(domain):
+    """Resolve certificate subdomains concurrently, printing hosts as they resolve"""
+    renderer.print(f"[bold yellow][Pipeline] Certificate lookup -> DNS resolution: {domain}[/]")
+    
+    lines = []
+    resolved = 0
+    job_id = next_job_id("resolve")
+    renderer.job_started(job_id, f"Resolving certificate subdomains: {domain}")
+    try:
+        for answer in resolve_certificate_subdomains(domain):
+            line = format_answer(answer)
+            lines.append(line)
+            if answer['addresses']:
+                resolved += 1
+            renderer.print(line, markup=False)
+            renderer.job_progress(job_id, f"{resolved}/{len(lines)} resolved")
+    except CircuitOpen as e:
+        renderer.print(f"[yellow]⏸️  Deferred certificate lookup for {domain}: {e}[/]")
         return
-        
-    elif target_type == "ip":
-        scans = [
-            ("iPlc", target, "IP Geolocation"),
-        ]
-    
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        TimeElapsedColumn(),
-    ) as progress:
-        
-        task = progress.add_task(f"Running comprehensive {target_type} scan...", total=len(scans))
-        
-        for command, target_value, description in scans:
-            progress.update(task, description=f"Running {description}...")
-            result = run_scanner_command(command, target_value)
-            
-            if "error" not in result.lower() and "not found" not in result:
-                progress.console.print(f"[green]Success: {description}[/]")
-            else:
-                progress.console.print(f"[red]Failed: {description}[/]")
-            
-            progress.update(task, advance=1)
-            time.sleep(1)
+    except Exception as e:
+        renderer.print(f"[bold red]Subdomain resolution error: {e}[/]")
+        return
+    finally:
+        renderer.job_finished(job_id)
+    
+    if not lines:
+        renderer.print(f"[yellow]No certificate subdomains found for {domain}[/]")
+        return
+    
+    summary = f"Resolved {resolved}/{len(lines)} subdomains"
+    output = "\n".join(lines + ["", summary])
+    renderer.print(f"[bold green]{summary}[/]")
+    
+    filename = save_scan_results("resolve", domain, output)
+    if filename:
+        renderer.print(f"[green]Results saved to: {filename}[/]")
+    
+    remember_result(f"resolve_{domain}", ScanRecord.from_output('python', 'sres', domain, output, filename))
+
+def run_bulk_geolocation(source):
+    """Enrich every IP in a file or CIDR range from the local geo table, writing a CSV"""
+    try:
+        table = GeoTable()
+    except (OSError, ValueError) as e:
+        renderer.print(f"[red]No usable local geo table ({e}); build one with: python geo_db.py build --geo <csv>[/]")
+        return
+    
+    job_id = next_job_id("geo")
+    renderer.job_started(job_id, f"Bulk geolocation: {source}")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    label = Path(source).name if os.path.isfile(source) else source.replace("/", "_")
+    filename = create_results_directory() / f"iplc_{label}_{timestamp}.csv"
+    try:
+        if os.path.isfile(source):
+            with open(source, encoding='utf-8', errors='replace') as f, \
+                    open(filename, 'w', newline='', encoding='utf-8') as out:
+                count = write_bulk(table.enrich(f), out)
+        else:
+            with open(filename, 'w', newline='', encoding='utf-8') as out:
+                count = write_bulk(table.enrich([source]), out)
+    except ValueError as e:
+        filename.unlink()
+        renderer.print(f"[red]Bulk geolocation failed: {e}[/]")
+        return
+    finally:
+        renderer.job_finished(job_id)
+    
+    renderer.print(f"[bold green]Enriched {count} addresses from {GEO_DB_PATH}[/]")
+    renderer.print(f"[green]Results saved to: {filename}[/]")
+
+def run_comprehensive_scan(target_type, target, max_depth=DEFAULT_DEPTH, fan_out=DEFAULT_FAN_OUT):
+    """Plan and run dependent scans from a seed domain or username; IPs are reached through DNS answers"""
+    renderer.print(f"[bold blue]Planning comprehensive {target_type} scan: {target} "
+                   f"(depth {max_depth}, fan-out {fan_out})[/]")
+    
+    job_id = next_job_id("plan")
+    renderer.job_started(job_id, f"Comprehensive {target_type} scan: {target}")
+    counts = {'total': 0, 'finished': 0}
+    
+    def on_event(event, **data):
+        if event == 'node':
+            counts['total'] += len(SCAN_GRAPH.get(data['kind'], []))
+        elif event == 'start':
+            renderer.job_progress(job_id, f"{counts['finished']}/{counts['total']} | {data['description']} on {data['key']}")
+        elif event == 'done':
+            counts['finished'] += 1
+            renderer.print(f"[green]Success: {data['description']} ({data['key']})[/]")
+        elif event == 'failed':
+            counts['finished'] += 1
+            renderer.print(f"[red]Failed: {data['description']} ({data['key']}): {data['error']}[/]")
+        elif event == 'deferred':
+            counts['finished'] += 1
+            renderer.print(f"[yellow]Deferred: {data['description']} ({data['key']}): {data['error']}[/]")
+    
+    try:
+        planner = ScanPlanner(max_depth=max_depth, fan_out=fan_out, on_event=on_event)
+        record = planner.run(target_type, target)
+    finally:
+        renderer.job_finished(job_id)
+    
+    output = format_plan_results(record)
+    filename = save_scan_results(f"plan_{target_type}", target, output)
+    if filename:
+        renderer.print(f"[green]Aggregated results saved to: {filename}[/]")
+    
+    scan_results[f"plan_{target_type}_{target}"] = ScanRecord.from_output('python', f"plan_{target_type}", target,
+                                                                         output, filename)
+    try:
+        entity_graph.add_plan(record, filename)
+    except Exception as e:
+        renderer.print(f"[yellow]Warning: Could not update entity graph: {e}[/]")
+    
+    renderer.print(f"[bold green]Comprehensive scan complete: {len(record['nodes'])} targets, "
+                   f"{len(record['edges'])} links discovered[/]")
+
+def run_batch_job(job, retry=False):
+    """Run (or resume) a journaled batch job, skipping targets already done"""
+    if retry:
+        targets = job.failed()
+        action = "Retrying failed items of"
+    else:
+        targets = job.remaining()
+        action = "Resuming" if job.states() else "Starting"
+    
+    if not targets:
+        renderer.print(f"[yellow]Nothing to run for job {job.job_id}[/]")
+        return
+    
+    renderer.print(f"[bold blue]{action} batch job {job.job_id}: {len(targets)} of {len(job.targets)} targets[/]")
+    
+    progress = {'finished': 0}
+    
+    def on_event(event, **data):
+        if event in ('done', 'failed'):
+            progress['finished'] += 1
+            renderer.job_progress(job.job_id, f"{progress['finished']}/{len(targets)}")
+        if event == 'done':
+            renderer.print(f"[green][{job.job_id}] Done: {data['target']}[/]")
+        elif event == 'failed':
+            renderer.print(f"[red][{job.job_id}] Failed: {data['target']}: {data['error']}[/]")
+    
+    save = lambda command, target, output: save_and_link("batch", command, target, output)
+    renderer.job_started(job.job_id, f"Batch job {job.job_id}")
+    try:
+        counts = job.run(only=targets, save=save, on_event=on_event)
+    finally:
+        renderer.job_finished(job.job_id)
+    renderer.print(f"[bold green]Batch job {job.job_id} finished:[/] "
+                   f"{counts['done']} done, {counts['failed']} failed, {counts['pending']} pending")
+
+def start_batch_job(command, targets_file):
+    """Create a journaled batch job from a file of targets and run it"""
+    if command not in CPP_COMMANDS + PYTHON_COMMANDS:
+        console.print(f"[bold red]Command not supported in batch mode: {command}[/]")
+        return
+    try:
+        with open(targets_file, encoding='utf-8') as f:
+            targets = [line for line in f if line.strip() and not line.startswith('#')]
+    except OSError as e:
+        console.print(f"[bold red]Could not read targets file: {e}[/]")
+        return
+    
+    job = BatchJob.create(command, targets)
+    console.print(f"[bold green]Created batch job: {job.job_id}[/] (resume with: resume {job.job_id})")
+    threading.Thread(target=run_batch_job, args=(job,), daemon=True).start()
+
+def load_batch_job(job_id):
+    """Open an existing batch job, reporting unknown IDs"""
+    try:
+        return BatchJob(job_id)
+    except FileNotFoundError:
+        console.print(f"[bold red]Unknown batch job: {job_id}[/]")
+        console.print("[yellow]Type 'jobs' to list batch jobs[/]")
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]Could not open batch job {job_id}: {e}[/]")
+    return None
+
+def show_batch_jobs():
+    """List batch jobs with their progress"""
+    jobs = BatchJob.list_jobs()
+    if not jobs:
+        console.print("[yellow]No batch jobs found.[/]")
+        return
+    
+    table = Table(title="Batch Jobs", show_header=True, header_style="bold magenta")
+    table.add_column("Job", style="cyan")
+    table.add_column("Command", style="white")
+    table.add_column("Total", style="white")
+    table.add_column("Done", style="green")
+    table.add_column("Failed", style="red")
+    table.add_column("In Flight", style="yellow")
+    table.add_column("Pending", style="white")
+    
+    for job in jobs:
+        counts = job.counts()
+        table.add_row(job.job_id, job.command, str(len(job.targets)), str(counts['done']),
+                      str(counts['failed']), str(counts['in-flight']), str(counts['pending']))
+    
+    console.print(table)
+
+def on_monitor_event(event, **data):
+    """Report monitoring deltas and failures as they happen"""
+    entry = data['entry']
+    if event == 'delta':
+        lines = format_delta(entry, data['delta'])
+        style = "dim" if data['delta']['baseline'] else "bold magenta"
+        renderer.print(f"[{style}][Monitor] {lines[0]}[/]")
+        for line in lines[1:]:
+            renderer.print(line, markup=False)
+    elif event == 'failed':
+        renderer.print(f"[red][Monitor] {entry['command']} {entry['target']} failed: {data['error']}[/]")
+
+def run_monitored_scan(command, target):
+    """Run a monitoring scan and feed it to the pivot graph; the slot is taken inside run_job_command"""
+    output = run_job_command(command, target)
+    kind = 'python' if command in PYTHON_COMMANDS else 'cpp'
+    link_result(ScanRecord.from_output(kind, command, target, output))
+    return output
+
+monitor = Monitor(run=run_monitored_scan, on_event=on_monitor_event)
+
+def watch_target(command, target, interval=None):
+    """Add a target to the watchlist and make sure the monitor is running"""
+    try:
+        if interval is None:
+            entry = monitor.watchlist.add(command, target)
+        else:
+            entry = monitor.watchlist.add(command, target, interval)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/]")
+        return
+    monitor.reload()
+    monitor.start()
+    console.print(f"[bold green]Watching {command} {target} every {entry['interval']}s[/] (id: {entry['id']})")
+
+def unwatch_target(watch_id):
+    """Remove a target from the watchlist; its history stays on disk"""
+    if monitor.watchlist.remove(watch_id):
+        console.print(f"[green]Stopped watching {watch_id}[/]")
+    else:
+        console.print(f"[bold red]Unknown watch: {watch_id}[/]")
+        console.print("[yellow]Type 'watchlist' to list watched targets[/]")
+
+def show_watchlist():
+    """List watched targets with their change history"""
+    entries = monitor.watchlist.all()
+    if not entries:
+        console.print("[yellow]Watchlist is empty. Add targets with: watch <command> <target> [seconds][/]")
+        return
+    
+    table = Table(title="Watchlist", show_header=True, header_style="bold magenta")
+    table.add_column("ID", style="cyan")
+    table.add_column("Command", style="white")
+    table.add_column("Target", style="green")
+    table.add_column("Interval", style="white")
+    table.add_column("Changes", style="magenta")
+    table.add_column("Last Change", style="yellow")
+    
+    for entry in entries:
+        deltas = [d for d in TargetHistory(entry['id']).deltas() if not d['baseline']]
+        table.add_row(entry['id'], entry['command'], entry['target'], f"{entry['interval']}s",
+                      str(len(deltas)), deltas[-1]['ts'] if deltas else "-")
+    
+    console.print(table)
+    state = "[green]running[/]" if monitor.running() else "[yellow]stopped[/]"
+    console.print(f"Monitor: {state}")
+
+def show_changes(watch_id, limit=10):
+    """Print the most recent deltas recorded for a watched target"""
+    entry = monitor.watchlist.entries.get(watch_id, {'command': watch_id, 'target': ''})
+    deltas = TargetHistory(watch_id).deltas(limit)
+    if not deltas:
+        console.print(f"[yellow]No history recorded for {watch_id}[/]")
+        return
+    for delta in deltas:
+        lines = format_delta(entry, delta)
+        console.print(f"[bold magenta]{lines[0]}[/]")
+        for line in lines[1:]:
+            console.print(line, markup=False)
+
+def find_results(text, limit=20):
+    """Search every saved result file for text (words, URLs, emails)"""
+    try:
+        matches = search_index.search(text, limit, highlight=("\x02", "\x03"))
+    except Exception as e:
+        console.print(f"[red]Search failed: {e}[/]")
+        return
+    if not matches:
+        console.print(f"[yellow]No saved results mention {escape(text)}[/]")
+        return
+    
+    table = Table(title=f"Saved results matching '{escape(text)}'", show_header=True, header_style="bold magenta")
+    table.add_column("Timestamp", style="yellow")
+    table.add_column("Command", style="white")
+    table.add_column("Target", style="green")
+    table.add_column("Match", style="white")
+    table.add_column("File", style="dim")
+    
+    for path, command, target, timestamp, snippet in matches:
+        snippet = escape(" ".join(snippet.split())).replace("\x02", "[bold yellow]").replace("\x03", "[/]")
+        table.add_row(timestamp, command, escape(target), snippet, Path(path).name)
+    
+    console.print(table)
+
+def show_pivot(text, depth=1):
+    """Show every entity linked to one username, email, domain or IP, up to depth hops away"""
+    kind, value = guess_type(text)
+    try:
+        rows = entity_graph.neighbourhood(kind, value, depth=depth)
+    except Exception as e:
+        console.print(f"[red]Pivot failed: {e}[/]")
+        return
+    if rows is None:
+        console.print(f"[yellow]No {kind} '{escape(value)}' in the entity graph yet[/]")
+        console.print("[yellow]Prefix a type to pick one explicitly, e.g. pivot domain:example.org[/]")
+        return
+    if len(rows) == 1:
+        console.print(f"[yellow]Nothing is linked to {kind} '{escape(value)}' yet[/]")
+        return
+    
+    table = Table(title=f"Entities linked to {kind} '{escape(value)}'", show_header=True, header_style="bold magenta")
+    table.add_column("Hops", style="dim", justify="right")
+    table.add_column("Type", style="cyan")
+    table.add_column("Entity", style="green")
+    table.add_column("Link", style="white")
+    
+    for entity_type, entity_value, hops, relation, direction, parent in rows[1:]:
+        arrow = f"{relation} →" if direction == '->' else f"← {relation}"
+        link = arrow if hops == 1 else f"{escape(parent)} {arrow}"
+        table.add_row(str(hops), entity_type, escape(entity_value), link)
+    
+    console.print(table)
+
+def show_health():
+    """Show the circuit breaker state and adaptive timeout of every host contacted this session"""
+    rows = breakers.snapshot()
+    if not rows:
+        console.print("[yellow]No hosts contacted yet in this session.[/]")
+        return
+    
+    table = Table(title="Host Health", show_header=True, header_style="bold magenta")
+    table.add_column("Host", style="cyan")
+    table.add_column("State", style="white")
+    table.add_column("Recent", style="white", justify="right")
+    table.add_column("Errors", style="red", justify="right")
+    table.add_column("Timeouts", style="red", justify="right")
+    table.add_column("Retry in", style="yellow", justify="right")
+    table.add_column("Timeout", style="dim", justify="right")
+    table.add_column("Totals ok/err/timeout", style="dim", justify="right")
+    
+    colors = {OPEN: "bold red", HALF_OPEN: "yellow"}
+    for host, state, calls, errors, timeouts, retry_in, totals in rows:
+        timeout = latency.timeout(host, None)
+        table.add_row(
+            host,
+            f"[{colors.get(state, 'green')}]{state}[/]",
+            str(calls),
+            str(errors),
+            str(timeouts),
+            f"{retry_in:.0f}s" if state == OPEN else "",
+            f"{timeout:.1f}s" if timeout else "default",
+            f"{totals['ok']}/{totals['error']}/{totals['timeout']}"
+        )
+    
+    console.print(table)
 
 def show_session_summary():
     """Display current session scan results"""
@@ -248,20 +670,22 @@ def show_session_summary():
         return
     
     table = Table(title="Current Session Results", show_header=True, header_style="bold magenta")
+    table.add_column("#", style="dim", justify="right")
     table.add_column("Type", style="cyan")
     table.add_column("Command", style="white")
     table.add_column("Target", style="green")
     table.add_column("Timestamp", style="yellow")
     table.add_column("Status", style="white")
     
-    for key, result in scan_results.items():
-        scanner_type = "C++" if result['type'] == 'cpp' else "Python"
-        status = "SUCCESS" if "error" not in result['results'].lower() else "FAILED"
+    for index, (key, result) in enumerate(scan_results.items(), 1):
+        scanner_type = "C++" if result.kind == 'cpp' else "Python"
+        status = "FAILED" if result.failed else "SUCCESS"
         table.add_row(
+            str(index),
             scanner_type,
-            result['command'],
-            result['target'],
-            result['timestamp'].strftime("%H:%M:%S"),
+            result.command,
+            result.target,
+            result.when.strftime("%H:%M:%S"),
             status
         )
     
@@ -284,11 +708,11 @@ def export_session_results():
             f.write(f"**Total Scans:** {len(scan_results)}\n\n")
             
             for key, result in scan_results.items():
-                scanner_type = "C++" if result['type'] == 'cpp' else "Python Advanced"
-                f.write(f"## {scanner_type}: {result['command']} {result['target']}\n")
-                f.write(f"**Time:** {result['timestamp'].strftime('%H:%M:%S')}\n")
+                scanner_type = "C++" if result.kind == 'cpp' else "Python Advanced"
+                f.write(f"## {scanner_type}: {result.command} {result.target}\n")
+                f.write(f"**Time:** {result.when.strftime('%H:%M:%S')}\n")
                 f.write("```\n")
-                f.write(result['results'])
+                f.write(result.output)
                 f.write("\n```\n\n")
         
         console.print(f"[bold green]Session exported to: {filename}[/]")
@@ -315,21 +739,43 @@ def show_help():
         ("rddt", "Reddit user information", "C++", "rddt <username>"),
         ("hnws", "Hacker News user information", "C++", "hnws <username>"),
         ("sovf", "Stack Overflow user information", "C++", "sovf <userid>"),
+        ("wprb", "Username existence probe (fast)", "C++", "wprb <username>"),
         
         # Domain & Network Intelligence
         ("dlkp", "DNS lookup and records", "C++", "dlkp <domain>"),
         ("whis", "WHOIS domain information", "C++", "whis <domain>"),
         ("ssll", "SSL certificate information", "C++", "ssll <domain>"),
-        ("fscn", "Full comprehensive domain scan", "C++", "fscn <domain>"),
+        ("fscn", "Full domain scan (follows IPs, subdomains)", "C++", "fscn <domain> [depth] [fan-out]"),
+        ("ascn", "Full username scan (follows linked domains)", "Both", "ascn <username> [depth] [fan-out]"),
         ("wbck", "Wayback Machine archived URLs", "C++", "wbck <domain>"),
+        ("sres", "Resolve certificate subdomains", "Python", "sres <domain>"),
         
         # Digital Footprint Analysis
         ("iplc", "IP address geolocation", "C++", "iplc <ip_address>"),
+        ("iplc", "Bulk geolocation from the local table (CSV)", "Python", "iplc <file|cidr>"),
         ("embp", "Email breach check", "C++", "embp <email>"),
         ("btcn", "Bitcoin address information", "C++", "btcn <address>"),
         
+        # Batch Jobs
+        ("batch", "Run a command over a file of targets", "Both", "batch <command> <file>"),
+        ("jobs", "List batch jobs and progress", "Both", "jobs"),
+        ("resume", "Resume an interrupted batch job", "Both", "resume <job>"),
+        ("retry", "Re-run failed items of a batch job", "Both", "retry <job>"),
+        
+        # Monitoring
+        ("watch", "Rescan a target on a schedule, alert on changes", "Both", "watch <command> <target> [seconds]"),
+        ("unwatch", "Stop watching a target", "Both", "unwatch <id>"),
+        ("watchlist", "List watched targets and change counts", "Both", "watchlist"),
+        ("changes", "Show recorded changes for a watched target", "Both", "changes <id>"),
+        
+        # Saved Results
+        ("find", "Search all saved results for text, URLs or emails", "Both", "find <text>"),
+        ("pivot", "Show entities linked across scans (shared email, domains on an IP)", "Both", "pivot <entity> [depth]"),
+        
         # Session Management
+        ("health", "Circuit breaker state and timeouts per host", "Both", "health"),
         ("session", "Show current session results", "Both", "session"),
+        ("view", "Page through a full session result", "Both", "view <#>"),
         ("export", "Export session results", "Both", "export"),
         ("clear", "Clear terminal", "Both", "clear"),
         ("help", "Show this help message", "Both", "help"),
@@ -384,6 +830,57 @@ def process_command(user_input):
         export_session_results()
         return None
     
+    elif command == "view" and len(parts) >= 2:
+        view_result(parts[1])
+        return None
+    
+    elif command == "jobs":
+        show_batch_jobs()
+        return None
+    
+    elif command == "batch":
+        if len(parts) >= 3:
+            start_batch_job(parts[1].lower(), parts[2])
+        else:
+            console.print("[yellow]Usage: batch <command> <file>[/]")
+        return None
+    
+    elif command in ["resume", "retry"] and len(parts) >= 2:
+        job = load_batch_job(parts[1])
+        if job:
+            threading.Thread(target=run_batch_job, args=(job, command == "retry"), daemon=True).start()
+        return None
+    
+    elif command == "watch" and len(parts) >= 3:
+        interval = int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else None
+        watch_target(parts[1].lower(), parts[2], interval)
+        return None
+    
+    elif command == "unwatch" and len(parts) >= 2:
+        unwatch_target(parts[1])
+        return None
+    
+    elif command == "watchlist":
+        show_watchlist()
+        return None
+    
+    elif command == "changes" and len(parts) >= 2:
+        show_changes(parts[1])
+        return None
+    
+    elif command == "pivot" and len(parts) >= 2:
+        depth = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 1
+        show_pivot(parts[1], depth)
+        return None
+    
+    elif command == "health":
+        show_health()
+        return None
+    
+    elif command == "find" and len(parts) >= 2:
+        find_results(user_input.strip().split(None, 1)[1])
+        return None
+    
     # Scan commands requiring target
     elif len(parts) >= 2:
         target = parts[1]
@@ -394,17 +891,24 @@ def process_command(user_input):
             run_advanced_scanner_async(target)
             
         # C++ Scanner commands
-        elif command in ["fscn"]:
-            console.print(f"[bold blue]Starting comprehensive domain scan: {target}[/]")
-            threading.Thread(target=run_comprehensive_scan, args=("domain", target)).start()
+        elif command in ["fscn", "ascn"]:
+            target_type = "domain" if command == "fscn" else "username"
+            depth = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else DEFAULT_DEPTH
+            fan_out = int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else DEFAULT_FAN_OUT
+            console.print(f"[bold blue]Starting comprehensive {target_type} scan: {target}[/]")
+            threading.Thread(target=run_comprehensive_scan, args=(target_type, target, depth, fan_out)).start()
             
-        elif command in ["ascn"]:
-            console.print(f"[bold blue]Starting comprehensive username scan: {target}[/]")
-            threading.Thread(target=run_comprehensive_scan, args=("username", target)).start()
+        elif command == "iplc" and ("/" in target or os.path.isfile(target)):
+            console.print(f"[bold blue]Starting bulk geolocation: {target}[/]")
+            threading.Thread(target=run_bulk_geolocation, args=(target,), daemon=True).start()
+            
+        elif command in ["sres"]:
+            console.print(f"[bold blue]Starting subdomain resolution pipeline: {target}[/]")
+            threading.Thread(target=run_subdomain_resolution, args=(target,), daemon=True).start()
             
         # Individual C++ scan commands
         elif command in ["dlkp", "wbck", "ghub", "rddt", "iplc", 
-                        "whis", "ssll", "embp", "btcn", "hnws", "sovf"]:
+                        "whis", "ssll", "embp", "btcn", "hnws", "sovf", "wprb"]:
             threading.Thread(target=run_scanner_command_async, args=(command, target)).start()
             
         else:
@@ -441,16 +945,45 @@ def check_scanners():
     
     return any(scanners_available.values())
 
+def configure_coordinator():
+    """Use remote workers when --coordinator URL or OSINT_COORDINATOR is given"""
+    global coordinator_client
+    url = os.environ.get("OSINT_COORDINATOR")
+    if "--coordinator" in sys.argv:
+        index = sys.argv.index("--coordinator")
+        if index + 1 < len(sys.argv):
+            url = sys.argv[index + 1]
+    if url:
+        coordinator_client = CoordinatorClient(url)
+        console.print(f"[bold blue]Distributed mode: scans run on workers via {url}[/]")
+
 def main():
     """Main terminal interface"""
     clear_screen()
     display_banner()
+    configure_coordinator()
     
     # Check scanner availability
-    if not check_scanners():
+    if not check_scanners() and coordinator_client is None:
         console.print("[bold red]No scanners found! Please ensure at least one scanner is available.[/]")
         console.print("[yellow]Required files: './scanner' (C++) or 'advanced_scanner.py' (Python)[/]")
         return
+
+    # Headless HTTP job API instead of the interactive prompt
+    if "--api" in sys.argv:
+        import api_server
+        index = sys.argv.index("--api")
+        address = sys.argv[index + 1] if index + 1 < len(sys.argv) else ""
+        if address.startswith("-"):
+            address = ""
+        host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+        api_server.serve(host or api_server.DEFAULT_HOST, int(port) if port.isdigit() else api_server.DEFAULT_PORT,
+                         terminal=sys.modules[__name__])
+        return
+
+    if monitor.watchlist.entries:
+        monitor.start()
+        console.print(f"[bold blue]Monitoring {len(monitor.watchlist.entries)} watched targets in the background[/]")
     
     console.print(f"\n[bold green]weThink OSINT Terminal Ready![/]")
     console.print("[italic cyan]Type 'help' for commands, 'exit' to quit[/]\n")
@@ -460,7 +993,7 @@ def main():
         while True:
             try:
                 prompt_text = Text("weThink > ", style="bold green")
-                user_input = Prompt.ask(prompt_text)
+                user_input = renderer.ask(Prompt(prompt_text, console=console))
                 
                 result = process_command(user_input)
                 if result == "exit":
@@ -468,7 +1001,7 @@ def main():
                     break
                     
             except KeyboardInterrupt:
-                if Confirm.ask("\nReally exit?"):
+                if renderer.ask(Confirm("\nReally exit?", console=console)):
                     break
                 else:
                     continue
@@ -480,8 +1013,11 @@ def main():
     
     finally:
         # Cleanup if needed
+        monitor.stop()
+        renderer.stop()
         if scan_results:
             console.print(f"[yellow]Session summary: {len(scan_results)} scans performed[/]")
+        scan_results.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file